@@ -322,19 +322,42 @@ exports.deleteParkiran = asyncHandler(async (req, res) => {
     });
 });
 
+// Max clock skew accepted for event_at from an edge device (ms)
+const EVENT_TIME_MAX_SKEW = 60 * 1000;
+
+// event_at (unix seconds, capture time on the edge) -> Date, null if invalid or in the future
+const parseEventTime = (eventAt) => {
+    const seconds = parseFloat(eventAt);
+    if (!Number.isFinite(seconds)) return null;
+    const eventTime = new Date(seconds * 1000);
+    return eventTime.getTime() <= Date.now() + EVENT_TIME_MAX_SKEW ? eventTime : null;
+};
+
+// A replayed event is stale when the vehicle already has this state
+// (the original attempt was recorded) or a newer log exists
+const isStaleReplay = (lastLog, type, eventTime) =>
+    !!lastLog && (lastLog.type === type || new Date(lastLog.timestamp) > eventTime);
+
 // Process parking entry/exit from edge device
 // POST /api/parkir/edge-entry
 // Supports multipart/form-data for image upload
+// Offline queue replays carry event_at + replayed=true: the log gets the
+// original event time and no push notification is sent
+// Every edge event carries an idempotency_key: a retry or replay of an event
+// that was already recorded gets the stored decision instead of a duplicate DENY
 exports.processEdgeEntry = asyncHandler(async (req, res) => {
-    const { plate_text, confidence, parkiran_id, gate_type, face_detected } = req.body;
+    const { plate_text, confidence, parkiran_id, gate_type, face_detected, event_at, replayed } = req.body;
+    const idempotencyKey = req.body.idempotency_key || req.headers['idempotency-key'] || null;
 
     // Handle files from multer.fields() - req.files is an object with field names as keys
     const plateFile = req.files?.image?.[0];
     const faceFile = req.files?.face_image?.[0];
     const isFaceDetected = face_detected === 'true';
+    const isReplay = replayed === 'true';
+    const eventTime = (isReplay && parseEventTime(event_at)) || new Date();
 
     // Debug logging for face image reception
-    console.log(`[Edge Entry] Plate: ${plate_text}, Gate: ${gate_type}`);
+    console.log(`[Edge Entry] Plate: ${plate_text}, Gate: ${gate_type}${isReplay ? `, replay of ${eventTime.toISOString()}` : ''}`);
     console.log(`[Edge Entry] Plate file: ${plateFile ? `${plateFile.originalname} (${plateFile.size} bytes)` : 'NOT RECEIVED'}`);
     console.log(`[Edge Entry] Face file: ${faceFile ? `${faceFile.originalname} (${faceFile.size} bytes)` : 'NOT RECEIVED'}, detected: ${isFaceDetected}`);
 
@@ -357,6 +380,34 @@ exports.processEdgeEntry = asyncHandler(async (req, res) => {
         });
     }
 
+    // Stored decision of an already recorded event (same idempotency key)
+    const findRecordedEvent = () => idempotencyKey && prisma.logParkir.findUnique({
+        where: { idempotency_key: idempotencyKey },
+        include: {
+            kendaraan: { select: { plat_nomor: true } },
+            parkiran: { select: { nama_parkiran: true } },
+            user: { select: { nama: true } }
+        }
+    });
+
+    const recordedDecision = (log) => res.status(200).json({
+        success: true,
+        gate_action: "OPEN",
+        duplicate: true,
+        message: `Kendaraan ${plate_text} sudah tercatat ${log.type === 'MASUK' ? 'masuk' : 'keluar'}`,
+        data: {
+            plate_text: log.kendaraan?.plat_nomor,
+            owner: log.user?.nama,
+            parkiran: log.parkiran?.nama_parkiran
+        }
+    });
+
+    const recordedEvent = await findRecordedEvent();
+    if (recordedEvent) {
+        console.log(`[Edge Entry] Duplicate event ${idempotencyKey}, returning log ${recordedEvent.id_log_parkir}`);
+        return recordedDecision(recordedEvent);
+    }
+
     // Normalize plate text (remove spaces, uppercase)
     const normalizedPlate = plate_text.toUpperCase().replace(/\s/g, '');
 
@@ -394,6 +445,46 @@ exports.processEdgeEntry = asyncHandler(async (req, res) => {
 
     const parkiranData = parkiran[0];
 
+    // This event as recorded by an earlier attempt with the same idempotency key
+    const recordedByEarlierAttempt = () => recordedDecision({
+        type: gate_type, kendaraan, parkiran: parkiranData, user: kendaraan.user
+    });
+
+    // Log + capacity update in one transaction. Returns null when a concurrent
+    // request with the same idempotency key recorded the event first
+    const recordEvent = async (type, capacityUpdate) => {
+        try {
+            const [newLog] = await prisma.$transaction([
+                prisma.logParkir.create({
+                    data: {
+                        id_kendaraan: kendaraan.id_kendaraan,
+                        id_parkiran: parseInt(parkiran_id),
+                        id_user: kendaraan.user?.id_user,
+                        type,
+                        confidence: confidence ? parseFloat(confidence) : null,
+                        image_url: null, // Will be updated asynchronously
+                        timestamp: eventTime,
+                        idempotency_key: idempotencyKey
+                    }
+                }),
+                capacityUpdate
+            ]);
+            return newLog;
+        } catch (error) {
+            if (idempotencyKey && error.code === 'P2002') {
+                return null;
+            }
+            throw error;
+        }
+    };
+
+    const replayAlreadyRecorded = () => res.status(409).json({
+        success: false,
+        gate_action: "DENY",
+        replayed: true,
+        message: `Event ${gate_type} ${plate_text} sudah tercatat, replay diabaikan`
+    });
+
     // Async image upload handling for plate image
     const processPlateImageUpload = async (logId) => {
         if (plateFile) {
@@ -465,6 +556,16 @@ exports.processEdgeEntry = asyncHandler(async (req, res) => {
             orderBy: { timestamp: 'desc' }
         });
 
+        // The latest log may be this very event, recorded by an earlier attempt
+        // that finished after the idempotency check above
+        if (idempotencyKey && lastLog?.idempotency_key === idempotencyKey) {
+            return recordedByEarlierAttempt();
+        }
+
+        if (isReplay && isStaleReplay(lastLog, 'MASUK', eventTime)) {
+            return replayAlreadyRecorded();
+        }
+
         if (lastLog && lastLog.type === 'MASUK') {
             return res.status(400).json({
                 success: false,
@@ -474,22 +575,13 @@ exports.processEdgeEntry = asyncHandler(async (req, res) => {
         }
 
         // Create entry log and increment capacity
-        const [newLog] = await prisma.$transaction([
-            prisma.logParkir.create({
-                data: {
-                    id_kendaraan: kendaraan.id_kendaraan,
-                    id_parkiran: parseInt(parkiran_id),
-                    id_user: kendaraan.user?.id_user,
-                    type: 'MASUK',
-                    confidence: confidence ? parseFloat(confidence) : null,
-                    image_url: null // Will be updated asynchronously
-                }
-            }),
-            prisma.$executeRaw`
-                UPDATE parkiran SET live_kapasitas = live_kapasitas + 1, "updatedAt" = NOW()
-                WHERE id_parkiran = ${parseInt(parkiran_id)}
-            `
-        ]);
+        const newLog = await recordEvent('MASUK', prisma.$executeRaw`
+            UPDATE parkiran SET live_kapasitas = live_kapasitas + 1, "updatedAt" = NOW()
+            WHERE id_parkiran = ${parseInt(parkiran_id)}
+        `);
+        if (!newLog) {
+            return recordedByEarlierAttempt();
+        }
 
         // Trigger async uploads without awaiting (plate + face images)
         processPlateImageUpload(newLog.id_log_parkir);
@@ -497,8 +589,8 @@ exports.processEdgeEntry = asyncHandler(async (req, res) => {
 
         const slotTersisa = Number(parkiranData.kapasitas) - Number(parkiranData.live_kapasitas) - 1;
 
-        // Send push notification
-        if (kendaraan.user?.id_user) {
+        // Send push notification (not for late replays)
+        if (kendaraan.user?.id_user && !isReplay) {
             sendParkingNotification(
                 kendaraan.user.id_user,
                 'MASUK',
@@ -526,6 +618,16 @@ exports.processEdgeEntry = asyncHandler(async (req, res) => {
             orderBy: { timestamp: 'desc' }
         });
 
+        // The latest log may be this very event, recorded by an earlier attempt
+        // that finished after the idempotency check above
+        if (idempotencyKey && lastLog?.idempotency_key === idempotencyKey) {
+            return recordedByEarlierAttempt();
+        }
+
+        if (isReplay && isStaleReplay(lastLog, 'KELUAR', eventTime)) {
+            return replayAlreadyRecorded();
+        }
+
         if (!lastLog || lastLog.type === 'KELUAR') {
             return res.status(400).json({
                 success: false,
@@ -535,29 +637,20 @@ exports.processEdgeEntry = asyncHandler(async (req, res) => {
         }
 
         // Create exit log and decrement capacity
-        const [newLog] = await prisma.$transaction([
-            prisma.logParkir.create({
-                data: {
-                    id_kendaraan: kendaraan.id_kendaraan,
-                    id_parkiran: parseInt(parkiran_id),
-                    id_user: kendaraan.user?.id_user,
-                    type: 'KELUAR',
-                    confidence: confidence ? parseFloat(confidence) : null,
-                    image_url: null // Will be updated asynchronously
-                }
-            }),
-            prisma.$executeRaw`
-                UPDATE parkiran SET live_kapasitas = GREATEST(0, live_kapasitas - 1), "updatedAt" = NOW()
-                WHERE id_parkiran = ${parseInt(parkiran_id)}
-            `
-        ]);
+        const newLog = await recordEvent('KELUAR', prisma.$executeRaw`
+            UPDATE parkiran SET live_kapasitas = GREATEST(0, live_kapasitas - 1), "updatedAt" = NOW()
+            WHERE id_parkiran = ${parseInt(parkiran_id)}
+        `);
+        if (!newLog) {
+            return recordedByEarlierAttempt();
+        }
 
         // Trigger async uploads without awaiting (plate + face images)
         processPlateImageUpload(newLog.id_log_parkir);
         processFaceImageUpload(newLog.id_log_parkir);
 
-        // Send push notification
-        if (kendaraan.user?.id_user) {
+        // Send push notification (not for late replays)
+        if (kendaraan.user?.id_user && !isReplay) {
             sendParkingNotification(
                 kendaraan.user.id_user,
                 'KELUAR',
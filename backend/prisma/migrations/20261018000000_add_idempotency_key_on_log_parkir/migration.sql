@@ -0,0 +1,5 @@
+-- AlterTable
+ALTER TABLE "log_parkir" ADD COLUMN     "idempotency_key" TEXT;
+
+-- CreateIndex
+CREATE UNIQUE INDEX "log_parkir_idempotency_key_key" ON "log_parkir"("idempotency_key");
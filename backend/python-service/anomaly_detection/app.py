@@ -1,6 +1,7 @@
 from flask import Flask, request, jsonify
 import pandas as pd
 import numpy as np
+import os
 
 app = Flask(__name__)
 
@@ -74,4 +75,5 @@ def detect_anomalies():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5003, debug=True)
+    # Development server only - production: gunicorn -c gunicorn.conf.py
+    app.run(host='0.0.0.0', port=5003, debug=os.getenv('FLASK_DEBUG') == '1')
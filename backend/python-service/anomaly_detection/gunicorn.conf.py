@@ -0,0 +1,29 @@
+"""
+Gunicorn config - pre-fork multi-worker serving for the anomaly service
+=======================================================================
+
+    gunicorn -c gunicorn.conf.py
+
+pandas/numpy are imported once in the master and shared copy-on-write by
+the WEB_CONCURRENCY workers (default: one per core); BLAS/OpenMP threads
+are capped to cores / workers (MODEL_THREADS overrides).
+"""
+
+import multiprocessing
+import os
+
+cores = multiprocessing.cpu_count()
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5003')}"
+workers = int(os.getenv('WEB_CONCURRENCY', cores))
+worker_class = 'sync'
+wsgi_app = 'app:app'
+preload_app = True
+timeout = 60
+graceful_timeout = 30
+accesslog = '-'
+
+# Cap per-worker compute threads so workers do not oversubscribe the cores
+model_threads = os.getenv('MODEL_THREADS') or str(max(1, cores // workers))
+for var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+    os.environ.setdefault(var, model_threads)
@@ -192,4 +192,5 @@ if __name__ == '__main__':
     print("   - POST /detect-multiple")
     print("   - POST /compare")
     print("   - POST /find-match")
-    app.run(host='0.0.0.0', port=5051, debug=True)
+    # Development server only - production: gunicorn -c gunicorn.conf.py
+    app.run(host='0.0.0.0', port=5051, debug=os.getenv('FLASK_DEBUG') == '1')
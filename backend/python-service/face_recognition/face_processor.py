@@ -17,6 +17,26 @@ class FaceProcessor:
             providers=['CPUExecutionProvider']  # Use CPU (can change to CUDA if GPU available)
         )
         self.app.prepare(ctx_id=0, det_size=(640, 640))
+    
+    def after_fork(self, num_threads=0):
+        """
+        Re-create the ONNX Runtime sessions in a gunicorn worker (models are
+        downloaded/loaded once in the master; ORT thread pools do not survive
+        fork), with intra-op threads capped so workers share the cores.
+        """
+        import onnxruntime as ort
+        
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = num_threads
+        options.inter_op_num_threads = 1
+        for model in self.app.models.values():
+            # Each buffalo_l model object owns one session; parking the old one
+            # on it keeps it alive, releasing it would block on pool threads
+            # the forked worker does not have
+            model._parent_session = model.session
+            model.session = ort.InferenceSession(
+                model.model_file, sess_options=options, providers=['CPUExecutionProvider']
+            )
         
     def detect_single_face(self, image_path):
         """
@@ -0,0 +1,36 @@
+"""
+Gunicorn config - pre-fork multi-worker serving for the face service
+====================================================================
+
+    gunicorn -c gunicorn.conf.py
+
+The app (and the InsightFace buffalo_l models) is imported once in the
+master; each of the WEB_CONCURRENCY workers (default: one per 2 cores)
+re-opens its ONNX Runtime sessions with cores / workers intra-op threads
+(MODEL_THREADS overrides).
+"""
+
+import multiprocessing
+import os
+
+cores = multiprocessing.cpu_count()
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5051')}"
+workers = int(os.getenv('WEB_CONCURRENCY', max(1, cores // 2)))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 2))
+wsgi_app = 'app:app'
+preload_app = True  # Load the models once in the master, before fork
+timeout = 60
+graceful_timeout = 30
+accesslog = '-'
+
+# Cap per-worker compute threads so workers do not oversubscribe the cores
+model_threads = os.getenv('MODEL_THREADS') or str(max(1, cores // workers))
+for var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+    os.environ.setdefault(var, model_threads)
+
+
+def post_fork(server, worker):
+    from app import face_processor
+    face_processor.after_fork(int(model_threads))
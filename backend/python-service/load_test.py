@@ -0,0 +1,179 @@
+"""
+Load Test - throughput scaling from 1 to N gunicorn workers
+============================================================
+
+Starts a service with gunicorn.conf.py once per worker count, waits until it
+is ready, hammers one endpoint from concurrent clients for a fixed duration
+and prints requests/s, latency percentiles and the speed-up over 1 worker:
+
+    python load_test.py plate --image plate.jpg --workers 1 2 4
+    python load_test.py face --image face.jpg --workers 1 2 --concurrency 8
+    python load_test.py anomaly --workers 1 2 4 8
+
+Run it on the production machine (or the same instance type) - the numbers
+only mean something for the core count they were measured on.
+"""
+
+import argparse
+import json
+import os
+import random
+import signal
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import requests
+
+
+BASE_DIR = Path(__file__).parent
+
+
+def anomaly_payload(students=500, sessions=20, seed=0):
+    rng = random.Random(seed)
+    attendance = [
+        {'id_user': user, 'id_sesi': session}
+        for user in range(students) for session in range(sessions) if rng.random() < 0.7
+    ]
+    return {
+        'students': [{'id_user': user} for user in range(students)],
+        'attendance': attendance,
+        'total_sessions': sessions
+    }
+
+
+SERVICES = {
+    'plate': {'dir': 'plate_recognition', 'ready': '/health/ready', 'path': '/api/recognize-plate', 'field': 'image'},
+    'face': {'dir': 'face_recognition', 'ready': '/health', 'path': '/detect-face', 'field': 'image'},
+    'anomaly': {'dir': 'anomaly_detection', 'ready': '/', 'path': '/detect-anomalies', 'json': anomaly_payload}
+}
+
+
+def start_service(service, workers, port, model_threads):
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), PORT=str(port))
+    if model_threads:
+        env['MODEL_THREADS'] = str(model_threads)
+    return subprocess.Popen(
+        ['gunicorn', '-c', 'gunicorn.conf.py'],
+        cwd=BASE_DIR / service['dir'], env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True
+    )
+
+
+def wait_ready(url, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(url, timeout=2).status_code == 200:
+                return True
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def run_load(url, make_request, concurrency, duration):
+    """Concurrent clients for `duration` seconds. Returns (latencies_s, errors)"""
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    stop_at = time.time() + duration
+
+    def client():
+        session = requests.Session()
+        while time.time() < stop_at:
+            start = time.perf_counter()
+            try:
+                ok = make_request(session, url).status_code < 400
+            except requests.exceptions.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure throughput scaling over gunicorn worker counts')
+    parser.add_argument('service', choices=sorted(SERVICES))
+    parser.add_argument('--image', type=str, help='Request image (plate / face)')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--concurrency', type=int, default=16, help='Concurrent clients')
+    parser.add_argument('--duration', type=float, default=20.0, help='Seconds per worker count')
+    parser.add_argument('--warmup', type=float, default=3.0, help='Unmeasured seconds before each run')
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--model-threads', type=int, default=0,
+                        help='Threads per worker (default: cores / workers, see gunicorn.conf.py)')
+    parser.add_argument('--ready-timeout', type=float, default=180.0)
+    parser.add_argument('--output', type=str, help='Write the JSON results to this file')
+    args = parser.parse_args()
+
+    service = SERVICES[args.service]
+    if 'json' in service:
+        payload = service['json']()
+        make_request = lambda session, url: session.post(url, json=payload, timeout=60)
+    else:
+        if not args.image:
+            parser.error(f"--image is required for the {args.service} service")
+        image = Path(args.image).read_bytes()
+        name = Path(args.image).name
+        make_request = lambda session, url: session.post(
+            url, files={service['field']: (name, image, 'image/jpeg')}, timeout=60
+        )
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    results = []
+    for workers in args.workers:
+        process = start_service(service, workers, args.port, args.model_threads)
+        try:
+            if not wait_ready(base_url + service['ready'], args.ready_timeout):
+                print(f"❌ {args.service} with {workers} workers not ready after {args.ready_timeout:.0f}s")
+                continue
+            run_load(base_url + service['path'], make_request, args.concurrency, args.warmup)
+            latencies, errors = run_load(base_url + service['path'], make_request, args.concurrency, args.duration)
+        finally:
+            os.killpg(process.pid, signal.SIGTERM)
+            process.wait(timeout=30)
+
+        latencies_ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+        results.append({
+            'workers': workers,
+            'requests': len(latencies),
+            'errors': errors,
+            'rps': len(latencies) / args.duration,
+            'p50_ms': float(np.percentile(latencies_ms, 50)),
+            'p95_ms': float(np.percentile(latencies_ms, 95))
+        })
+        print(f"  {workers} workers: {results[-1]['rps']:.1f} req/s")
+
+    if not results:
+        return
+
+    baseline = results[0]['rps'] or 1.0
+    print("\n" + "=" * 60)
+    print(f"✅ LOAD TEST: {args.service} ({os.cpu_count()} cores, {args.concurrency} clients, {args.duration:.0f}s)")
+    print("=" * 60)
+    print(f"{'workers':>8} {'req/s':>9} {'speed-up':>9} {'p50':>9} {'p95':>9} {'errors':>7}")
+    for r in results:
+        print(f"{r['workers']:>8} {r['rps']:>9.1f} {r['rps'] / baseline:>8.2f}x "
+              f"{r['p50_ms']:>7.1f}ms {r['p95_ms']:>7.1f}ms {r['errors']:>7}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({
+            'service': args.service, 'cores': os.cpu_count(), 'concurrency': args.concurrency,
+            'duration_s': args.duration, 'results': results
+        }, indent=2) + '\n')
+
+
+if __name__ == '__main__':
+    main()
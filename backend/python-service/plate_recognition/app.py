@@ -3,7 +3,8 @@ License Plate Recognition Service (OCR)
 ========================================
 
 Server-side Python service for character recognition from license plate images.
-Uses YOLOv8 for character detection and reconstruction.
+Uses YOLOv8 for character detection and reconstruction, either through
+Ultralytics (PyTorch) or ONNX Runtime alone (see onnx_decode.py).
 
 This service receives cropped plate images from edge devices (Raspberry Pi)
 and returns the recognized plate text.
@@ -14,11 +15,16 @@ import numpy as np
 from pathlib import Path
 import yaml
 import logging
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from PIL import Image
 import io
+import json
 import os
+import shutil
+import tempfile
+import threading
 import time
+import zipfile
 import requests as http_requests
 from dotenv import load_dotenv
 
@@ -27,9 +33,16 @@ try:
     USE_ULTRALYTICS = True
 except ImportError:
     print("Ultralytics not available, trying ONNX...")
-    import onnxruntime as ort
     USE_ULTRALYTICS = False
 
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+from onnx_decode import decode, letterbox, scale_boxes, to_input_tensor
+from ocr_scheduler import OcrBatchScheduler
+
 # Load environment variables from root project .env
 # Path: backend/python-service/plate_recognition -> root
 ROOT_DIR = Path(__file__).resolve().parent.parent.parent.parent  # Go up 4 levels to project root
@@ -39,6 +52,33 @@ load_dotenv(dotenv_path=ENV_PATH)
 # Environment Configuration
 NODEJS_BACKEND_URL = os.getenv('NODEJS_BACKEND_URL', 'http://localhost:3000')
 EDGE_DEVICE_SECRET = os.getenv('EDGE_DEVICE_SECRET', 'your-secret-key')
+# Node.js edge-entry call timeout (seconds); stays below the edge's gate deadline
+# (server.deadline, 8s) so the edge gets a reply instead of timing out and retrying
+BACKEND_TIMEOUT = float(os.getenv('BACKEND_TIMEOUT', 5))
+# auto (PyTorch if installed, else ONNX), ultralytics or onnx
+PLATE_BACKEND = os.getenv('PLATE_BACKEND', 'auto')
+# Images per model call on /api/recognize-plate/batch
+PLATE_BATCH_SIZE = int(os.getenv('PLATE_BATCH_SIZE', 16))
+MAX_BATCH_SIZE = 64
+# Micro-batching of concurrent OCR requests (/api/recognize-plate, /api/parking/process)
+OCR_BATCHING = os.getenv('OCR_BATCHING', 'true').lower() == 'true'
+OCR_MAX_BATCH = int(os.getenv('OCR_MAX_BATCH', 8))
+OCR_BATCH_WINDOW_MS = float(os.getenv('OCR_BATCH_WINDOW_MS', 8))
+# Model is loaded and warmed at service start; requests arriving earlier wait this long
+MODEL_WARMUP_RUNS = int(os.getenv('MODEL_WARMUP_RUNS', 3))
+MODEL_WAIT_TIMEOUT = float(os.getenv('MODEL_WAIT_TIMEOUT', 5))
+# ONNX Runtime intra-op threads per process (0 = ORT default); gunicorn.conf.py
+# caps it so several workers do not oversubscribe the cores
+ORT_INTRA_OP_THREADS = int(os.getenv('ORT_INTRA_OP_THREADS', 0))
+
+
+def _group_indices(keys):
+    """Indices grouped by equal key, in first-seen order"""
+    groups = {}
+    for i, key in enumerate(keys):
+        groups.setdefault(key, []).append(i)
+    return list(groups.values())
+
 
 class PlateRecognizer:
     def __init__(self, model_path, classes_path):
@@ -58,10 +98,57 @@ class PlateRecognizer:
             self.logger.info(f"Loaded YOLOv8 model from {model_path}")
         else:
             # Use ONNX
-            self.session = ort.InferenceSession(model_path)
+            if ort is None:
+                raise ImportError("Neither ultralytics nor onnxruntime is installed")
+            self.model_path = model_path
+            self.session = self.create_session()
+            self.input_name = self.session.get_inputs()[0].name
+            # Static exports take exactly their input size; dynamic exports get
+            # Ultralytics' minimal (stride-multiple) padding at 640 like .pt models
+            batch, _, height, width = self.session.get_inputs()[0].shape
+            self.dynamic_batch = not isinstance(batch, int)
+            self.dynamic_input = not (isinstance(height, int) and isinstance(width, int))
+            self.input_size = (640, 640) if self.dynamic_input else (height, width)
             self.use_ultralytics = False
             self.logger.info(f"Loaded ONNX model from {model_path}")
     
+    def create_session(self):
+        """ONNX Runtime session with the per-process thread cap"""
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = ORT_INTRA_OP_THREADS
+        options.inter_op_num_threads = 1
+        return ort.InferenceSession(self.model_path, sess_options=options, providers=['CPUExecutionProvider'])
+    
+    def after_fork(self):
+        """
+        Per-worker setup after a pre-fork (gunicorn --preload). PyTorch weights
+        loaded in the master stay shared copy-on-write; ORT thread pools do not
+        survive fork, so ONNX workers open their own session.
+        """
+        if not self.use_ultralytics:
+            # The preloaded session is useless here, but it must not be
+            # garbage-collected in the worker either: its destructor waits for
+            # ORT pool threads that were left behind in the gunicorn master
+            self._parent_session = self.session
+            self.session = self.create_session()
+    
+    def warmup(self, runs=3, batch_size=1):
+        """
+        Dummy inferences so the first real plate does not pay for lazy
+        initialization (graph/kernel setup, memory arenas). Uses a plate-shaped
+        crop, which is letterboxed to the production input size, and one full
+        batch when micro-batching is enabled. Raises on failure.
+        """
+        dummy = np.full((160, 640, 3), 114, dtype=np.uint8)
+        detect = self.recognize_ultralytics if self.use_ultralytics else self.recognize_onnx
+        for _ in range(runs):
+            detect(dummy)
+        if batch_size > 1:
+            if self.use_ultralytics:
+                self.recognize_ultralytics_batch([dummy] * batch_size)
+            else:
+                self.recognize_onnx_batch([dummy] * batch_size)
+    
     def reconstruct_plate_text(self, detections, img_width):
         """
         Reconstruct license plate text from character detections.
@@ -91,9 +178,30 @@ class PlateRecognizer:
         """Recognize using Ultralytics YOLOv8"""
         results = self.model(img, conf=conf_threshold, verbose=False)
         
+        if len(results) == 0:
+            return []
+        return self._ultralytics_detections(results[0])
+    
+    def recognize_ultralytics_batch(self, imgs, conf_threshold=0.25):
+        """
+        Recognize a list of images, one Ultralytics call per image shape.
+        
+        Ultralytics pads a batch of differently sized images to the full
+        input size instead of the minimal letterbox, so mixed shapes would not
+        give the same detections as recognize_ultralytics.
+        """
+        detections = [None] * len(imgs)
+        for indices in _group_indices(img.shape for img in imgs):
+            results = self.model([imgs[i] for i in indices], conf=conf_threshold, verbose=False)
+            for i, result in zip(indices, results):
+                detections[i] = self._ultralytics_detections(result)
+        return detections
+    
+    def _ultralytics_detections(self, result):
+        """Detection dicts from one Ultralytics Results object"""
         detections = []
-        if len(results) > 0 and len(results[0].boxes) > 0:
-            boxes = results[0].boxes
+        if len(result.boxes) > 0:
+            boxes = result.boxes
             
             for box in boxes:
                 x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
@@ -113,19 +221,61 @@ class PlateRecognizer:
         return detections
     
     def recognize_onnx(self, img, conf_threshold=0.25):
-        """Recognize using ONNX model"""
-        # Preprocess
-        img_resized = cv2.resize(img, (640, 640))
-        img_input = img_resized.transpose(2, 0, 1)
-        img_input = np.expand_dims(img_input, 0).astype(np.float32) / 255.0
+        """
+        Recognize using ONNX model (no PyTorch).
+        
+        Letterbox, class argmax and per-class NMS follow Ultralytics, so the
+        detections match recognize_ultralytics for the same crop.
+        """
+        # Preprocess (letterbox, not stretched)
+        img_letterboxed = letterbox(img, self.input_size, auto=self.dynamic_input)
+        img_input = to_input_tensor(img_letterboxed)
         
         # Inference
-        input_name = self.session.get_inputs()[0].name
-        outputs = self.session.run(None, {input_name: img_input})
+        outputs = self.session.run(None, {self.input_name: img_input})
+        
+        return self._onnx_detections(outputs[0], img_letterboxed.shape[:2], img.shape, conf_threshold)
+    
+    def recognize_onnx_batch(self, imgs, conf_threshold=0.25):
+        """
+        Recognize a list of images with one session.run per letterboxed shape
+        (dynamic batch exports).
+        
+        Images get the same letterbox as recognize_onnx, so the detections do
+        not depend on what else was in the batch; crops that letterbox to the
+        same shape are stacked. Fixed batch-1 exports fall back to one run
+        per image.
+        """
+        if not self.dynamic_batch or len(imgs) == 1:
+            return [self.recognize_onnx(img, conf_threshold) for img in imgs]
+        
+        letterboxed = [letterbox(img, self.input_size, auto=self.dynamic_input) for img in imgs]
+        detections = [None] * len(imgs)
+        for indices in _group_indices(img.shape[:2] for img in letterboxed):
+            input_shape = letterboxed[indices[0]].shape[:2]
+            img_input = np.concatenate([to_input_tensor(letterboxed[i]) for i in indices])
+            outputs = self.session.run(None, {self.input_name: img_input})
+            for row, i in enumerate(indices):
+                detections[i] = self._onnx_detections(outputs[0][row:row + 1], input_shape,
+                                                      imgs[i].shape, conf_threshold)
+        return detections
+    
+    def _onnx_detections(self, output, input_shape, img_shape, conf_threshold):
+        """Vectorized decode + per-class NMS, then back to crop coordinates"""
+        boxes, scores, class_ids = decode(output, conf_threshold)
+        boxes = scale_boxes(input_shape, boxes, img_shape)
         
-        # Parse outputs (simplified, adjust based on actual output format)
         detections = []
-        # TODO: Implement ONNX output parsing similar to Ultralytics
+        for (x1, y1, x2, y2), conf, cls in zip(boxes, scores, class_ids):
+            detections.append({
+                'x1': float(x1),
+                'y1': float(y1),
+                'x2': float(x2),
+                'y2': float(y2),
+                'confidence': float(conf),
+                'class_id': int(cls),
+                'character': self.class_names[cls]
+            })
         
         return detections
     
@@ -147,17 +297,7 @@ class PlateRecognizer:
             else:
                 detections = self.recognize_onnx(img, conf_threshold)
             
-            # Reconstruct plate text
-            img_width = img.shape[1]
-            plate_text, avg_conf = self.reconstruct_plate_text(detections, img_width)
-            
-            return {
-                'success': True,
-                'plate_text': plate_text,
-                'confidence': avg_conf,
-                'character_count': len(detections),
-                'characters': detections
-            }
+            return self._build_result(detections, img)
         
         except Exception as e:
             self.logger.error(f"Recognition error: {e}")
@@ -165,6 +305,37 @@ class PlateRecognizer:
                 'success': False,
                 'error': str(e)
             }
+    
+    def recognize_batch(self, imgs, conf_threshold=0.25):
+        """
+        Recognize several plate images with one model call.
+        
+        Returns: list of dicts like recognize(), in the order of imgs
+        """
+        try:
+            if self.use_ultralytics:
+                batch_detections = self.recognize_ultralytics_batch(imgs, conf_threshold)
+            else:
+                batch_detections = self.recognize_onnx_batch(imgs, conf_threshold)
+            
+            return [self._build_result(detections, img) for detections, img in zip(batch_detections, imgs)]
+        
+        except Exception as e:
+            self.logger.error(f"Batch recognition error: {e}")
+            return [{'success': False, 'error': str(e)} for _ in imgs]
+    
+    def _build_result(self, detections, img):
+        # Reconstruct plate text
+        img_width = img.shape[1]
+        plate_text, avg_conf = self.reconstruct_plate_text(detections, img_width)
+        
+        return {
+            'success': True,
+            'plate_text': plate_text,
+            'confidence': avg_conf,
+            'character_count': len(detections),
+            'characters': detections
+        }
 
 
 # Flask app
@@ -177,24 +348,115 @@ logging.basicConfig(
 )
 
 # Initialize recognizer - models are in local models/ folder
-MODEL_PATH = Path(__file__).parent / 'models' / 'license_plate_recognition.pt'
+MODEL_DIR = Path(__file__).parent / 'models'
+if PLATE_BACKEND == 'onnx' or not USE_ULTRALYTICS:
+    MODEL_PATH = MODEL_DIR / 'license_plate_recognition.onnx'
+else:
+    MODEL_PATH = MODEL_DIR / 'license_plate_recognition.pt'
 CLASSES_PATH = Path(__file__).parent / 'models' / 'classes.names'
 
 recognizer = None
+# All model calls go through the scheduler (batched or serialized)
+ocr_scheduler = None
+_init_lock = threading.Lock()
+# Set once the model is loaded and warm (readiness)
+model_ready = threading.Event()
+model_status = {'state': 'not_started', 'error': None, 'load_time_ms': None, 'warmup_time_ms': None}
 
-def init_recognizer():
-    """Initialize recognizer on first request"""
+def load_model():
+    """
+    Load the model once. Under gunicorn (wsgi.py) this runs in the master
+    before fork; the dev server loads it in the background at start.
+    
+    Returns: PlateRecognizer, or None if loading failed
+    """
     global recognizer
-    if recognizer is None:
+    with _init_lock:
+        if recognizer is not None or model_status['state'] == 'failed':
+            return recognizer
+        
         app.logger.info("Initializing plate recognizer...")
-        recognizer = PlateRecognizer(str(MODEL_PATH), str(CLASSES_PATH))
-        app.logger.info("Plate recognizer ready!")
+        model_status['state'] = 'loading'
+        start_time = time.time()
+        try:
+            recognizer = PlateRecognizer(str(MODEL_PATH), str(CLASSES_PATH))
+        except Exception as e:
+            model_status.update(state='failed', error=str(e))
+            app.logger.error(f"Plate recognizer failed to load: {e}")
+            return None
+        
+        model_status['load_time_ms'] = round((time.time() - start_time) * 1000, 1)
+        return recognizer
+
+
+def init_recognizer(forked=False):
+    """Warm the model and start the OCR scheduler in this process (readiness)"""
+    global ocr_scheduler
+    plate_recognizer = load_model()
+    if plate_recognizer is None:
+        return
+    
+    with _init_lock:
+        if ocr_scheduler is not None:
+            return
+        
+        start_time = time.time()
+        try:
+            if forked:
+                plate_recognizer.after_fork()
+            plate_recognizer.warmup(MODEL_WARMUP_RUNS, batch_size=OCR_MAX_BATCH if OCR_BATCHING else 1)
+        except Exception as e:
+            model_status.update(state='failed', error=str(e))
+            app.logger.error(f"Plate recognizer warm-up failed: {e}")
+            return
+        
+        scheduler = OcrBatchScheduler(
+            plate_recognizer,
+            max_batch=OCR_MAX_BATCH,
+            window=OCR_BATCH_WINDOW_MS / 1000,
+            enabled=OCR_BATCHING
+        )
+        scheduler.start()
+        ocr_scheduler = scheduler
+        
+        warmup_ms = (time.time() - start_time) * 1000
+        model_status.update(state='ready', error=None, warmup_time_ms=round(warmup_ms, 1))
+        model_ready.set()
+        app.logger.info(f"Plate recognizer ready! (pid {os.getpid()}, warm-up {warmup_ms:.0f}ms)")
+
+
+def start_model_loading(forked=False):
+    """Load the model in the background; /health/live answers meanwhile"""
+    threading.Thread(
+        target=init_recognizer, kwargs={'forked': forked}, name='model-loader', daemon=True
+    ).start()
+
+
+def wait_for_model():
+    """True once the model is warm; requests during start-up wait MODEL_WAIT_TIMEOUT"""
+    return model_ready.wait(timeout=MODEL_WAIT_TIMEOUT)
 
 
 @app.route('/health', methods=['GET'])
+@app.route('/health/live', methods=['GET'])
 def health():
-    """Health check endpoint"""
-    return jsonify({'status': 'ok', 'service': 'plate-recognizer'})
+    """Liveness: the process is up (the model may still be loading)"""
+    return jsonify({'status': 'ok', 'service': 'plate-recognizer', 'ready': model_ready.is_set()})
+
+
+@app.route('/health/ready', methods=['GET'])
+def health_ready():
+    """Readiness: 200 only when the model is loaded and warm, else 503"""
+    body = {'service': 'plate-recognizer', 'ready': model_ready.is_set(), **model_status}
+    return jsonify(body), 200 if model_ready.is_set() else 503
+
+
+@app.route('/api/stats', methods=['GET'])
+def stats():
+    """OCR micro-batching stats (batch sizes, queueing delay) for tuning"""
+    if ocr_scheduler is None:
+        return jsonify({'batching': None})
+    return jsonify({'batching': ocr_scheduler.stats()})
 
 
 @app.route('/api/recognize-plate', methods=['POST'])
@@ -205,7 +467,8 @@ def recognize_plate():
     Expects: multipart/form-data with 'image' file
     Returns: JSON with plate_text and confidence
     """
-    init_recognizer()
+    if not wait_for_model():
+        return jsonify({'success': False, 'error': 'Model not ready'}), 503
     
     try:
         # Check if image is in request
@@ -226,7 +489,7 @@ def recognize_plate():
         conf_threshold = float(request.args.get('confidence', 0.15))
         
         # Recognize
-        result = recognizer.recognize(img, conf_threshold)
+        result = ocr_scheduler.recognize(img, conf_threshold)
         
         if result['success']:
             app.logger.info(
@@ -242,6 +505,92 @@ def recognize_plate():
         return jsonify({'error': str(e)}), 500
 
 
+ZIP_MIMETYPES = ('application/zip', 'application/x-zip-compressed')
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.bmp')
+
+
+def iter_zip_images(fileobj):
+    """(filename, bytes) for every image inside a zip archive"""
+    with zipfile.ZipFile(fileobj) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or not info.filename.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            yield info.filename, archive.read(info)
+
+
+def iter_batch_uploads():
+    """
+    (filename, bytes) for every image of a batch request: multipart 'images'
+    (or 'image') files - zip files among them are expanded - or a raw zip body.
+    """
+    if request.mimetype in ZIP_MIMETYPES:
+        # zipfile needs a seekable file; spill large archives to disk
+        with tempfile.SpooledTemporaryFile(max_size=32 * 1024 * 1024) as spool:
+            shutil.copyfileobj(request.stream, spool)
+            spool.seek(0)
+            yield from iter_zip_images(spool)
+        return
+    
+    for file in request.files.getlist('images') + request.files.getlist('image'):
+        if file.mimetype in ZIP_MIMETYPES or (file.filename or '').lower().endswith('.zip'):
+            yield from iter_zip_images(file.stream)
+        else:
+            yield file.filename, file.read()
+
+
+@app.route('/api/recognize-plate/batch', methods=['POST'])
+def recognize_plate_batch():
+    """
+    Recognize many plate images in one request (e.g. re-OCR for audits).
+    
+    Expects: multipart/form-data with 'images' files (and/or .zip archives),
+    or an application/zip body. Query params: confidence, batch_size.
+    Returns: NDJSON stream, one line per image in upload order:
+    {'index', 'filename', 'success', 'plate_text', 'confidence', ...}
+    """
+    if not wait_for_model():
+        return jsonify({'success': False, 'error': 'Model not ready'}), 503
+    
+    conf_threshold = float(request.args.get('confidence', 0.15))
+    batch_size = max(1, min(int(request.args.get('batch_size', PLATE_BATCH_SIZE)), MAX_BATCH_SIZE))
+    
+    def run_batch(batch):
+        imgs = []
+        for _, _, img_bytes in batch:
+            img = cv2.imdecode(np.frombuffer(img_bytes, np.uint8), cv2.IMREAD_COLOR)
+            imgs.append(img)
+        
+        valid = [img for img in imgs if img is not None]
+        results = iter(ocr_scheduler.recognize_batch(valid, conf_threshold) if valid else [])
+        
+        for (index, filename, _), img in zip(batch, imgs):
+            result = next(results) if img is not None else {'success': False, 'error': 'Invalid image'}
+            yield json.dumps({'index': index, 'filename': filename, **result}) + '\n'
+    
+    def generate():
+        start_time = time.time()
+        count = 0
+        batch = []
+        try:
+            for filename, img_bytes in iter_batch_uploads():
+                batch.append((count, filename, img_bytes))
+                count += 1
+                if len(batch) >= batch_size:
+                    yield from run_batch(batch)
+                    batch = []
+            if batch:
+                yield from run_batch(batch)
+        except zipfile.BadZipFile as e:
+            yield json.dumps({'index': count, 'success': False, 'error': f'Invalid zip: {e}'}) + '\n'
+        
+        app.logger.info(
+            f"Batch recognized {count} images in {(time.time() - start_time) * 1000:.1f}ms "
+            f"(batch size {batch_size})"
+        )
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
 @app.route('/api/parking/process', methods=['POST'])
 def process_parking():
     """
@@ -250,21 +599,26 @@ def process_parking():
     Expects: multipart/form-data with 'image' file and form fields:
     - parkiran_id: int
     - gate_type: 'MASUK' or 'KELUAR'
+    - idempotency_key: event key (or Idempotency-Key header), the backend
+      answers retries/replays of a recorded event with the stored decision
+    - event_at: capture time on the edge (unix seconds)
+    - replayed: optional, set on offline queue replays
     
     Returns: JSON with gate_action and message
     """
-    init_recognizer()
+    if not wait_for_model():
+        return jsonify({'gate_action': 'DENY', 'error': 'Model not ready'}), 503
     start_time = time.time()
     
     try:
         # 1. Validate request
-        print(f"DEBUG: process_parking called", flush=True)
+        app.logger.debug("process_parking called")
         if 'image' not in request.files:
-            print(f"DEBUG: No image in request files. Files: {request.files}", flush=True)
+            app.logger.debug(f"No image in request files. Files: {request.files}")
             return jsonify({'gate_action': 'DENY', 'error': 'No image provided'}), 400
         
         file = request.files['image']
-        print(f"DEBUG: Image received: {file.filename}", flush=True)
+        app.logger.debug(f"Image received: {file.filename}")
 
         
         parkiran_id = request.form.get('parkiran_id')
@@ -292,7 +646,7 @@ def process_parking():
         if img is None:
             return jsonify({'gate_action': 'DENY', 'error': 'Invalid image'}), 400
         
-        result = recognizer.recognize(img)
+        result = ocr_scheduler.recognize(img)
         
         if not result['success'] or not result['plate_text']:
             return jsonify({
@@ -309,13 +663,17 @@ def process_parking():
         # 3. Forward to Node.js backend for validation
         try:
             # Prepare multipart/form-data
+            # Keep the edge device's file name / mime type (JPEG or WebP)
             files = {
-                'image': ('plate.jpg', img_bytes, 'image/jpeg')
+                'image': (file.filename or 'plate.jpg', img_bytes, file.mimetype or 'image/jpeg')
             }
             
             # Add face image if present
             if face_img_bytes:
-                files['face_image'] = ('face.jpg', face_img_bytes, 'image/jpeg')
+                files['face_image'] = (
+                    face_image_file.filename or 'face.jpg', face_img_bytes,
+                    face_image_file.mimetype or 'image/jpeg'
+                )
             
             data = {
                 'plate_text': plate_text,
@@ -324,16 +682,23 @@ def process_parking():
                 'gate_type': gate_type,
                 'face_detected': face_detected
             }
+            idempotency_key = request.form.get('idempotency_key') or request.headers.get('Idempotency-Key')
+            if idempotency_key:
+                data['idempotency_key'] = idempotency_key
+            # Offline queue replays from the edge: record the original event time
+            for field in ('event_at', 'replayed'):
+                if request.form.get(field):
+                    data[field] = request.form[field]
 
-            print(f"DEBUG: Forwarding to backend: {NODEJS_BACKEND_URL}/api/parkir/edge-entry", flush=True)
+            app.logger.debug(f"Forwarding to backend: {NODEJS_BACKEND_URL}/api/parkir/edge-entry")
             response = http_requests.post(
                 f"{NODEJS_BACKEND_URL}/api/parkir/edge-entry",
                 files=files,
                 data=data,
                 headers={'X-Edge-Secret': EDGE_DEVICE_SECRET},
-                timeout=10
+                timeout=BACKEND_TIMEOUT
             )
-            print(f"DEBUG: Backend response status: {response.status_code}", flush=True)
+            app.logger.debug(f"Backend response status: {response.status_code}")
             
             backend_result = response.json()
             
@@ -367,5 +732,8 @@ def parking_entry():
 
 
 if __name__ == '__main__':
+    # Load + warm the model while the server already answers liveness checks
+    start_model_loading()
+    
     # Run Flask app
     app.run(host='0.0.0.0', port=5001, debug=False)
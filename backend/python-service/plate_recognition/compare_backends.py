@@ -0,0 +1,132 @@
+"""
+ONNX vs Ultralytics Backend Parity + Speed Check
+=================================================
+
+Runs PlateRecognizer with both backends over a folder of plate crops and
+checks that the ONNX backend returns the same detections as the Ultralytics
+one (same characters, boxes/confidences within a tolerance), then reports
+per-crop latency of each backend:
+
+    python compare_backends.py --images plates/ \\
+        --pt models/license_plate_recognition.pt \\
+        --onnx models/license_plate_recognition.onnx
+
+Export the ONNX model from the same weights. A dynamic export
+(yolo export format=onnx dynamic=True) gets the same letterbox as the .pt
+model and should match exactly; a fixed 640x640 export pads differently,
+so expect small box differences there (raise --box-tol).
+
+Exits with status 1 when any crop does not match. tests/test_onnx_parity.py
+runs the same check without PyTorch against recorded Ultralytics outputs.
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from app import USE_ULTRALYTICS, PlateRecognizer
+
+
+MODEL_DIR = Path(__file__).parent / 'models'
+
+
+def load_images(images_dir, max_images):
+    paths = sorted(p for p in Path(images_dir).iterdir() if p.suffix.lower() in ('.jpg', '.jpeg', '.png'))
+    images = []
+    for path in paths[:max_images or None]:
+        img = cv2.imread(str(path))
+        if img is not None:
+            images.append((path.name, img))
+    return images
+
+
+def compare_detections(expected, actual, box_tol, conf_tol):
+    """Returns None when both detection lists match, else a reason"""
+    if len(expected) != len(actual):
+        return f"{len(expected)} vs {len(actual)} detections"
+    for i, (e, a) in enumerate(zip(expected, actual)):
+        if e['class_id'] != a['class_id']:
+            return f"#{i}: class {e['character']} vs {a['character']}"
+        box_diff = max(abs(e[k] - a[k]) for k in ('x1', 'y1', 'x2', 'y2'))
+        if box_diff > box_tol:
+            return f"#{i}: box differs by {box_diff:.2f}px"
+        if abs(e['confidence'] - a['confidence']) > conf_tol:
+            return f"#{i}: confidence {e['confidence']:.4f} vs {a['confidence']:.4f}"
+    return None
+
+
+def time_backend(fn, images, conf, iterations):
+    times = []
+    for _ in range(iterations):
+        for _, img in images:
+            start = time.perf_counter()
+            fn(img, conf)
+            times.append(time.perf_counter() - start)
+    times = np.array(times) * 1000
+    return np.percentile(times, 50), np.percentile(times, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check ONNX backend parity and speed against Ultralytics')
+    parser.add_argument('--images', type=str, required=True, help='Folder of plate crops')
+    parser.add_argument('--pt', type=str, default=str(MODEL_DIR / 'license_plate_recognition.pt'))
+    parser.add_argument('--onnx', type=str, default=str(MODEL_DIR / 'license_plate_recognition.onnx'))
+    parser.add_argument('--classes', type=str, default=str(MODEL_DIR / 'classes.names'))
+    parser.add_argument('--confidence', type=float, default=0.15, help='Same default as /api/recognize-plate')
+    parser.add_argument('--box-tol', type=float, default=0.5, help='Max box coordinate difference (px)')
+    parser.add_argument('--conf-tol', type=float, default=1e-3, help='Max confidence difference')
+    parser.add_argument('--iterations', type=int, default=3, help='Timing passes over the crops')
+    parser.add_argument('--max-images', type=int, default=0, help='Use at most N crops (0 = all)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    if not USE_ULTRALYTICS:
+        print("❌ ultralytics is not installed, nothing to compare against")
+        sys.exit(2)
+
+    images = load_images(args.images, args.max_images)
+    if not images:
+        print(f"❌ No images in {args.images}")
+        sys.exit(2)
+
+    reference = PlateRecognizer(args.pt, args.classes)
+    candidate = PlateRecognizer(args.onnx, args.classes)
+
+    mismatches = 0
+    same_text = 0
+    for name, img in images:
+        expected = reference.recognize_ultralytics(img, args.confidence)
+        actual = candidate.recognize_onnx(img, args.confidence)
+        width = img.shape[1]
+        if reference.reconstruct_plate_text(expected, width)[0] == candidate.reconstruct_plate_text(actual, width)[0]:
+            same_text += 1
+        reason = compare_detections(expected, actual, args.box_tol, args.conf_tol)
+        if reason:
+            mismatches += 1
+            print(f"  ≠ {name}: {reason}")
+
+    # Warm-up both backends before timing
+    reference.recognize_ultralytics(images[0][1], args.confidence)
+    candidate.recognize_onnx(images[0][1], args.confidence)
+    pt_p50, pt_p95 = time_backend(reference.recognize_ultralytics, images, args.confidence, args.iterations)
+    onnx_p50, onnx_p95 = time_backend(candidate.recognize_onnx, images, args.confidence, args.iterations)
+
+    print("\n" + "=" * 60)
+    print(f"✅ BACKEND PARITY ({len(images)} crops)")
+    print("=" * 60)
+    print(f"Identical detections: {len(images) - mismatches}/{len(images)}")
+    print(f"Identical plate text: {same_text}/{len(images)}")
+    print(f"Ultralytics: p50={pt_p50:.1f}ms p95={pt_p95:.1f}ms")
+    print(f"ONNX:        p50={onnx_p50:.1f}ms p95={onnx_p95:.1f}ms ({pt_p50 / onnx_p50:.2f}x)")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
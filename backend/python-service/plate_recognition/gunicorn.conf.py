@@ -0,0 +1,40 @@
+"""
+Gunicorn config - pre-fork multi-worker serving for the plate service
+=====================================================================
+
+    gunicorn -c gunicorn.conf.py
+
+WEB_CONCURRENCY worker processes (default: one per 2 cores) each serve
+GUNICORN_THREADS request threads, which feed the worker's OCR micro-batcher.
+Math libraries get cores / workers threads each (MODEL_THREADS overrides),
+set here before the app - and numpy/torch/onnxruntime - is imported.
+Each worker warms its model in the background once it is up (readiness).
+"""
+
+import multiprocessing
+import os
+
+cores = multiprocessing.cpu_count()
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5001')}"
+workers = int(os.getenv('WEB_CONCURRENCY', max(1, cores // 2)))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+wsgi_app = 'wsgi:app'
+preload_app = True  # Load the model once in the master, before fork
+timeout = 60
+graceful_timeout = 30
+accesslog = '-'
+
+# Cap per-worker compute threads so workers do not oversubscribe the cores
+model_threads = os.getenv('MODEL_THREADS') or str(max(1, cores // workers))
+for var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'ORT_INTRA_OP_THREADS'):
+    os.environ.setdefault(var, model_threads)
+
+
+def post_worker_init(worker):
+    # Threads (ORT pools, OCR scheduler) do not survive fork: set up per worker.
+    # Warm-up runs in the background so the worker's heartbeat is not held up
+    # by it (timeout); /health/ready reports 503 and requests wait meanwhile.
+    from app import start_model_loading
+    start_model_loading(forked=True)
@@ -0,0 +1,202 @@
+"""
+Micro-Batching Scheduler for Concurrent OCR Requests
+=====================================================
+
+At rush hour several gates call /api/parking/process at the same moment and
+every request thread used to call recognizer.recognize on the shared model
+concurrently. OcrBatchScheduler owns the model instead:
+
+- request threads submit their plate image and wait for their own result
+- one worker thread coalesces requests arriving within `window` seconds (or
+  until `max_batch` are waiting) into one PlateRecognizer.recognize_batch call
+- only the worker (or a holder of the model lock) ever touches the model
+
+Batch-size distribution, queueing delay and batch inference time are kept
+so window/max_batch can be tuned (GET /api/stats).
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+
+class _OcrRequest:
+    """One caller's image waiting for the next batch"""
+
+    def __init__(self, img, conf_threshold):
+        self.img = img
+        self.conf_threshold = conf_threshold
+        self.submitted_at = time.time()
+        self.done = threading.Event()
+        self.result = None
+
+
+def _percentiles(values):
+    if not values:
+        return {'count': 0}
+    values = sorted(values)
+
+    def pick(pct):
+        return values[min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))] * 1000
+
+    return {'count': len(values), 'p50_ms': pick(50), 'p95_ms': pick(95), 'max_ms': values[-1] * 1000}
+
+
+class OcrBatchScheduler:
+    """Coalesces concurrent recognize() calls into batched model calls"""
+
+    def __init__(self, recognizer, max_batch=8, window=0.008, enabled=True, stats_window=1000):
+        """
+        Args:
+            recognizer: PlateRecognizer (shared model)
+            max_batch: images per model call
+            window: max time the first request of a batch waits for others (seconds)
+            enabled: False = no batching, calls are only serialized on the model lock
+            stats_window: recent samples kept for delay percentiles
+        """
+        self.logger = logging.getLogger(__name__)
+        self.recognizer = recognizer
+        self.max_batch = max(1, max_batch)
+        self.window = window
+        self.enabled = enabled and self.max_batch > 1
+
+        self.model_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._pending = []
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        # Metrics
+        self._stats_lock = threading.Lock()
+        self.batch_sizes = {}
+        self.requests = 0
+        self.batches = 0
+        self.window_flushes = 0
+        self._queue_delays = deque(maxlen=stats_window)
+        self._batch_times = deque(maxlen=stats_window)
+
+    def start(self):
+        if not self.enabled or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run_loop, name='ocr-batcher', daemon=True)
+        self._thread.start()
+        self.logger.info(f"OCR micro-batching: up to {self.max_batch} images, window {self.window * 1000:.1f}ms")
+
+    def stop(self):
+        self._stop_event.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def recognize(self, img, conf_threshold=0.25):
+        """Same result as PlateRecognizer.recognize, possibly batched with other callers"""
+        if not self.enabled:
+            submitted_at = time.time()
+            with self.model_lock:
+                # Lock wait is queueing delay, batch time starts once we hold it
+                start = time.time()
+                self._record([submitted_at], start)
+                result = self.recognizer.recognize(img, conf_threshold)
+                self._record_batch_time(time.time() - start)
+            return result
+
+        request = _OcrRequest(img, conf_threshold)
+        with self._cond:
+            self._pending.append(request)
+            self._cond.notify_all()
+
+        while not request.done.wait(timeout=0.5):
+            if self._stop_event.is_set():
+                return {'success': False, 'error': 'OCR scheduler stopped'}
+        return request.result
+
+    def recognize_batch(self, imgs, conf_threshold=0.25):
+        """Caller-built batch (batch endpoint), run exclusively on the model"""
+        with self.model_lock:
+            return self.recognizer.recognize_batch(imgs, conf_threshold)
+
+    def _collect_batch(self):
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending or self._stop_event.is_set())
+            if self._stop_event.is_set():
+                return []
+
+            # Requests with another confidence threshold go into a later batch
+            conf_threshold = self._pending[0].conf_threshold
+            deadline = self._pending[0].submitted_at + self.window
+            while not self._stop_event.is_set():
+                matching = [r for r in self._pending if r.conf_threshold == conf_threshold]
+                if len(matching) >= self.max_batch:
+                    break
+                now = time.time()
+                if now >= deadline:
+                    if len(matching) > 1:
+                        self.window_flushes += 1
+                    break
+                self._cond.wait(timeout=deadline - now)
+
+            batch = [r for r in self._pending if r.conf_threshold == conf_threshold][:self.max_batch]
+            for request in batch:
+                self._pending.remove(request)
+            return batch
+
+    def _run_loop(self):
+        while not self._stop_event.is_set():
+            batch = self._collect_batch()
+            if not batch:
+                continue
+            try:
+                with self.model_lock:
+                    # The batch endpoint may hold the lock: that wait is queueing delay
+                    start = time.time()
+                    self._record([r.submitted_at for r in batch], start)
+                    try:
+                        results = self.recognizer.recognize_batch([r.img for r in batch], batch[0].conf_threshold)
+                    finally:
+                        self._record_batch_time(time.time() - start)
+            except Exception as e:
+                self.logger.error(f"OCR batch error: {e}")
+                results = [{'success': False, 'error': str(e)}] * len(batch)
+
+            for request, result in zip(batch, results):
+                request.result = result
+                request.done.set()
+
+    def _record(self, submitted_at, started_at):
+        with self._stats_lock:
+            size = len(submitted_at)
+            self.batch_sizes[size] = self.batch_sizes.get(size, 0) + 1
+            self.batches += 1
+            self.requests += size
+            self._queue_delays.extend(started_at - t for t in submitted_at)
+
+    def _record_batch_time(self, seconds):
+        with self._stats_lock:
+            self._batch_times.append(seconds)
+
+    def stats(self):
+        """Batch-size distribution, queueing delay and batch time percentiles"""
+        with self._stats_lock:
+            sizes = dict(sorted(self.batch_sizes.items()))
+            delays = list(self._queue_delays)
+            batch_times = list(self._batch_times)
+            requests, batches = self.requests, self.batches
+        with self._cond:
+            pending = len(self._pending)
+
+        return {
+            'enabled': self.enabled,
+            'max_batch': self.max_batch,
+            'window_ms': self.window * 1000,
+            'requests': requests,
+            'batches': batches,
+            'avg_batch_size': requests / batches if batches else 0.0,
+            'batch_sizes': {str(size): count for size, count in sizes.items()},
+            'window_flushes': self.window_flushes,
+            'pending': pending,
+            'queue_delay': _percentiles(delays),
+            'batch_time': _percentiles(batch_times)
+        }
@@ -0,0 +1,132 @@
+"""
+YOLOv8 ONNX Pre/Postprocessing (no PyTorch)
+============================================
+
+NumPy re-implementation of what Ultralytics does around the model, so the
+ONNX backend of PlateRecognizer returns the same detections as
+recognize_ultralytics without installing torch:
+
+- letterbox: same scale/rounding/padding as ultralytics LetterBox (pad 114),
+  BGR -> RGB, /255
+- decode: [1, 4 + nc, N] output, class argmax, score > conf, xywh -> xyxy
+- per-class NMS (class offset trick, IoU > iou_threshold suppressed, like
+  torchvision.ops.nms), at most max_det boxes, highest score first
+- scale_boxes: undo the letterbox and clip to the original image
+"""
+
+import cv2
+import numpy as np
+
+
+# Ultralytics predict() defaults
+NMS_IOU = 0.7
+MAX_DET = 300
+MAX_NMS = 30000
+MAX_WH = 7680  # Per-class box offset for batched NMS
+STRIDE = 32
+
+
+def letterbox(img, new_shape=(640, 640), auto=False, stride=STRIDE):
+    """
+    Resize keeping aspect ratio and pad to new_shape (h, w).
+
+    auto=True pads only up to a multiple of stride (what Ultralytics does for
+    .pt models and dynamic-shape exports). Returns the padded BGR image.
+    """
+    shape = img.shape[:2]
+    r = min(new_shape[0] / shape[0], new_shape[1] / shape[1])
+
+    new_unpad = int(round(shape[1] * r)), int(round(shape[0] * r))
+    dw, dh = new_shape[1] - new_unpad[0], new_shape[0] - new_unpad[1]
+    if auto:
+        dw, dh = np.mod(dw, stride), np.mod(dh, stride)
+    dw /= 2
+    dh /= 2
+
+    if shape[::-1] != new_unpad:
+        img = cv2.resize(img, new_unpad, interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+    left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+    return cv2.copyMakeBorder(img, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114))
+
+
+def to_input_tensor(img):
+    """Letterboxed BGR image -> [1, 3, h, w] float32 RGB in [0, 1]"""
+    tensor = np.ascontiguousarray(img[..., ::-1].transpose(2, 0, 1)[None])
+    return tensor.astype(np.float32) / np.float32(255.0)
+
+
+def nms(boxes, scores, iou_threshold):
+    """
+    Greedy NMS on xyxy boxes, suppressing IoU > iou_threshold.
+
+    Returns: indices of kept boxes, highest score first
+    """
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = (x2 - x1) * (y2 - y1)
+    order = np.argsort(-scores, kind='stable')
+
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        w = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        h = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        inter = w * h
+        iou = inter / (areas[i] + areas[rest] - inter)
+        order = rest[iou <= iou_threshold]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def decode(output, conf_threshold, iou_threshold=NMS_IOU, max_det=MAX_DET):
+    """
+    Decode a YOLOv8 detection output with per-class NMS.
+
+    Args:
+        output: [1, 4 + nc, N] or [4 + nc, N] model output (input space)
+
+    Returns: (boxes_xyxy float32 [K, 4], scores [K], class_ids [K]),
+    highest score first
+    """
+    output = np.asarray(output, dtype=np.float32)
+    if output.ndim == 3:
+        output = output[0]
+
+    class_scores = output[4:]
+    class_ids = class_scores.argmax(axis=0)
+    scores = class_scores[class_ids, np.arange(class_scores.shape[1])]
+
+    mask = scores > conf_threshold
+    if not mask.any():
+        return np.empty((0, 4), np.float32), np.empty(0, np.float32), np.empty(0, np.int64)
+
+    xywh = output[:4, mask].T
+    scores, class_ids = scores[mask], class_ids[mask]
+    if len(scores) > MAX_NMS:
+        top = np.argsort(-scores, kind='stable')[:MAX_NMS]
+        xywh, scores, class_ids = xywh[top], scores[top], class_ids[top]
+
+    boxes = np.empty_like(xywh)
+    boxes[:, :2] = xywh[:, :2] - xywh[:, 2:] / 2
+    boxes[:, 2:] = xywh[:, :2] + xywh[:, 2:] / 2
+
+    # Offset boxes per class so one NMS pass never suppresses across classes
+    offsets = (class_ids.astype(np.float32) * MAX_WH)[:, None]
+    keep = nms(boxes + offsets, scores, iou_threshold)[:max_det]
+    return boxes[keep], scores[keep], class_ids[keep].astype(np.int64)
+
+
+def scale_boxes(input_shape, boxes, img_shape):
+    """Map boxes from the letterboxed input (h, w) back to the original image"""
+    gain = min(input_shape[0] / img_shape[0], input_shape[1] / img_shape[1])
+    pad_x = round((input_shape[1] - img_shape[1] * gain) / 2 - 0.1)
+    pad_y = round((input_shape[0] - img_shape[0] * gain) / 2 - 0.1)
+
+    boxes = boxes.copy()
+    boxes[:, [0, 2]] -= pad_x
+    boxes[:, [1, 3]] -= pad_y
+    boxes /= gain
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, img_shape[1])
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, img_shape[0])
+    return boxes
@@ -0,0 +1,161 @@
+"""
+Generate the ONNX parity fixture (needs ultralytics + torch)
+============================================================
+
+test_onnx_parity.py checks recognize_onnx against recorded
+recognize_ultralytics outputs without installing PyTorch. The real
+recognition weights are not in the repo, and the pre/postprocessing under
+test (letterbox, class argmax, per-class NMS, scale_boxes) does not depend
+on trained weights, so the fixture uses a small untrained 36-class YOLOv8:
+
+- BatchNorm statistics are taken from the crops and the class/box heads are
+  rescaled, so it produces many overlapping boxes over several classes
+  (random init alone gives near-constant scores)
+- the crops have different sizes and aspect ratios (upscaled, downscaled,
+  portrait) to exercise the letterbox and box mapping
+- expected.json holds PlateRecognizer.recognize_ultralytics and
+  recognize_ultralytics_batch outputs for the crops
+
+    python tests/make_parity_fixture.py
+
+Re-run after changing how recognize_ultralytics is called, then commit
+tests/fixtures/onnx_parity/.
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import cv2
+import numpy as np
+import torch
+import ultralytics
+import yaml
+from ultralytics import YOLO
+from ultralytics.data.augment import LetterBox
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from app import PlateRecognizer  # noqa: E402
+
+
+FIXTURE_DIR = Path(__file__).parent / 'fixtures' / 'onnx_parity'
+CLASSES_PATH = Path(__file__).resolve().parent.parent / 'models' / 'classes.names'
+CONF_THRESHOLD = 0.15  # /api/recognize-plate default
+
+# (width, height, text): wide crop, tiny upscaled crop, portrait, large crop
+CROPS = [
+    (640, 160, 'B 1234 CD'),
+    (200, 100, 'D 77 XY'),
+    (300, 400, 'AB 12'),
+    (1000, 250, 'L 9012 KZ'),
+]
+SEED = 0
+CLS_BIAS = -6.0
+CLS_STD = 1.5
+BOX_STD = 1.0
+
+
+def make_crop(width, height, text):
+    """Synthetic plate crop: light gradient, dark border and characters"""
+    x = np.linspace(0, 1, width)[None, :, None]
+    y = np.linspace(0, 1, height)[:, None, None]
+    img = (205 + 30 * x + 20 * y).repeat(3, axis=2).astype(np.uint8)
+    cv2.rectangle(img, (2, 2), (width - 3, height - 3), (20, 20, 20), max(1, height // 40))
+    scale = height / 60
+    cv2.putText(img, text, (int(width * 0.06), int(height * 0.68)), cv2.FONT_HERSHEY_SIMPLEX,
+                scale, (15, 15, 15), max(1, int(scale * 2.5)))
+    return img
+
+
+def build_model(imgs, workdir):
+    torch.manual_seed(SEED)
+    cfg = yaml.safe_load((Path(ultralytics.__file__).parent / 'cfg' / 'models' / 'v8' / 'yolov8.yaml').read_text())
+    cfg.update(nc=36, scales={'t': [0.1, 0.0625, 64]}, scale='t')
+    cfg_path = workdir / 'parity.yaml'
+    cfg_path.write_text(yaml.safe_dump(cfg))
+
+    model = YOLO(str(cfg_path))
+    net, head = model.model, model.model.model[-1]
+    # Calibrate on what predict() feeds the model: each crop letterboxed
+    # (auto=True, stride 32) on its own
+    letterbox = LetterBox((640, 640), auto=True, stride=32)
+    inputs = [
+        torch.from_numpy(letterbox(image=img)[..., ::-1].copy()).permute(2, 0, 1)[None].float() / 255
+        for img in imgs
+    ]
+
+    with torch.no_grad():
+        for module in net.modules():
+            if isinstance(module, torch.nn.BatchNorm2d):
+                module.reset_running_stats()
+                module.momentum = None
+        net.train()
+        for x in inputs:
+            net(x)
+        net.eval()
+
+        outputs = {}
+        hooks = [
+            seq[-1].register_forward_hook(lambda _m, _i, out, key=key: outputs.setdefault(key, []).append(out))
+            for key, heads in (('cls', head.cv3), ('box', head.cv2)) for seq in heads
+        ]
+        for x in inputs:
+            net(x)
+        for hook in hooks:
+            hook.remove()
+
+        for key, heads, target, bias in (('cls', head.cv3, CLS_STD, CLS_BIAS), ('box', head.cv2, BOX_STD, 0.0)):
+            std = torch.cat([out.flatten() for out in outputs[key]]).std().item()
+            for seq in heads:
+                seq[-1].weight.mul_(target / std)
+                seq[-1].bias.fill_(bias)
+    return model
+
+
+def main():
+    FIXTURE_DIR.mkdir(parents=True, exist_ok=True)
+    names = []
+    imgs = []
+    for i, (width, height, text) in enumerate(CROPS):
+        name = f'crop_{i}_{width}x{height}.png'
+        cv2.imwrite(str(FIXTURE_DIR / name), make_crop(width, height, text))
+        # Read back so the model sees exactly what the test will load
+        imgs.append(cv2.imread(str(FIXTURE_DIR / name)))
+        names.append(name)
+
+    workdir = Path(tempfile.mkdtemp())
+    cwd = os.getcwd()
+    try:
+        os.chdir(workdir)
+        model = build_model(imgs, workdir)
+
+        reference = PlateRecognizer.__new__(PlateRecognizer)
+        reference.class_names = CLASSES_PATH.read_text().split()
+        reference.model = model
+        reference.use_ultralytics = True
+
+        single = {name: reference.recognize_ultralytics(img, CONF_THRESHOLD) for name, img in zip(names, imgs)}
+        batch = reference.recognize_ultralytics_batch(imgs, CONF_THRESHOLD)
+
+        exported = model.export(format='onnx', dynamic=True, simplify=False, opset=17)
+        shutil.copy(exported, FIXTURE_DIR / 'model.onnx')
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    expected = {
+        'ultralytics_version': ultralytics.__version__,
+        'conf_threshold': CONF_THRESHOLD,
+        'single': single,
+        'batch': dict(zip(names, batch))
+    }
+    (FIXTURE_DIR / 'expected.json').write_text(json.dumps(expected, indent=1) + '\n')
+    for name in names:
+        print(f"{name}: {len(single[name])} detections (batch: {len(expected['batch'][name])})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Queueing delay vs batch time accounting in OcrBatchScheduler"""
+
+import threading
+import time
+
+import pytest
+
+from ocr_scheduler import OcrBatchScheduler
+
+
+LOCK_HELD = 0.2
+INFERENCE = 0.05
+
+
+class SlowRecognizer:
+    def recognize(self, img, conf_threshold=0.25):
+        time.sleep(INFERENCE)
+        return {'success': True, 'plate_text': img}
+
+    def recognize_batch(self, imgs, conf_threshold=0.25):
+        time.sleep(INFERENCE)
+        return [{'success': True, 'plate_text': img} for img in imgs]
+
+
+def hold_model_lock(scheduler):
+    """Simulates the batch endpoint owning the model for LOCK_HELD seconds"""
+    acquired = threading.Event()
+
+    def hold():
+        with scheduler.model_lock:
+            acquired.set()
+            time.sleep(LOCK_HELD)
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    acquired.wait()
+    return thread
+
+
+@pytest.mark.parametrize('enabled', [False, True])
+def test_lock_wait_counts_as_queueing_delay(enabled):
+    scheduler = OcrBatchScheduler(SlowRecognizer(), max_batch=4, window=0.001, enabled=enabled)
+    scheduler.start()
+    try:
+        holder = hold_model_lock(scheduler)
+        assert scheduler.recognize('B1234CD')['plate_text'] == 'B1234CD'
+        holder.join()
+    finally:
+        scheduler.stop()
+
+    stats = scheduler.stats()
+    assert stats['requests'] == 1
+    assert stats['queue_delay']['max_ms'] >= LOCK_HELD * 1000 * 0.9
+    assert INFERENCE * 1000 * 0.9 <= stats['batch_time']['max_ms'] < LOCK_HELD * 1000
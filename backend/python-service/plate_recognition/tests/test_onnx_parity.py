@@ -0,0 +1,82 @@
+"""
+ONNX backend parity with recorded Ultralytics outputs.
+
+fixtures/onnx_parity holds a small dynamic ONNX export, plate crops of
+different sizes/aspect ratios and what recognize_ultralytics /
+recognize_ultralytics_batch returned for them (make_parity_fixture.py).
+Detections go through letterbox, per-class NMS and scale_boxes, so any drift
+in that decode shows up here without installing PyTorch.
+"""
+
+import json
+from pathlib import Path
+
+import cv2
+import pytest
+
+pytest.importorskip('onnxruntime')
+
+from app import PlateRecognizer  # noqa: E402
+from compare_backends import compare_detections  # noqa: E402
+
+
+FIXTURE_DIR = Path(__file__).parent / 'fixtures' / 'onnx_parity'
+CLASSES_PATH = Path(__file__).resolve().parent.parent / 'models' / 'classes.names'
+EXPECTED = json.loads((FIXTURE_DIR / 'expected.json').read_text())
+CONF = EXPECTED['conf_threshold']
+BOX_TOL = 0.5
+CONF_TOL = 1e-3
+
+
+@pytest.fixture(scope='module')
+def recognizer():
+    return PlateRecognizer(str(FIXTURE_DIR / 'model.onnx'), str(CLASSES_PATH))
+
+
+def load_crop(name):
+    img = cv2.imread(str(FIXTURE_DIR / name))
+    assert img is not None, name
+    return img
+
+
+def test_fixture_covers_letterbox_cases():
+    # Wide, upscaled, portrait and downscaled crops, all with detections
+    assert len(EXPECTED['single']) >= 4
+    assert all(EXPECTED['single'].values())
+
+
+def test_dynamic_export_detected(recognizer):
+    assert recognizer.dynamic_input
+    assert recognizer.dynamic_batch
+
+
+@pytest.mark.parametrize('name', sorted(EXPECTED['single']))
+def test_single_matches_ultralytics(recognizer, name):
+    img = load_crop(name)
+    expected = EXPECTED['single'][name]
+    actual = recognizer.recognize_onnx(img, CONF)
+
+    assert compare_detections(expected, actual, BOX_TOL, CONF_TOL) is None
+
+    plate_text, _ = recognizer.reconstruct_plate_text(expected, img.shape[1])
+    assert recognizer.recognize(img, CONF)['plate_text'] == plate_text
+
+
+def test_batch_matches_ultralytics(recognizer):
+    names = list(EXPECTED['batch'])
+    actual = recognizer.recognize_onnx_batch([load_crop(name) for name in names], CONF)
+
+    assert len(actual) == len(names)
+    for name, detections in zip(names, actual):
+        assert compare_detections(EXPECTED['batch'][name], detections, BOX_TOL, CONF_TOL) is None, name
+
+
+def test_batch_matches_single(recognizer):
+    # Crops 0 and 3 letterbox to the same shape and share one run; a batch
+    # must not change the letterbox (and detections) of any crop
+    names = sorted(EXPECTED['single']) + [sorted(EXPECTED['single'])[0]]
+    imgs = [load_crop(name) for name in names]
+    batch = recognizer.recognize_onnx_batch(imgs, CONF)
+
+    for name, img, detections in zip(names, imgs, batch):
+        assert compare_detections(recognizer.recognize_onnx(img, CONF), detections, 1e-3, 1e-5) is None, name
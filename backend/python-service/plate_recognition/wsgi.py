@@ -0,0 +1,12 @@
+"""
+Production entry point: gunicorn -c gunicorn.conf.py
+
+With preload_app the master imports this module once, so the model is
+loaded before the workers are forked (PyTorch weights shared copy-on-write).
+Every worker then opens its own ONNX session, warms up and starts its OCR
+scheduler in the background (post_worker_init), like the dev server.
+"""
+
+from app import app, load_model
+
+load_model()
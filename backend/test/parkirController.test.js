@@ -8,7 +8,7 @@
 // Mock dependencies
 jest.mock('../utils/prisma', () => ({
     kendaraan: { findMany: jest.fn(), findFirst: jest.fn() },
-    logParkir: { count: jest.fn(), findMany: jest.fn(), findFirst: jest.fn(), create: jest.fn(), update: jest.fn() },
+    logParkir: { count: jest.fn(), findMany: jest.fn(), findFirst: jest.fn(), findUnique: jest.fn(), create: jest.fn(), update: jest.fn() },
     parkiran: { findUnique: jest.fn() },
     $queryRaw: jest.fn(),
     $executeRaw: jest.fn(),
@@ -229,4 +229,143 @@ describe('Parkir Controller - processEdgeEntry', () => {
             }));
         });
     });
+
+    /**
+     * IDEMPOTENT RETRY SCENARIOS
+     */
+    describe('Idempotency key', () => {
+        const keyBody = { ...validBody, idempotency_key: 'abc123' };
+        const recordedLog = {
+            id_log_parkir: 100,
+            type: 'MASUK',
+            idempotency_key: 'abc123',
+            kendaraan: { plat_nomor: 'D1234ABC' },
+            parkiran: { nama_parkiran: 'Gedung A' },
+            user: { nama: 'User' }
+        };
+
+        test('should return the stored decision for a recorded event', async () => {
+            prisma.logParkir.findUnique.mockResolvedValueOnce(recordedLog);
+
+            const req = createMockReq(keyBody, validHeaders);
+            const res = createMockRes();
+
+            await parkirController.processEdgeEntry(req, res);
+
+            expect(prisma.logParkir.findUnique).toHaveBeenCalledWith(expect.objectContaining({
+                where: { idempotency_key: 'abc123' }
+            }));
+            expect(prisma.$transaction).not.toHaveBeenCalled();
+            expect(res.status).toHaveBeenCalledWith(200);
+            expect(res.json).toHaveBeenCalledWith(expect.objectContaining({
+                gate_action: 'OPEN',
+                duplicate: true
+            }));
+        });
+
+        test('should not deny a retry whose first attempt was just recorded', async () => {
+            prisma.logParkir.findUnique.mockResolvedValueOnce(null);
+            prisma.kendaraan.findFirst.mockResolvedValue({ id_kendaraan: 1, plat_nomor: 'D1234ABC' });
+            prisma.$queryRaw.mockResolvedValueOnce([{
+                id_parkiran: 1, kapasitas: 100, live_kapasitas: 50
+            }]);
+            // Latest log is this event, recorded by the first attempt
+            prisma.logParkir.findFirst.mockResolvedValue({ type: 'MASUK', idempotency_key: 'abc123' });
+
+            const req = createMockReq(keyBody, validHeaders);
+            const res = createMockRes();
+
+            await parkirController.processEdgeEntry(req, res);
+
+            expect(res.status).toHaveBeenCalledWith(200);
+            expect(res.json).toHaveBeenCalledWith(expect.objectContaining({
+                gate_action: 'OPEN',
+                duplicate: true
+            }));
+        });
+
+        test('should return the stored decision when a concurrent retry wins the insert', async () => {
+            prisma.logParkir.findUnique.mockResolvedValueOnce(null);
+            prisma.kendaraan.findFirst.mockResolvedValue({ id_kendaraan: 1, plat_nomor: 'D1234ABC' });
+            prisma.$queryRaw.mockResolvedValueOnce([{
+                id_parkiran: 1, kapasitas: 100, live_kapasitas: 50
+            }]);
+            prisma.logParkir.findFirst.mockResolvedValue(null);
+            prisma.$transaction.mockRejectedValueOnce(Object.assign(new Error('Unique constraint'), { code: 'P2002' }));
+
+            const req = createMockReq(keyBody, validHeaders);
+            const res = createMockRes();
+
+            await parkirController.processEdgeEntry(req, res);
+
+            expect(sendParkingNotification).not.toHaveBeenCalled();
+            expect(res.status).toHaveBeenCalledWith(200);
+            expect(res.json).toHaveBeenCalledWith(expect.objectContaining({ duplicate: true }));
+        });
+    });
+
+    /**
+     * OFFLINE QUEUE REPLAY SCENARIOS
+     */
+    describe('Replayed events', () => {
+        const eventAt = 1767225600; // 2026-01-01T00:00:00Z
+        const replayBody = { ...validBody, event_at: String(eventAt), replayed: 'true' };
+
+        beforeEach(() => {
+            prisma.kendaraan.findFirst.mockResolvedValue({
+                id_kendaraan: 1,
+                plat_nomor: 'D1234ABC',
+                user: { id_user: 1, nama: 'User' }
+            });
+            prisma.$queryRaw.mockResolvedValueOnce([{
+                id_parkiran: 1, nama_parkiran: 'Gedung A', kapasitas: 100, live_kapasitas: 50
+            }]);
+        });
+
+        test('should record the original event time without notification', async () => {
+            prisma.logParkir.findFirst.mockResolvedValue(null);
+            prisma.logParkir.create.mockImplementation((args) => args);
+            prisma.$transaction.mockResolvedValue([{ id_log_parkir: 102 }, 1]);
+
+            const req = createMockReq(replayBody, validHeaders);
+            const res = createMockRes();
+
+            await parkirController.processEdgeEntry(req, res);
+
+            expect(prisma.logParkir.create).toHaveBeenCalledWith({
+                data: expect.objectContaining({ timestamp: new Date(eventAt * 1000) })
+            });
+            expect(sendParkingNotification).not.toHaveBeenCalled();
+            expect(res.status).toHaveBeenCalledWith(200);
+        });
+
+        test('should skip a replay that is already recorded', async () => {
+            prisma.logParkir.findFirst.mockResolvedValue({
+                type: 'MASUK', timestamp: new Date((eventAt - 5) * 1000)
+            });
+
+            const req = createMockReq(replayBody, validHeaders);
+            const res = createMockRes();
+
+            await parkirController.processEdgeEntry(req, res);
+
+            expect(prisma.$transaction).not.toHaveBeenCalled();
+            expect(res.status).toHaveBeenCalledWith(409);
+            expect(res.json).toHaveBeenCalledWith(expect.objectContaining({ replayed: true }));
+        });
+
+        test('should skip a replay older than the latest log', async () => {
+            prisma.logParkir.findFirst.mockResolvedValue({
+                type: 'KELUAR', timestamp: new Date((eventAt + 60) * 1000)
+            });
+
+            const req = createMockReq(replayBody, validHeaders);
+            const res = createMockRes();
+
+            await parkirController.processEdgeEntry(req, res);
+
+            expect(prisma.$transaction).not.toHaveBeenCalled();
+            expect(res.status).toHaveBeenCalledWith(409);
+        });
+    });
 });
@@ -0,0 +1,208 @@
+"""
+Compare Detection Models (.pt vs FP32 ONNX vs INT8 ONNX)
+=========================================================
+
+Script untuk membandingkan akurasi dan kecepatan model deteksi plat nomor
+side by side, sebelum men-deploy model INT8 ke Raspberry Pi.
+
+Builds on test_detection.py: .pt models run through Ultralytics, ONNX models
+run through the same preprocessing/decoding code as the edge device
+(edge_device/preprocess.py + edge_device/yolo_decode.py).
+
+Reports per model: AP@0.5, recall@0.5 at the operating confidence, latency
+p50/p95 (preprocess + inference + postprocess) and model size.
+
+Run:
+    python compare_models.py --images dataset/images/test --labels dataset/labels/test \\
+        --pt models/detection/license_plate_detection.pt \\
+        --onnx models/detection/license_plate_detection.onnx \\
+        --int8 edge_device/models/license_plate_detection.int8.onnx
+
+Models with a rectangular input (model.img_size: [256, 480]) are compared at
+that shape with --img-size 256 480.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent / 'edge_device'))
+from preprocess import LetterboxPreprocessor, parse_input_size  # noqa: E402
+from tracker import iou_matrix  # noqa: E402
+from yolo_decode import decode_detections  # noqa: E402
+
+
+def load_labels(label_path, img_shape):
+    """YOLO txt labels (class cx cy w h, normalized) -> xyxy pixel boxes"""
+    h, w = img_shape[:2]
+    boxes = []
+    if label_path.exists():
+        for line in label_path.read_text().splitlines():
+            parts = line.split()
+            if len(parts) < 5:
+                continue
+            cx, cy, bw, bh = (float(v) for v in parts[1:5])
+            boxes.append([(cx - bw / 2) * w, (cy - bh / 2) * h, (cx + bw / 2) * w, (cy + bh / 2) * h])
+    return np.array(boxes, dtype=np.float32).reshape(-1, 4)
+
+
+class UltralyticsRunner:
+    """.pt model via Ultralytics (same as test_detection.py)"""
+
+    def __init__(self, model_path, input_size):
+        from ultralytics import YOLO
+        self.model = YOLO(model_path)
+        self.img_size = list(input_size)  # imgsz=[height, width]
+
+    def __call__(self, img, conf):
+        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        results = self.model(img_rgb, conf=conf, imgsz=self.img_size, verbose=False)
+        boxes = results[0].boxes
+        return [
+            {'bbox': box.xyxy[0].cpu().numpy().tolist(), 'confidence': float(box.conf[0])}
+            for box in boxes
+        ]
+
+
+class OnnxRunner:
+    """ONNX model via ONNX Runtime using the edge device pipeline"""
+
+    def __init__(self, model_path, input_size, threads):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_path, sess_options=options,
+                                            providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+        self.preprocessor = LetterboxPreprocessor(input_size)
+
+    def __call__(self, img, conf):
+        tensor, ratio, pad = self.preprocessor.process(img)
+        outputs = self.session.run(None, {self.input_name: tensor})
+        return decode_detections(outputs[0], conf, ratio, pad, img_shape=img.shape)
+
+
+def average_precision(scores, matched, num_gt):
+    """All-point interpolated AP from per-detection TP flags"""
+    if num_gt == 0 or len(scores) == 0:
+        return 0.0
+    order = np.argsort(-np.asarray(scores))
+    tp = np.asarray(matched, dtype=np.float32)[order]
+    fp = 1 - tp
+    tp_cum, fp_cum = np.cumsum(tp), np.cumsum(fp)
+    recall = tp_cum / num_gt
+    precision = tp_cum / np.maximum(tp_cum + fp_cum, 1e-9)
+
+    # Precision envelope, then integrate over recall
+    mrec = np.concatenate([[0.0], recall, [1.0]])
+    mpre = np.concatenate([[1.0], precision, [0.0]])
+    mpre = np.flip(np.maximum.accumulate(np.flip(mpre)))
+    idx = np.where(mrec[1:] != mrec[:-1])[0]
+    return float(np.sum((mrec[idx + 1] - mrec[idx]) * mpre[idx + 1]))
+
+
+def evaluate(runner, samples, conf_threshold, iou_threshold=0.5, eval_conf=0.05, warmup=2):
+    """Run a model over all samples and collect accuracy + latency stats"""
+    for img, _ in samples[:warmup]:
+        runner(img, eval_conf)
+
+    scores, matched, latencies = [], [], []
+    num_gt, recalled = 0, 0
+
+    for img, gt in samples:
+        start = time.perf_counter()
+        detections = runner(img, eval_conf)
+        latencies.append(time.perf_counter() - start)
+
+        num_gt += len(gt)
+        detections.sort(key=lambda d: -d['confidence'])
+        used = set()
+        ious = iou_matrix([d['bbox'] for d in detections], gt) if detections and len(gt) else None
+
+        for i, det in enumerate(detections):
+            hit = False
+            if ious is not None:
+                for j in np.argsort(-ious[i]):
+                    if ious[i, j] < iou_threshold:
+                        break
+                    if j not in used:
+                        used.add(j)
+                        hit = True
+                        break
+            scores.append(det['confidence'])
+            matched.append(hit)
+            if hit and det['confidence'] >= conf_threshold:
+                recalled += 1
+
+    latencies.sort()
+    return {
+        'ap50': average_precision(scores, matched, num_gt),
+        'recall': recalled / num_gt if num_gt else 0.0,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p95_ms': latencies[int(len(latencies) * 0.95)] * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare .pt / FP32 ONNX / INT8 ONNX detection models')
+    parser.add_argument('--images', type=str, required=True, help='Folder of test images')
+    parser.add_argument('--labels', type=str, required=True, help='Folder of YOLO txt labels')
+    parser.add_argument('--pt', type=str, help='PyTorch model (.pt)')
+    parser.add_argument('--onnx', type=str, help='FP32 ONNX model')
+    parser.add_argument('--int8', type=str, help='INT8 ONNX model (edge_device/quantize_model.py)')
+    parser.add_argument('--img-size', type=int, nargs='+', default=[640],
+                        help='Model input size: 640, or HEIGHT WIDTH as in model.img_size (e.g. 256 480)')
+    parser.add_argument('--conf', type=float, default=0.5, help='Operating confidence threshold (recall)')
+    parser.add_argument('--threads', type=int, default=0, help='ONNX Runtime intra-op threads (0 = default)')
+    parser.add_argument('--max-images', type=int, default=500, help='Max test images')
+
+    args = parser.parse_args()
+    if len(args.img_size) > 2:
+        parser.error('--img-size takes SIZE or HEIGHT WIDTH')
+    input_size = parse_input_size(args.img_size)
+
+    image_paths = sorted(p for p in Path(args.images).iterdir()
+                         if p.suffix.lower() in ('.jpg', '.jpeg', '.png'))[:args.max_images]
+    samples = []
+    for path in image_paths:
+        img = cv2.imread(str(path))
+        if img is None:
+            continue
+        samples.append((img, load_labels(Path(args.labels) / f"{path.stem}.txt", img.shape)))
+
+    print(f"📸 Loaded {len(samples)} images ({sum(len(gt) for _, gt in samples)} labeled plates)")
+
+    models = []
+    if args.pt:
+        models.append(('PyTorch (.pt)', args.pt, lambda p: UltralyticsRunner(p, input_size)))
+    if args.onnx:
+        models.append(('FP32 ONNX', args.onnx, lambda p: OnnxRunner(p, input_size, args.threads)))
+    if args.int8:
+        models.append(('INT8 ONNX', args.int8, lambda p: OnnxRunner(p, input_size, args.threads)))
+
+    if not models:
+        print("❌ Pass at least one of --pt, --onnx, --int8")
+        return
+
+    rows = []
+    for name, path, factory in models:
+        print(f"🔍 Evaluating {name}: {path}")
+        stats = evaluate(factory(path), samples, args.conf)
+        stats['size_mb'] = Path(path).stat().st_size / 1024 / 1024
+        rows.append((name, stats))
+
+    print(f"\n{'='*78}")
+    print(f"✅ MODEL COMPARISON ({len(samples)} images, conf={args.conf})")
+    print(f"{'='*78}")
+    print(f"{'Model':<16}{'AP@0.5':>10}{'Recall':>10}{'p50 (ms)':>12}{'p95 (ms)':>12}{'Size (MB)':>12}")
+    for name, s in rows:
+        print(f"{name:<16}{s['ap50']:>10.3f}{s['recall']:>10.3f}{s['p50_ms']:>12.1f}{s['p95_ms']:>12.1f}{s['size_mb']:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""
+Cross-Camera Batched Inference
+===============================
+
+With several lanes each lane's inference thread called session.run on its
+own frame, paying the fixed per-call overhead (graph dispatch, thread pool
+wake-up) once per camera. BatchInferenceScheduler collects the newest frame
+from every active lane, letterboxes them straight into the slots of one
+preallocated batch tensor, runs a single session.run and routes each slot's
+detections back to the lane that submitted it.
+
+A batch runs as soon as every recently active lane has submitted a frame,
+or when the oldest frame has waited max_wait seconds - so a busy lane is
+never held back by a quiet one (e.g. an idle lane behind the motion gate).
+
+Needs an ONNX export with a dynamic batch axis
+(yolo export ... format=onnx dynamic=True); a fixed batch size > 1 also
+works, unused slots are ignored.
+"""
+
+import logging
+import threading
+import time
+
+import numpy as np
+
+from preprocess import LetterboxPreprocessor
+
+
+class _DetectRequest:
+    """One lane's frame waiting for the next batch"""
+
+    def __init__(self, frame, lane_name):
+        self.frame = frame
+        self.lane_name = lane_name
+        self.submitted_at = time.time()
+        self.done = threading.Event()
+        self.detections = None
+        self.error = None
+
+
+def batch_capacity(session):
+    """
+    Batch size the model accepts.
+
+    Returns: None for a dynamic batch axis, else the fixed batch size
+    """
+    dim = session.get_inputs()[0].shape[0]
+    return dim if isinstance(dim, int) and dim > 0 else None
+
+
+class BatchInferenceScheduler:
+    """Batches frames from several lanes into one session.run call"""
+
+    def __init__(self, detector, max_batch, config):
+        """
+        Args:
+            detector: PlateDetector (ONNX session, postprocess, stage timings)
+            max_batch: number of lanes (at most one pending frame each)
+            config: full edge config (uses the 'batching' section)
+        """
+        batch_config = config.get('batching', {})
+        self.logger = logging.getLogger(__name__)
+        self.detector = detector
+        self.max_wait = batch_config.get('max_wait', 0.02)
+        self.active_window = batch_config.get('active_window', 1.0)
+
+        capacity = batch_capacity(detector.session)
+        self.fixed_batch = capacity
+        self.max_batch = min(max_batch, capacity) if capacity else max_batch
+
+        # One letterbox preprocessor per slot, each writing into its slot of
+        # the shared batch tensor (no copy when stacking)
+        size = capacity or self.max_batch
+        h, w = detector.input_size
+        self.batch_tensor = np.zeros((size, 3, h, w), dtype=np.float32)
+        self.preprocessors = [
+            LetterboxPreprocessor((h, w), tensor=self.batch_tensor[i:i + 1])
+            for i in range(self.max_batch)
+        ]
+
+        self._cond = threading.Condition()
+        self._pending = []
+        self._last_seen = {}
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        # Counters
+        self.batches = 0
+        self.frames = 0
+        self.deadline_batches = 0
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run_loop, name='batch-inference', daemon=True)
+        self._thread.start()
+        self.logger.info(f"Batched inference: up to {self.max_batch} lanes per run, max wait {self.max_wait * 1000:.0f}ms")
+
+    def warmup(self):
+        """One full-batch run so the batch shape is allocated before the first frames"""
+        size = self.fixed_batch or self.max_batch
+        self.detector.session.run(None, {self.detector.input_name: self.batch_tensor[:size]})
+
+    def stop(self):
+        self._stop_event.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def detect(self, frame, lane_name):
+        """Submit a lane's frame and block until its detections are ready"""
+        request = _DetectRequest(frame, lane_name)
+        with self._cond:
+            self._pending.append(request)
+            self._last_seen[lane_name] = request.submitted_at
+            self._cond.notify_all()
+
+        while not request.done.wait(timeout=0.5):
+            if self._stop_event.is_set():
+                raise RuntimeError("Batch inference scheduler stopped")
+        if request.error is not None:
+            raise request.error
+        return request.detections
+
+    def _expected_lanes(self, now):
+        """Lanes that submitted recently - the batch waits for these only"""
+        return sum(1 for seen in self._last_seen.values() if now - seen <= self.active_window)
+
+    def _collect_batch(self):
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending or self._stop_event.is_set())
+            if self._stop_event.is_set():
+                return []
+
+            deadline = self._pending[0].submitted_at + self.max_wait
+            while not self._stop_event.is_set():
+                now = time.time()
+                expected = min(self.max_batch, max(1, self._expected_lanes(now)))
+                if len(self._pending) >= expected:
+                    break
+                if now >= deadline:
+                    self.deadline_batches += 1
+                    break
+                self._cond.wait(timeout=deadline - now)
+
+            batch = self._pending[:self.max_batch]
+            del self._pending[:len(batch)]
+            return batch
+
+    def _run_loop(self):
+        while not self._stop_event.is_set():
+            batch = self._collect_batch()
+            if not batch:
+                continue
+            try:
+                self._run_batch(batch)
+            except Exception as e:
+                for request in batch:
+                    request.error = e
+            finally:
+                for request in batch:
+                    request.done.set()
+
+    def _run_batch(self, batch):
+        detector = self.detector
+        now = time.time()
+        for request in batch:
+            detector.stage_latency.record('batch_wait', now - request.submitted_at)
+
+        t0 = time.perf_counter()
+        letterbox = [self.preprocessors[i].process(request.frame)[1:] for i, request in enumerate(batch)]
+        t1 = time.perf_counter()
+
+        # Fixed-batch exports always get the full tensor, extra slots are ignored
+        size = self.fixed_batch or len(batch)
+        outputs = detector.session.run(None, {detector.input_name: self.batch_tensor[:size]})
+        t2 = time.perf_counter()
+
+        for i, (request, (ratio, pad)) in enumerate(zip(batch, letterbox)):
+            request.detections = detector.postprocess([outputs[0][i:i + 1]], request.frame.shape, ratio, pad)
+
+        detector.stage_latency.record('preprocess', t1 - t0)
+        detector.stage_latency.record('inference', t2 - t1)
+        detector.stage_latency.record('postprocess', time.perf_counter() - t2)
+        self.batches += 1
+        self.frames += len(batch)
+
+    def summary(self):
+        """Batch fill statistics as a log string"""
+        average = self.frames / self.batches if self.batches else 0.0
+        return (
+            f"Batching: batches={self.batches} frames={self.frames} avg_size={average:.2f} "
+            f"deadline_flushes={self.deadline_batches}"
+        )
@@ -0,0 +1,183 @@
+"""
+Postprocess Micro-Benchmark
+============================
+
+Compares the vectorized YOLO decoder (yolo_decode.py) with the old per-row
+Python loop on recorded model outputs.
+
+Record outputs from real gate images first (runs the detection model):
+    python3 benchmark_postprocess.py --record images/ --outputs outputs.npz
+
+Then benchmark (can be run on the Pi without a camera):
+    python3 benchmark_postprocess.py --outputs outputs.npz
+
+Without --outputs a synthetic YOLOv8-shaped output [1, 5, 8400] is used.
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from yolo_decode import decode_detections
+
+
+def legacy_postprocess(outputs, conf_threshold, ratio, pad):
+    """Previous PlateDetector.postprocess loop, kept as benchmark baseline"""
+    detections = []
+
+    if len(outputs.shape) == 3:
+        outputs = outputs[0]  # Remove batch dimension
+
+    for detection in outputs:
+        if len(detection) >= 5:
+            conf = detection[4]
+            if conf > conf_threshold:
+                x_center, y_center, width, height = detection[:4]
+
+                x1 = (x_center - width / 2 - pad[0]) / ratio
+                y1 = (y_center - height / 2 - pad[1]) / ratio
+                x2 = (x_center + width / 2 - pad[0]) / ratio
+                y2 = (y_center + height / 2 - pad[1]) / ratio
+
+                detections.append({
+                    'bbox': [int(x1), int(y1), int(x2), int(y2)],
+                    'confidence': float(conf)
+                })
+
+    return detections
+
+
+def synthetic_output(num_anchors=8400, num_plates=2, img_size=640, seed=0):
+    """YOLOv8-style [1, 5, N] output with a few clusters of overlapping boxes"""
+    rng = np.random.default_rng(seed)
+    out = np.zeros((1, 5, num_anchors), dtype=np.float32)
+    out[0, 0] = rng.uniform(0, img_size, num_anchors)
+    out[0, 1] = rng.uniform(0, img_size, num_anchors)
+    out[0, 2] = rng.uniform(10, 80, num_anchors)
+    out[0, 3] = rng.uniform(5, 30, num_anchors)
+    out[0, 4] = rng.uniform(0, 0.3, num_anchors)
+
+    for p in range(num_plates):
+        cx, cy = rng.uniform(100, img_size - 100, 2)
+        idx = rng.choice(num_anchors, 30, replace=False)
+        out[0, 0, idx] = cx + rng.normal(0, 2, 30)
+        out[0, 1, idx] = cy + rng.normal(0, 1, 30)
+        out[0, 2, idx] = 160 + rng.normal(0, 3, 30)
+        out[0, 3, idx] = 35 + rng.normal(0, 1, 30)
+        out[0, 4, idx] = rng.uniform(0.6, 0.95, 30)
+
+    return out
+
+
+def record_outputs(images_dir, output_path, config_path):
+    """Run the detection model on a folder of images and save raw outputs"""
+    from plate_detector import PlateDetector
+
+    detector = PlateDetector(config_path)
+    recorded = {}
+    image_paths = sorted(p for p in Path(images_dir).iterdir()
+                         if p.suffix.lower() in ('.jpg', '.jpeg', '.png'))
+
+    for i, path in enumerate(image_paths):
+        img = cv2.imread(str(path))
+        if img is None:
+            continue
+        img_input, ratio, pad = detector.preprocess(img)
+        if detector.use_onnx:
+            output = detector.session.run(None, {detector.input_name: img_input})[0]
+        else:
+            detector.net.setInput(img_input)
+            output = detector.net.forward()
+        recorded[f"output_{i}"] = output
+        recorded[f"meta_{i}"] = np.array([ratio, pad[0], pad[1], img.shape[0], img.shape[1]])
+
+    np.savez_compressed(output_path, **recorded)
+    print(f"💾 Recorded {len(image_paths)} outputs to {output_path}")
+
+
+def load_outputs(path):
+    """Load recorded outputs as a list of (output, ratio, pad, img_shape)"""
+    data = np.load(path)
+    samples = []
+    for key in sorted(k for k in data.files if k.startswith('output_')):
+        meta = data[key.replace('output_', 'meta_')]
+        samples.append((data[key], float(meta[0]), (meta[1], meta[2]), (int(meta[3]), int(meta[4]))))
+    return samples
+
+
+def to_legacy_layout(output):
+    """The old loop only understands [N, 5+nc]; transpose v8 outputs for it"""
+    squeezed = output[0] if output.ndim == 3 else output
+    if squeezed.shape[0] < squeezed.shape[1]:
+        return np.ascontiguousarray(squeezed.T)
+    return squeezed
+
+
+def time_call(fn, repeats):
+    timings = []
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return result, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark YOLO postprocessing')
+    parser.add_argument('--outputs', type=str, help='Recorded outputs (.npz)')
+    parser.add_argument('--record', type=str, help='Folder of images to record outputs from')
+    parser.add_argument('--config', type=str, default='config.yaml', help='Detector config (for --record)')
+    parser.add_argument('--conf', type=float, default=0.5, help='Confidence threshold')
+    parser.add_argument('--iou', type=float, default=0.45, help='NMS IoU threshold')
+    parser.add_argument('--repeats', type=int, default=50, help='Timed runs per sample')
+
+    args = parser.parse_args()
+
+    if args.record:
+        record_outputs(args.record, args.outputs or 'outputs.npz', args.config)
+        return
+
+    if args.outputs:
+        samples = load_outputs(args.outputs)
+        print(f"📦 Loaded {len(samples)} recorded outputs from {args.outputs}")
+    else:
+        samples = [(synthetic_output(seed=i), 0.5, (0.0, 140.0), (720, 1280)) for i in range(5)]
+        print("📦 Using synthetic YOLOv8 outputs [1, 5, 8400]")
+
+    legacy_times, new_times = [], []
+    legacy_count, new_count = 0, 0
+
+    for output, ratio, pad, img_shape in samples:
+        legacy_input = to_legacy_layout(output)
+        legacy_result, timings = time_call(
+            lambda: legacy_postprocess(legacy_input, args.conf, ratio, pad), args.repeats)
+        legacy_times.extend(timings)
+        legacy_count += len(legacy_result)
+
+        new_result, timings = time_call(
+            lambda: decode_detections(output, args.conf, ratio, pad, img_shape, args.iou), args.repeats)
+        new_times.extend(timings)
+        new_count += len(new_result)
+
+    legacy_times.sort()
+    new_times.sort()
+    legacy_p50 = legacy_times[len(legacy_times) // 2] * 1000
+    new_p50 = new_times[len(new_times) // 2] * 1000
+
+    print(f"\n{'='*60}")
+    print(f"✅ POSTPROCESS BENCHMARK ({len(samples)} samples x {args.repeats} runs)")
+    print(f"{'='*60}")
+    print(f"Legacy loop : p50={legacy_p50:.3f} ms  p95={legacy_times[int(len(legacy_times)*0.95)]*1000:.3f} ms  "
+          f"detections={legacy_count} (no NMS)")
+    print(f"Vectorized  : p50={new_p50:.3f} ms  p95={new_times[int(len(new_times)*0.95)]*1000:.3f} ms  "
+          f"detections={new_count} (after NMS)")
+    print(f"Speedup     : {legacy_p50 / max(new_p50, 1e-9):.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Preprocess Benchmark
+=====================
+
+Compares the old allocate-per-frame letterbox/preprocess with the reusable
+LetterboxPreprocessor (preprocess.py): per-frame time and peak RSS.
+
+Each mode runs in its own subprocess so peak RSS is measured separately:
+    python3 benchmark_preprocess.py                      # synthetic 1280x720 frames
+    python3 benchmark_preprocess.py --images detections/ --img-size 416
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from preprocess import LetterboxPreprocessor
+
+
+def legacy_letterbox(img, new_shape=(640, 640)):
+    """Previous PlateDetector.letterbox, kept as benchmark baseline"""
+    shape = img.shape[:2]
+    r = min(new_shape[0] / shape[0], new_shape[1] / shape[1])
+    new_unpad = int(round(shape[1] * r)), int(round(shape[0] * r))
+    dw, dh = new_shape[1] - new_unpad[0], new_shape[0] - new_unpad[1]
+    dw /= 2
+    dh /= 2
+
+    if shape[::-1] != new_unpad:
+        img = cv2.resize(img, new_unpad, interpolation=cv2.INTER_LINEAR)
+
+    top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+    left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+    img = cv2.copyMakeBorder(img, top, bottom, left, right,
+                             cv2.BORDER_CONSTANT, value=(114, 114, 114))
+    return img, r, (dw, dh)
+
+
+def legacy_preprocess(img, img_size):
+    """Previous PlateDetector.preprocess, kept as benchmark baseline"""
+    img_resized, ratio, (dw, dh) = legacy_letterbox(img, (img_size, img_size))
+    img_input = img_resized.transpose(2, 0, 1)
+    img_input = np.expand_dims(img_input, 0)
+    img_input = img_input.astype(np.float32) / 255.0
+    return img_input, ratio, (dw, dh)
+
+
+def load_frames(images_dir, count):
+    """Frames from a folder, or synthetic 1280x720 camera frames"""
+    if images_dir:
+        paths = sorted(p for p in Path(images_dir).iterdir()
+                       if p.suffix.lower() in ('.jpg', '.jpeg', '.png'))[:count]
+        frames = [cv2.imread(str(p)) for p in paths]
+        return [f for f in frames if f is not None]
+
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 255, (720, 1280, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def max_rss_kb():
+    # ru_maxrss is KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_mode(mode, images_dir, img_size, iterations):
+    """Benchmark one mode in this process and return a stats dict"""
+    frames = load_frames(images_dir, 8)
+    baseline_rss = max_rss_kb()
+
+    if mode == 'legacy':
+        fn = lambda f: legacy_preprocess(f, img_size)
+    else:
+        preprocessor = LetterboxPreprocessor((img_size, img_size))
+        fn = preprocessor.process
+
+    # Warm-up
+    for frame in frames:
+        fn(frame)
+
+    timings = []
+    for i in range(iterations):
+        frame = frames[i % len(frames)]
+        start = time.perf_counter()
+        tensor, _, _ = fn(frame)
+        timings.append(time.perf_counter() - start)
+        # Touch the result like session.run would
+        float(tensor[0, 0, 0, 0])
+
+    timings.sort()
+    return {
+        'mode': mode,
+        'p50_ms': timings[len(timings) // 2] * 1000,
+        'p95_ms': timings[int(len(timings) * 0.95)] * 1000,
+        'peak_rss_kb': max_rss_kb(),
+        'peak_rss_delta_kb': max_rss_kb() - baseline_rss
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark letterbox preprocessing')
+    parser.add_argument('--images', type=str, help='Folder of camera frames (default: synthetic)')
+    parser.add_argument('--img-size', type=int, default=640, help='Model input size')
+    parser.add_argument('--iterations', type=int, default=200, help='Timed frames per mode')
+    parser.add_argument('--mode', choices=['legacy', 'fused'], help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.mode:
+        # Child process: run a single mode and print JSON
+        print(json.dumps(run_mode(args.mode, args.images, args.img_size, args.iterations)))
+        return
+
+    results = []
+    for mode in ('legacy', 'fused'):
+        cmd = [sys.executable, __file__, '--mode', mode,
+               '--img-size', str(args.img_size), '--iterations', str(args.iterations)]
+        if args.images:
+            cmd += ['--images', args.images]
+        output = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"\n{'='*60}")
+    print(f"✅ PREPROCESS BENCHMARK ({args.iterations} frames, input {args.img_size}x{args.img_size})")
+    print(f"{'='*60}")
+    for r in results:
+        print(f"{r['mode']:<7}: p50={r['p50_ms']:.2f} ms  p95={r['p95_ms']:.2f} ms  "
+              f"peak RSS={r['peak_rss_kb'] / 1024:.1f} MB (+{r['peak_rss_delta_kb'] / 1024:.1f} MB during run)")
+    legacy, fused = results
+    print(f"Speedup: {legacy['p50_ms'] / max(fused['p50_ms'], 1e-9):.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Best-Frame Selection
+=====================
+
+Scores plate crops by sharpness (variance of the Laplacian), size and
+detection confidence so only the best crop of each tracked vehicle is
+uploaded. Motion-blurred first crops otherwise cause OCR failures and
+retries on both services.
+"""
+
+import cv2
+
+
+class BestFrameSelector:
+    """Quality scoring and accumulation-window policy for plate crops"""
+
+    # Crops are scored at a fixed height so sharpness is comparable across sizes
+    SCORE_HEIGHT = 48
+
+    def __init__(self, config):
+        best_config = config.get('best_frame', {})
+
+        self.enabled = best_config.get('enabled', True)
+        self.window = best_config.get('window', 0.6) if self.enabled else 0.0
+        self.min_sharpness = best_config.get('min_sharpness', 30.0)
+        self.min_width = best_config.get('min_width', 60)
+        self.good_sharpness = best_config.get('good_sharpness', 150.0)
+        self.good_width = best_config.get('good_width', 200)
+
+        weights = best_config.get('weights', {})
+        self.weight_sharpness = weights.get('sharpness', 0.5)
+        self.weight_size = weights.get('size', 0.3)
+        self.weight_confidence = weights.get('confidence', 0.2)
+
+    def sharpness(self, plate_img):
+        """Variance of the Laplacian on a height-normalized grayscale crop"""
+        gray = cv2.cvtColor(plate_img, cv2.COLOR_BGR2GRAY)
+        scale = self.SCORE_HEIGHT / gray.shape[0]
+        gray = cv2.resize(gray, (max(1, int(gray.shape[1] * scale)), self.SCORE_HEIGHT),
+                          interpolation=cv2.INTER_AREA)
+        return float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+    def evaluate(self, plate_img, bbox, confidence):
+        """
+        Score a plate crop.
+
+        Returns: dict with 'score', 'sharpness', 'width', 'acceptable', 'excellent'
+        """
+        sharpness = self.sharpness(plate_img)
+        width = bbox[2] - bbox[0]
+
+        score = (
+            self.weight_sharpness * min(sharpness / self.good_sharpness, 1.0)
+            + self.weight_size * min(width / self.good_width, 1.0)
+            + self.weight_confidence * confidence
+        )
+
+        return {
+            'score': score,
+            'sharpness': sharpness,
+            'width': width,
+            'acceptable': sharpness >= self.min_sharpness and width >= self.min_width,
+            'excellent': sharpness >= self.good_sharpness and width >= self.good_width
+        }
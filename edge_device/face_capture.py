@@ -0,0 +1,156 @@
+"""
+Driver Face Capture
+====================
+
+The Haar cascade used to scan the full-resolution grayscale frame for every
+plate event, which on a Pi 2 can cost more than plate detection itself.
+FaceCapture makes the search cheap:
+
+- only the driver region (configurable ROI) is searched
+- the ROI is downscaled to detect_width before detection and the face box is
+  mapped back to full resolution, so the uploaded crop keeps its detail
+- OpenCV's YuNet DNN detector (cv2.FaceDetectorYN) can replace the cascade
+- PlateDetector runs it at most once per vehicle and caches the result with
+  the plate event
+"""
+
+import logging
+import os
+import threading
+import time
+
+import cv2
+
+from metrics import LatencyTracker
+
+
+class FaceCapture:
+    """Face search on a downscaled driver ROI (Haar cascade or YuNet)"""
+
+    def __init__(self, config, histogram=None):
+        """
+        Args:
+            config: full edge config (uses the 'face_detection' section)
+            histogram: optional LatencyHistogram for the 'face' timing
+        """
+        face_config = config.get('face_detection', {})
+        self.logger = logging.getLogger(__name__)
+
+        self.enabled = face_config.get('enabled', True)
+        self.min_size = face_config.get('min_face_size', 80)
+        self.scale_factor = face_config.get('scale_factor', 1.1)
+        self.min_neighbors = face_config.get('min_neighbors', 5)
+        self.roi = face_config.get('roi', [0.0, 0.0, 1.0, 1.0])
+        self.detect_width = face_config.get('detect_width', 480)
+        self.padding = face_config.get('padding', 0.2)
+        self.score_threshold = face_config.get('score_threshold', 0.7)
+
+        self.latency = LatencyTracker(histogram=histogram)
+        # Lanes' network threads share one detector instance
+        self._lock = threading.Lock()
+        self.cascade = None
+        self.yunet = None
+        self.backend = None
+
+        if not self.enabled:
+            self.logger.info("Face detection disabled")
+            return
+
+        if face_config.get('backend', 'haar') == 'yunet':
+            self.yunet = self._create_yunet(face_config.get('yunet_model', 'models/face_detection_yunet.onnx'))
+
+        if self.yunet is not None:
+            self.backend = 'yunet'
+        else:
+            # Haar Cascade (built-in OpenCV, very lightweight)
+            cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+            self.cascade = cv2.CascadeClassifier(cascade_path)
+            self.backend = 'haar'
+
+        self.logger.info(f"Face detection enabled ({self.backend}, ROI {self.roi}, width {self.detect_width})")
+
+    def _create_yunet(self, model_path):
+        if not hasattr(cv2, 'FaceDetectorYN'):
+            self.logger.warning("cv2.FaceDetectorYN not available (OpenCV >= 4.5.4), using Haar Cascade")
+            return None
+        if not os.path.exists(model_path):
+            self.logger.warning(f"YuNet model not found at {model_path}, using Haar Cascade")
+            return None
+        return cv2.FaceDetectorYN.create(model_path, "", (320, 320), self.score_threshold, 0.3, 50)
+
+    def _detect(self, small, scale):
+        """Faces as (x, y, w, h) in downscaled ROI coordinates"""
+        if self.yunet is not None:
+            self.yunet.setInputSize((small.shape[1], small.shape[0]))
+            _, faces = self.yunet.detect(small)
+            if faces is None:
+                return []
+            min_size = self.min_size * scale
+            return [tuple(f[:4]) for f in faces if f[2] >= min_size and f[3] >= min_size]
+
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        min_size = max(20, int(self.min_size * scale))
+        faces = self.cascade.detectMultiScale(
+            gray,
+            scaleFactor=self.scale_factor,
+            minNeighbors=self.min_neighbors,
+            minSize=(min_size, min_size)
+        )
+        return [tuple(f) for f in faces]
+
+    def capture(self, frame):
+        """
+        Search the driver ROI for a face.
+
+        Returns: (face_image, face_detected)
+        - face_image: full-resolution face crop if detected, else the full frame
+        - face_detected: True if a face was detected, False = full frame fallback
+        """
+        if not self.enabled:
+            return frame, False
+
+        start = time.time()
+        try:
+            h, w = frame.shape[:2]
+            rx1, ry1 = int(self.roi[0] * w), int(self.roi[1] * h)
+            rx2, ry2 = int(self.roi[2] * w), int(self.roi[3] * h)
+            roi = frame[ry1:ry2, rx1:rx2]
+
+            scale = min(1.0, self.detect_width / roi.shape[1]) if self.detect_width else 1.0
+            small = roi if scale == 1.0 else cv2.resize(
+                roi, (int(roi.shape[1] * scale), int(roi.shape[0] * scale)), interpolation=cv2.INTER_AREA
+            )
+
+            with self._lock:
+                faces = self._detect(small, scale)
+        except Exception as e:
+            self.logger.error(f"Face detection error: {e}")
+            return frame, False
+
+        elapsed = time.time() - start
+        self.latency.record('face', elapsed)
+
+        if not faces:
+            # No face detected (helmet, etc.) - return full frame
+            self.logger.info(f"👤 No face detected (helmet?), using full frame ({elapsed * 1000:.1f}ms)")
+            return frame, False
+
+        # Take largest face (most likely the driver/rider), back to full resolution
+        x, y, fw, fh = max(faces, key=lambda f: f[2] * f[3])
+        x, y = x / scale + rx1, y / scale + ry1
+        fw, fh = fw / scale, fh / scale
+
+        pad = int(fw * self.padding)
+        x1 = max(0, int(x) - pad)
+        y1 = max(0, int(y) - pad)
+        x2 = min(w, int(x + fw) + pad)
+        y2 = min(h, int(y + fh) + pad)
+
+        self.logger.info(
+            f"👤 Face detected: {int(fw)}x{int(fh)} at ({int(x)}, {int(y)}) ({elapsed * 1000:.1f}ms, {self.backend})"
+        )
+        return frame[y1:y2, x1:x2], True
+
+    def summary(self):
+        """Face search timing as a log string"""
+        return f"Face ({self.backend}): {self.latency.format_summary(['face'])}"
@@ -0,0 +1,172 @@
+"""
+Frame Sources
+==============
+
+One cv2.VideoCapture-compatible reader (read / isOpened / release) for the
+inputs a gate can have:
+
+- USB camera index (0, 1, ...)
+- network stream URL (rtsp://, http://) - IP cameras at larger gates
+- video file - replaying recordings through the live loop
+
+USB and stream sources reconnect with exponential backoff when the device
+disappears or the stream drops, instead of ending the detection loop. Video
+files can loop and are paced to their native FPS so they behave like a
+camera in the pipelined mode.
+"""
+
+import logging
+import time
+
+import cv2
+
+
+class FrameSource:
+    """Reconnecting frame reader for a USB index, stream URL or video file"""
+
+    def __init__(self, source, width=None, height=None, name='camera', reconnect_delay=1.0,
+                 max_reconnect_delay=30.0, max_failures=5, loop=False, realtime=True):
+        """
+        Args:
+            source: int / digit string (USB index), URL with '://' or a file path
+            width, height: requested capture size (USB cameras only)
+            max_failures: consecutive failed reads before reconnecting
+            loop: restart video files at the end instead of finishing
+            realtime: pace video files to their FPS (False = as fast as possible)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.name = name
+        self.width = width
+        self.height = height
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.max_failures = max_failures
+        self.loop = loop
+        self.realtime = realtime
+
+        if isinstance(source, int) or str(source).isdigit():
+            self.kind = 'usb'
+            self.source = int(source)
+        elif '://' in str(source):
+            self.kind = 'stream'
+            self.source = str(source)
+        else:
+            self.kind = 'file'
+            self.source = str(source)
+
+        self.cap = None
+        self.finished = False  # Video file reached its end (loop disabled)
+        self.failures = 0
+        self.reconnects = 0
+        self._backoff = reconnect_delay
+        self._next_attempt = 0.0
+        self._frame_interval = 0.0
+        self._next_frame_at = 0.0
+
+        self._open()
+
+    @classmethod
+    def from_config(cls, camera_config, name='camera'):
+        """Build from a 'camera' config section ('source' or legacy 'index')"""
+        return cls(
+            camera_config.get('source', camera_config.get('index', 0)),
+            width=camera_config.get('width'),
+            height=camera_config.get('height'),
+            name=name,
+            reconnect_delay=camera_config.get('reconnect_delay', 1.0),
+            max_reconnect_delay=camera_config.get('max_reconnect_delay', 30.0),
+            max_failures=camera_config.get('max_read_failures', 5),
+            loop=camera_config.get('loop', False),
+            realtime=camera_config.get('realtime', True)
+        )
+
+    def _open(self):
+        if self.kind == 'stream':
+            cap = cv2.VideoCapture(self.source, cv2.CAP_FFMPEG)
+            # Keep the decoder queue short so we read recent frames
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        else:
+            cap = cv2.VideoCapture(self.source)
+
+        if self.kind == 'usb':
+            if self.width:
+                cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+            if self.height:
+                cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+
+        if self.kind == 'file' and self.realtime:
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            self._frame_interval = 1.0 / fps if fps and fps > 0 else 0.0
+
+        if not cap.isOpened():
+            cap.release()
+            self.cap = None
+            return False
+
+        self.cap = cap
+        self.failures = 0
+        self._backoff = self.reconnect_delay
+        return True
+
+    def isOpened(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    def _reconnect(self):
+        """Reopen the device/stream once the backoff has elapsed"""
+        now = time.time()
+        if now < self._next_attempt:
+            time.sleep(min(0.5, self._next_attempt - now))
+            return
+
+        if self._open():
+            self.reconnects += 1
+            self.logger.info(f"[{self.name}] Reconnected to {self.kind} source {self.source}")
+            return
+
+        self.logger.warning(f"[{self.name}] Reconnect failed, retrying in {self._backoff:.1f}s")
+        self._next_attempt = time.time() + self._backoff
+        self._backoff = min(self._backoff * 2, self.max_reconnect_delay)
+
+    def read(self):
+        """Returns (ret, frame) like cv2.VideoCapture.read"""
+        if self.finished:
+            return False, None
+
+        if self.cap is None:
+            if self.kind == 'file':
+                self.finished = True
+                return False, None
+            self._reconnect()
+            return False, None
+
+        ret, frame = self.cap.read()
+        if ret:
+            self.failures = 0
+            if self._frame_interval:
+                # Pace video files like a live camera
+                now = time.time()
+                if self._next_frame_at > now:
+                    time.sleep(self._next_frame_at - now)
+                self._next_frame_at = max(now, self._next_frame_at) + self._frame_interval
+            return True, frame
+
+        if self.kind == 'file':
+            if self.loop:
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            else:
+                self.logger.info(f"[{self.name}] End of video file {self.source}")
+                self.finished = True
+            return False, None
+
+        self.failures += 1
+        if self.failures >= self.max_failures:
+            self.logger.warning(f"[{self.name}] {self.failures} failed reads, reconnecting {self.kind} source")
+            self.cap.release()
+            self.cap = None
+            self._next_attempt = time.time() + self._backoff
+        return False, None
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
@@ -0,0 +1,185 @@
+"""
+Background Image Writer
+========================
+
+cv2.imwrite (JPEG encode + SD-card write) and the OCR debug preprocessing
+used to run inside the detection loop. ImageWriter moves all image
+persistence to one background thread:
+
+- save() only enqueues; the hot loop never touches the SD card
+- the queue is bounded and new images are dropped when it is full
+  (debug images are never worth delaying the gate for)
+- an optional transform (e.g. preprocess_plate_for_ocr) runs on the writer
+  thread, so expensive debug-only work is skipped entirely when not saved
+- the detections directory is pruned by age and total size; only images
+  named like the ones written here (timestamp prefix, image extension) in
+  directories written to are ever deleted, so a save dir shared with other
+  files (e.g. --save-dir .) is safe
+"""
+
+import logging
+import queue
+import re
+import threading
+import time
+from pathlib import Path
+
+import cv2
+
+
+# <YYYYmmdd_HHMMSS>_<plate text> with an image extension, as named by PlateDetector.
+# The plate text is empty for a DENY without OCR result (e.g. server down)
+IMAGE_NAME = re.compile(r'^\d{8}_\d{6}_.*\.(jpe?g|png|webp)$', re.IGNORECASE)
+
+
+class ImageWriter:
+    """Bounded, drop-on-overflow image writer with directory retention"""
+
+    def __init__(self, config):
+        """
+        Args:
+            config: full edge config (uses the 'image_writer' section)
+        """
+        writer_config = config.get('image_writer', {})
+        self.logger = logging.getLogger(__name__)
+
+        self.queue_size = writer_config.get('queue_size', 16)
+        self.jpeg_quality = writer_config.get('jpeg_quality', 90)
+        self.max_bytes = writer_config.get('max_bytes', 500 * 1024 * 1024)
+        self.max_age = writer_config.get('max_age', 7 * 24 * 3600)
+        self.retention_interval = writer_config.get('retention_interval', 300)
+
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._roots = {}  # root -> directories written to under it
+        self._last_retention = 0.0
+
+        # Counters
+        self.written = 0
+        self.dropped = 0
+        self.pruned = 0
+
+    def start(self):
+        """Start the background writer thread"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._write_loop, name='image-writer', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """Flush pending images (up to timeout) and stop the writer"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def save(self, root, name, img, transform=None):
+        """
+        Queue img to be written to root/name. Never blocks.
+
+        Args:
+            root: retention-managed directory (e.g. the detections dir)
+            name: file name relative to root (may include a subdirectory)
+            img: BGR image, must not be modified by the caller afterwards
+            transform: optional callable(img) -> img, run on the writer thread
+
+        Returns: True if queued, False if dropped (queue full / stopped)
+        """
+        if self._stop_event.is_set():
+            return False
+        try:
+            self._queue.put_nowait((Path(root), name, img, transform))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            self.logger.debug(f"Image writer queue full, dropped {name}")
+            return False
+
+    def _write_loop(self):
+        while not (self._stop_event.is_set() and self._queue.empty()):
+            try:
+                root, name, img, transform = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                self._maybe_enforce_retention()
+                continue
+
+            try:
+                if transform is not None:
+                    img = transform(img)
+                path = root / name
+                path.parent.mkdir(parents=True, exist_ok=True)
+                cv2.imwrite(str(path), img, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+                self.written += 1
+                directories = self._roots.setdefault(root, set())
+                if path.parent not in directories:
+                    # First image in this directory: prune leftovers from earlier runs
+                    directories.add(path.parent)
+                    self.enforce_retention(root)
+            except Exception as e:
+                self.logger.error(f"Failed to save image {name}: {e}")
+
+            self._maybe_enforce_retention()
+
+    def _maybe_enforce_retention(self):
+        now = time.time()
+        if now - self._last_retention < self.retention_interval:
+            return
+        self._last_retention = now
+        for root in list(self._roots):
+            self.enforce_retention(root)
+
+    def _own_images(self, root):
+        """Images this writer created: IMAGE_NAME files in the directories written to"""
+        for directory in list(self._roots.get(Path(root), ())):
+            try:
+                entries = list(directory.iterdir())
+            except OSError:
+                continue
+            for path in entries:
+                if IMAGE_NAME.match(path.name) and path.is_file():
+                    yield path
+
+    def enforce_retention(self, root):
+        """Delete own images older than max_age, then oldest until under max_bytes"""
+        cutoff = time.time() - self.max_age
+        files = []
+        total = 0
+        for path in self._own_images(root):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if self.max_age and stat.st_mtime < cutoff:
+                self._remove(path)
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        if not self.max_bytes or total <= self.max_bytes:
+            return
+
+        files.sort()
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def _remove(self, path):
+        try:
+            path.unlink()
+            self.pruned += 1
+        except OSError as e:
+            self.logger.debug(f"Could not prune {path}: {e}")
+
+    def pending(self):
+        """Images waiting for the writer thread"""
+        return self._queue.qsize()
+
+    def summary(self):
+        """Writer counters as a log string"""
+        return (
+            f"Image writer: written={self.written} dropped={self.dropped} "
+            f"pruned={self.pruned} pending={self.pending()}"
+        )
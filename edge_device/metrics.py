@@ -0,0 +1,201 @@
+"""
+Lightweight latency statistics for the edge device
+===================================================
+
+Keeps a sliding window of recent samples per pipeline stage so we can log
+p50/p95/max latency on the Raspberry Pi without pulling in extra packages.
+Also holds the labeled counters and histograms exported by
+metrics_exporter.py, plus process RSS / CPU temperature readers.
+"""
+
+import os
+import threading
+from collections import deque
+
+
+# Bucket bounds (seconds) for per-stage timings, finer than upload latency
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class LatencyTracker:
+    """Thread-safe sliding-window latency recorder, one window per stage"""
+
+    def __init__(self, window=200, histogram=None):
+        """
+        Args:
+            window: samples kept per stage for percentiles
+            histogram: optional LatencyHistogram that also receives every sample
+        """
+        self.window = window
+        self.histogram = histogram
+        self._samples = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        """Record one latency sample (in seconds) for a stage"""
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = deque(maxlen=self.window)
+                self._samples[stage] = samples
+                self._counts[stage] = 0
+            samples.append(seconds)
+            self._counts[stage] += 1
+        if self.histogram is not None:
+            self.histogram.observe(stage, seconds)
+
+    def reset(self):
+        """Drop all samples (e.g. after warm-up runs)"""
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+    def summary(self):
+        """
+        Percentiles per stage over the current window.
+
+        Returns: {stage: {'count', 'p50_ms', 'p95_ms', 'max_ms'}}
+        """
+        with self._lock:
+            snapshot = {stage: sorted(samples) for stage, samples in self._samples.items()}
+            counts = dict(self._counts)
+
+        result = {}
+        for stage, values in snapshot.items():
+            if not values:
+                continue
+            result[stage] = {
+                'count': counts[stage],
+                'p50_ms': _percentile(values, 50) * 1000,
+                'p95_ms': _percentile(values, 95) * 1000,
+                'max_ms': values[-1] * 1000
+            }
+        return result
+
+    def format_summary(self, stages=None):
+        """One-line human readable summary, optionally restricted to given stages"""
+        summary = self.summary()
+        order = stages or sorted(summary.keys())
+        parts = []
+        for stage in order:
+            stats = summary.get(stage)
+            if stats is None:
+                continue
+            parts.append(
+                f"{stage}: p50={stats['p50_ms']:.1f}ms p95={stats['p95_ms']:.1f}ms max={stats['max_ms']:.1f}ms"
+            )
+        return " | ".join(parts)
+
+
+class LatencyHistogram:
+    """Thread-safe cumulative latency histogram with fixed bucket bounds"""
+
+    DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, buckets=None):
+        self.buckets = tuple(sorted(buckets or self.DEFAULT_BUCKETS))
+        self._counts = {}
+        self._sums = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        """Count one sample (in seconds) into the first bucket it fits"""
+        with self._lock:
+            counts = self._counts.get(name)
+            if counts is None:
+                # One slot per bucket plus the +Inf overflow slot
+                counts = [0] * (len(self.buckets) + 1)
+                self._counts[name] = counts
+                self._sums[name] = 0.0
+            index = len(self.buckets)
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    index = i
+                    break
+            counts[index] += 1
+            self._sums[name] += seconds
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+            self._sums.clear()
+
+    def snapshot(self):
+        """
+        Returns: {name: {'buckets': [(bound, cumulative_count)], 'count', 'sum'}},
+        the last bound is float('inf')
+        """
+        with self._lock:
+            data = {name: (list(counts), self._sums[name]) for name, counts in self._counts.items()}
+
+        result = {}
+        bounds = self.buckets + (float('inf'),)
+        for name, (counts, total) in data.items():
+            cumulative, running = [], 0
+            for bound, count in zip(bounds, counts):
+                running += count
+                cumulative.append((bound, running))
+            result[name] = {'buckets': cumulative, 'count': running, 'sum': total}
+        return result
+
+    def format_summary(self, name):
+        """One-line bucket summary, e.g. '<=0.1s: 12 | <=0.25s: 3 | >10.0s: 0'"""
+        stats = self.snapshot().get(name)
+        if stats is None:
+            return ""
+        parts, previous = [], 0
+        for bound, cumulative in stats['buckets']:
+            label = f"<={bound}s" if bound != float('inf') else f">{self.buckets[-1]}s"
+            parts.append(f"{label}: {cumulative - previous}")
+            previous = cumulative
+        return " | ".join(parts)
+
+
+class Counters:
+    """Thread-safe monotonically increasing counters with labels"""
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        """Add value to the counter name{labels}"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def snapshot(self):
+        """Returns: {name: [(labels_dict, value)]}"""
+        with self._lock:
+            items = list(self._values.items())
+        result = {}
+        for (name, labels), value in sorted(items):
+            result.setdefault(name, []).append((dict(labels), value))
+        return result
+
+
+def process_rss_bytes():
+    """Current resident set size of this process (0 if unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return 0
+
+
+def cpu_temperature():
+    """SoC temperature in Celsius (Raspberry Pi thermal zone), None if unavailable"""
+    try:
+        with open('/sys/class/thermal/thermal_zone0/temp') as f:
+            return int(f.read().strip()) / 1000.0
+    except (OSError, ValueError):
+        return None
+
+
+def _percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[k]
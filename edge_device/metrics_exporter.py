@@ -0,0 +1,213 @@
+"""
+Local Metrics Endpoint
+=======================
+
+Exposes the edge device's counters, latency histograms and queue depths so a
+gate can be watched without reading its logs:
+
+- GET /metrics on a small HTTP server, Prometheus text format (scraped by a
+  Prometheus/VictoriaMetrics agent on the site network)
+- one JSON log line every log_interval seconds with the same numbers, for
+  devices that only ship logs
+
+Everything is read from counters PlateDetector already keeps; nothing is
+computed on the detection path. A scrape only takes the counter locks long
+enough to copy a few dicts.
+"""
+
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from metrics import cpu_temperature, process_rss_bytes
+
+
+PREFIX = 'edge'
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    parts = []
+    for key, value in sorted(labels.items()):
+        escaped = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{escaped}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def _flatten(series):
+    """[(labels, value)] -> {'k=v,k2=v2': value} for the JSON log line"""
+    return {
+        ','.join(f'{key}={value}' for key, value in sorted(labels.items())) or 'total': value
+        for labels, value in series
+    }
+
+
+def _format_bound(bound):
+    return '+Inf' if bound == float('inf') else repr(float(bound))
+
+
+class MetricsExporter:
+    """Prometheus /metrics endpoint + periodic JSON metrics log for PlateDetector"""
+
+    def __init__(self, detector, config):
+        """
+        Args:
+            detector: PlateDetector to read counters and queues from
+            config: full edge config (uses the 'metrics' section)
+        """
+        metrics_config = config.get('metrics', {})
+        self.logger = logging.getLogger(__name__)
+        self.detector = detector
+        self.host = metrics_config.get('host', '0.0.0.0')
+        self.port = metrics_config.get('port', 9108)
+        self.log_interval = metrics_config.get('log_interval', 60)
+
+        self._server = None
+        self._threads = []
+        self._stop_event = threading.Event()
+
+    def start(self):
+        if self._threads:
+            return
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+            self._server.daemon_threads = True
+        except OSError as e:
+            self.logger.error(f"Metrics endpoint not started on {self.host}:{self.port}: {e}")
+            self._server = None
+
+        if self._server is not None:
+            self._threads.append(threading.Thread(target=self._server.serve_forever,
+                                                  name='metrics-http', daemon=True))
+            self.logger.info(f"Metrics endpoint on http://{self.host}:{self._server.server_port}/metrics")
+        if self.log_interval:
+            self._threads.append(threading.Thread(target=self._log_loop, name='metrics-log', daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        self._threads = []
+
+    def snapshot(self):
+        """
+        All metrics as one dict:
+        {'counters': {name: [(labels, value)]}, 'histograms': {metric: {name: stats}},
+         'gauges': {name: [(labels, value)]}}
+        """
+        detector = self.detector
+        gauges = {}
+
+        def gauge(name, value, **labels):
+            if value is not None:
+                gauges.setdefault(name, []).append((labels, value))
+
+        depth, size, age = detector.offline_queue.stats()
+        gauge('offline_queue_depth', depth)
+        gauge('offline_queue_bytes', size)
+        gauge('offline_queue_oldest_age_seconds', age)
+        gauge('image_writer_pending', detector.image_writer.pending())
+        for pipeline in list(detector.pipelines):
+            gauge('candidate_queue_depth', pipeline.candidate_queue.qsize(), lane=pipeline.lane.name)
+        for lane in detector.lanes:
+            if lane.motion_gate.enabled:
+                gauge('motion_skipped_frames', lane.motion_gate.frames_skipped, lane=lane.name)
+            gauge('gate_state', 1, lane=lane.name, state=lane.gate_controller.state)
+        gauge('process_resident_memory_bytes', process_rss_bytes())
+        gauge('cpu_temperature_celsius', cpu_temperature())
+
+        return {
+            'counters': detector.counters.snapshot(),
+            'histograms': {
+                'stage_latency_seconds': detector.stage_histogram.snapshot(),
+                'pipeline_latency_seconds': detector.pipeline_histogram.snapshot(),
+                'upload_latency_seconds': detector.uploader.histogram.snapshot()
+            },
+            'gauges': gauges
+        }
+
+    def render(self):
+        """Snapshot in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = []
+
+        for name, series in snapshot['counters'].items():
+            metric = f'{PREFIX}_{name}_total'
+            lines.append(f'# TYPE {metric} counter')
+            for labels, value in series:
+                lines.append(f'{metric}{_format_labels(labels)} {value}')
+
+        for name, series in snapshot['histograms'].items():
+            if not series:
+                continue
+            metric = f'{PREFIX}_{name}'
+            lines.append(f'# TYPE {metric} histogram')
+            for stage, stats in sorted(series.items()):
+                for bound, cumulative in stats['buckets']:
+                    labels = _format_labels({'stage': stage, 'le': _format_bound(bound)})
+                    lines.append(f'{metric}_bucket{labels} {cumulative}')
+                labels = _format_labels({'stage': stage})
+                lines.append(f'{metric}_sum{labels} {stats["sum"]}')
+                lines.append(f'{metric}_count{labels} {stats["count"]}')
+
+        for name, series in snapshot['gauges'].items():
+            metric = f'{PREFIX}_{name}'
+            lines.append(f'# TYPE {metric} gauge')
+            for labels, value in series:
+                lines.append(f'{metric}{_format_labels(labels)} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+    def log_line(self):
+        """Snapshot as one compact JSON string (totals, counts and averages)"""
+        snapshot = self.snapshot()
+        payload = {
+            'counters': {name: _flatten(series) for name, series in snapshot['counters'].items()},
+            'latency': {
+                f'{metric}.{stage}': {'count': stats['count'],
+                                      'avg_ms': round(stats['sum'] / stats['count'] * 1000, 1)}
+                for metric, series in snapshot['histograms'].items()
+                for stage, stats in series.items() if stats['count']
+            },
+            'gauges': {name: _flatten(series) for name, series in snapshot['gauges'].items()}
+        }
+        return json.dumps(payload, sort_keys=True)
+
+    def _log_loop(self):
+        while not self._stop_event.wait(self.log_interval):
+            try:
+                self.logger.info(f"📊 metrics {self.log_line()}")
+            except Exception as e:
+                self.logger.error(f"Metrics log error: {e}")
+
+    def _make_handler(self):
+        exporter = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                try:
+                    body = exporter.render().encode()
+                except Exception as e:
+                    exporter.logger.error(f"Metrics render error: {e}")
+                    self.send_error(500)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return MetricsHandler
@@ -0,0 +1,120 @@
+"""
+Motion-Gated Inference
+=======================
+
+Cheap low-resolution motion check over the lane ROI that decides whether the
+full plate detector should run on a frame. The lane is empty most of the
+night, so detection only runs while something is moving in it (plus a short
+hold time), and at a higher rate during those bursts.
+"""
+
+import logging
+import time
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """Frame differencing against a running-average background over a lane ROI"""
+
+    def __init__(self, config):
+        motion_config = config.get('motion', {})
+        self.logger = logging.getLogger(__name__)
+
+        self.enabled = motion_config.get('enabled', False)
+        # ROI as fractions of the frame: [x1, y1, x2, y2]
+        self.roi = motion_config.get('roi', [0.0, 0.0, 1.0, 1.0])
+        self.width = motion_config.get('width', 160)
+        self.pixel_threshold = motion_config.get('pixel_threshold', 25)
+        self.min_changed_ratio = motion_config.get('min_changed_ratio', 0.01)
+        self.learning_rate = motion_config.get('learning_rate', 0.05)
+        self.hold_time = motion_config.get('hold_time', 2.0)
+        self.burst_every_n_frames = max(1, motion_config.get('burst_every_n_frames', 2))
+        self.idle_every_n_frames = motion_config.get('idle_every_n_frames', 0)
+
+        self.background = None
+        self.active_until = 0.0
+        self.active = False
+        self._burst_frames = 0
+        self._idle_frames = 0
+
+        # Counters
+        self.frames_seen = 0
+        self.frames_processed = 0
+        self.frames_skipped = 0
+        self.bursts = 0
+
+        if self.enabled:
+            self.logger.info(f"Motion gate enabled (ROI: {self.roi}, width: {self.width}px)")
+
+    def _lane_gray(self, frame):
+        """Crop lane ROI, downscale and blur to a small grayscale image"""
+        h, w = frame.shape[:2]
+        x1, y1, x2, y2 = self.roi
+        roi = frame[int(y1 * h):int(y2 * h), int(x1 * w):int(x2 * w)]
+
+        scale = self.width / roi.shape[1]
+        small = cv2.resize(roi, (self.width, max(1, int(roi.shape[0] * scale))),
+                           interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def detect_motion(self, frame):
+        """Return fraction of changed pixels in the lane ROI"""
+        gray = self._lane_gray(frame)
+
+        if self.background is None or self.background.shape != gray.shape:
+            self.background = gray.astype(np.float32)
+            return 0.0
+
+        diff = cv2.absdiff(gray, cv2.convertScaleAbs(self.background))
+        changed_ratio = np.count_nonzero(diff > self.pixel_threshold) / diff.size
+
+        # Slowly absorb lighting changes (and parked objects) into the background
+        cv2.accumulateWeighted(gray, self.background, self.learning_rate)
+
+        return changed_ratio
+
+    def should_process(self, frame):
+        """Decide whether the full detector should run on this frame"""
+        self.frames_seen += 1
+        now = time.time()
+
+        changed_ratio = self.detect_motion(frame)
+        moving = changed_ratio >= self.min_changed_ratio
+        if moving:
+            self.active_until = now + self.hold_time
+
+        if moving or now < self.active_until:
+            if not self.active:
+                self.active = True
+                self.bursts += 1
+                self._burst_frames = 0
+                self.logger.debug(f"Motion in lane ({changed_ratio*100:.1f}% changed)")
+
+            # Burst: run the detector at the higher burst rate
+            self._burst_frames += 1
+            process = (self._burst_frames - 1) % self.burst_every_n_frames == 0
+        else:
+            if self.active:
+                self.active = False
+                self.logger.info(f"Lane idle again. {self.summary()}")
+
+            # Idle: optional slow safety-net rate, otherwise skip entirely
+            self._idle_frames += 1
+            process = bool(self.idle_every_n_frames) and self._idle_frames % self.idle_every_n_frames == 0
+
+        if process:
+            self.frames_processed += 1
+        else:
+            self.frames_skipped += 1
+        return process
+
+    def summary(self):
+        """Skipped vs processed counters as a log string"""
+        total = max(1, self.frames_seen)
+        return (
+            f"Motion gate: processed={self.frames_processed} skipped={self.frames_skipped} "
+            f"({self.frames_skipped / total * 100:.0f}% skipped, bursts={self.bursts})"
+        )
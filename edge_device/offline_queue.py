@@ -0,0 +1,233 @@
+"""
+Store-and-Forward Offline Queue
+================================
+
+SQLite-backed queue for plate/face events that could not be delivered to
+the server (network blip, server restart, 5xx reply). A background drainer
+replays them with exponential backoff once the server is reachable again, so
+the parking record is not lost. Events carry event_at (capture time) and
+replays add replayed=true, so the backend records the event at the time the
+car was at the gate, not the replay time. A failed replay moves behind newer
+events, and an event the server keeps failing on is dropped after
+max_attempts, so it cannot hold back the rest of the queue. Disk usage is
+bounded by a byte budget and a maximum event age; the oldest events are
+dropped first.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+
+class OfflineQueue:
+    """Disk-backed queue of undelivered edge events with a replay thread"""
+
+    def __init__(self, config, send_fn):
+        """
+        Args:
+            config: full edge config (uses the 'offline_queue' section)
+            send_fn: callable(files, data) -> bool, True when delivered
+        """
+        queue_config = config.get('offline_queue', {})
+        self.logger = logging.getLogger(__name__)
+
+        self.enabled = queue_config.get('enabled', True)
+        self.path = queue_config.get('path', 'offline_queue.db')
+        self.max_bytes = queue_config.get('max_bytes', 50 * 1024 * 1024)
+        self.max_age = queue_config.get('max_age', 24 * 3600)
+        self.base_backoff = queue_config.get('base_backoff', 2.0)
+        self.max_backoff = queue_config.get('max_backoff', 300.0)
+        # Server replies (5xx) per event before it is dropped; unreachable server does not count
+        self.max_attempts = queue_config.get('max_attempts', 10)
+        self.log_interval = queue_config.get('log_interval', 60)
+
+        self.send_fn = send_fn
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        # Drainer backoff state (shared: if one replay fails the server is down)
+        self.failures = 0
+        self.next_attempt = 0.0
+
+        # Counters
+        self.enqueued = 0
+        self.delivered = 0
+        self.dropped = 0
+
+        if not self.enabled:
+            return
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                size INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                files TEXT NOT NULL,
+                plate BLOB,
+                face BLOB
+            )"""
+        )
+        self._conn.commit()
+
+        depth, size, _ = self.stats()
+        self.logger.info(f"Offline queue ready ({self.path}, {depth} pending, {size / 1024:.0f} KB)")
+
+    def enqueue(self, files, data):
+        """Persist an undelivered event (files as passed to requests.post)"""
+        if not self.enabled:
+            return False
+
+        plate = files.get('image')
+        face = files.get('face_image')
+        plate_bytes = plate[1] if plate else None
+        face_bytes = face[1] if face else None
+        size = len(plate_bytes or b'') + len(face_bytes or b'')
+
+        # Keep file names/mime types, blobs are stored separately
+        file_meta = {name: [entry[0], entry[2]] for name, entry in files.items()}
+
+        with self._lock:
+            self._enforce_budget(size)
+            self._conn.execute(
+                "INSERT INTO events (created_at, size, data, files, plate, face) VALUES (?, ?, ?, ?, ?, ?)",
+                (time.time(), size, json.dumps(data), json.dumps(file_meta), plate_bytes, face_bytes)
+            )
+            self._conn.commit()
+            self.enqueued += 1
+
+        self.logger.warning(f"📥 Event queued offline ({size / 1024:.0f} KB)")
+        self._wakeup.set()
+        return True
+
+    def _enforce_budget(self, incoming_size):
+        """Drop expired events, then oldest events until the new one fits"""
+        cutoff = time.time() - self.max_age
+        cur = self._conn.execute("DELETE FROM events WHERE created_at < ?", (cutoff,))
+        self.dropped += cur.rowcount
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM events").fetchone()[0]
+        while total + incoming_size > self.max_bytes:
+            row = self._conn.execute("SELECT id, size FROM events ORDER BY id LIMIT 1").fetchone()
+            if row is None:
+                break
+            self._conn.execute("DELETE FROM events WHERE id = ?", (row[0],))
+            total -= row[1]
+            self.dropped += 1
+            self.logger.warning("Offline queue over budget, dropped oldest event")
+
+    def stats(self):
+        """Return (depth, total_bytes, oldest_age_seconds)"""
+        if not self.enabled:
+            return 0, 0, 0.0
+        with self._lock:
+            depth, size, oldest = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), MIN(created_at) FROM events"
+            ).fetchone()
+        age = time.time() - oldest if oldest else 0.0
+        return depth, size, age
+
+    def start(self):
+        """Start the background drainer thread"""
+        if not self.enabled or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._drain_loop, name='offline-drainer', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        if self.enabled:
+            self._conn.close()
+
+    def _next_event(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, created_at, attempts, data, files, plate, face FROM events ORDER BY id LIMIT 1"
+            ).fetchone()
+
+    def _drain_loop(self):
+        last_log = 0.0
+
+        while not self._stop_event.is_set():
+            now = time.time()
+
+            if self.log_interval and now - last_log >= self.log_interval:
+                last_log = now
+                depth, size, age = self.stats()
+                if depth:
+                    self.logger.info(
+                        f"📊 Offline queue: depth={depth} bytes={size} oldest={age:.0f}s "
+                        f"delivered={self.delivered} dropped={self.dropped}"
+                    )
+
+            if now < self.next_attempt:
+                self._wakeup.wait(timeout=min(1.0, self.next_attempt - now))
+                self._wakeup.clear()
+                continue
+
+            row = self._next_event()
+            if row is None:
+                self._wakeup.wait(timeout=1.0)
+                self._wakeup.clear()
+                continue
+
+            event_id, created_at, attempts, data, file_meta, plate, face = row
+            data = json.loads(data)
+            # Events queued before event_at was sent: best known time is the enqueue
+            data.setdefault('event_at', str(created_at))
+            data['replayed'] = 'true'
+
+            files = {}
+            blobs = {'image': plate, 'face_image': face}
+            for name, (filename, mime) in json.loads(file_meta).items():
+                if blobs.get(name) is not None:
+                    files[name] = (filename, blobs[name], mime)
+
+            answered = True
+            try:
+                delivered = self.send_fn(files, data)
+            except Exception as e:
+                self.logger.debug(f"Replay failed: {e}")
+                delivered, answered = False, False
+
+            dropped = False
+            with self._lock:
+                if delivered:
+                    self._conn.execute("DELETE FROM events WHERE id = ?", (event_id,))
+                    self.delivered += 1
+                    self.failures = 0
+                    self.next_attempt = 0.0
+                else:
+                    # Only server replies count: an outage must not use up attempts
+                    if answered:
+                        attempts += 1
+                    if self.max_attempts and attempts >= self.max_attempts:
+                        self._conn.execute("DELETE FROM events WHERE id = ?", (event_id,))
+                        self.dropped += 1
+                        dropped = True
+                    else:
+                        # Behind newer events, so one failing event does not block them
+                        self._conn.execute(
+                            "UPDATE events SET attempts = ?, id = (SELECT MAX(id) + 1 FROM events) WHERE id = ?",
+                            (attempts, event_id)
+                        )
+                    self.failures += 1
+                    backoff = min(self.base_backoff * (2 ** (self.failures - 1)), self.max_backoff)
+                    self.next_attempt = time.time() + backoff
+                self._conn.commit()
+
+            if delivered:
+                self.logger.info(f"📤 Replayed queued event (age {time.time() - created_at:.0f}s)")
+            elif dropped:
+                self.logger.warning(f"Dropped queued event after {attempts} failed replays")
+            else:
+                self.logger.warning(f"Server still unreachable, next replay in {backoff:.0f}s")
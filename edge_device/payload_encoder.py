@@ -0,0 +1,121 @@
+"""
+Bandwidth-Aware Payload Encoder
+================================
+
+The plate crop used to be sent as JPEG q95 and, when no face was found, the
+raw full camera frame as JPEG q70 - the full frame dominated upload time on
+cellular / weak Wi-Fi uplinks. PayloadEncoder encodes each event within a
+byte budget:
+
+- the plate crop is never downscaled (OCR needs the resolution); only its
+  quality may drop, down to plate_min_quality
+- the face crop / fallback full frame is downscaled to a maximum side length,
+  then quality is lowered step by step until the event fits the budget
+- optional WebP (smaller than JPEG at the same quality) when OpenCV has it
+"""
+
+import logging
+
+import cv2
+
+
+MIME_TYPES = {'jpeg': 'image/jpeg', 'webp': 'image/webp'}
+EXTENSIONS = {'jpeg': '.jpg', 'webp': '.webp'}
+QUALITY_FLAGS = {'jpeg': cv2.IMWRITE_JPEG_QUALITY, 'webp': cv2.IMWRITE_WEBP_QUALITY}
+
+
+class PayloadEncoder:
+    """Encodes plate + face images for one event within a byte budget"""
+
+    def __init__(self, config):
+        """
+        Args:
+            config: full edge config (uses the 'payload' section)
+        """
+        payload_config = config.get('payload', {})
+        self.logger = logging.getLogger(__name__)
+
+        self.format = payload_config.get('format', 'jpeg')
+        if self.format == 'webp' and not cv2.haveImageWriter('.webp'):
+            self.logger.warning("OpenCV built without WebP support, falling back to JPEG")
+            self.format = 'jpeg'
+
+        self.byte_budget = payload_config.get('byte_budget', 150 * 1024)
+        self.plate_quality = payload_config.get('plate_quality', 95)
+        self.plate_min_quality = payload_config.get('plate_min_quality', 80)
+        self.face_quality = payload_config.get('face_quality', 85)
+        self.frame_quality = payload_config.get('frame_quality', 70)
+        self.min_quality = payload_config.get('min_quality', 40)
+        self.quality_step = payload_config.get('quality_step', 10)
+        self.face_max_side = payload_config.get('face_max_side', 480)
+        self.frame_max_side = payload_config.get('frame_max_side', 960)
+
+        # Counters
+        self.events = 0
+        self.bytes_sent = 0
+
+    def _encode(self, img, quality):
+        ok, buf = cv2.imencode(EXTENSIONS[self.format], img, [int(QUALITY_FLAGS[self.format]), int(quality)])
+        if not ok:
+            raise ValueError(f"Failed to encode image as {self.format}")
+        return buf.tobytes()
+
+    def _encode_within(self, img, quality, min_quality, budget):
+        """Lower quality step by step until the encoded image fits budget"""
+        data = self._encode(img, quality)
+        while len(data) > budget and quality > min_quality:
+            quality = max(min_quality, quality - self.quality_step)
+            data = self._encode(img, quality)
+        return data, quality
+
+    @staticmethod
+    def _limit_side(img, max_side):
+        h, w = img.shape[:2]
+        if not max_side or max(h, w) <= max_side:
+            return img
+        scale = max_side / max(h, w)
+        return cv2.resize(img, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+
+    def encode(self, plate_img, face_img=None, face_detected=False):
+        """
+        Encode one event.
+
+        Returns: files dict for requests ({'image': (...), 'face_image': (...)})
+        """
+        mime = MIME_TYPES[self.format]
+        ext = EXTENSIONS[self.format]
+
+        # Plate: full resolution, quality only drops if the crop alone busts the budget
+        plate_bytes, plate_q = self._encode_within(
+            plate_img, self.plate_quality, self.plate_min_quality, self.byte_budget
+        )
+        files = {'image': (f'plate{ext}', plate_bytes, mime)}
+        log = f"plate={len(plate_bytes) / 1024:.1f}KB q{plate_q}"
+
+        if face_img is not None:
+            remaining = max(0, self.byte_budget - len(plate_bytes))
+            if face_detected:
+                img = self._limit_side(face_img, self.face_max_side)
+                quality = self.face_quality
+            else:
+                # Full frame fallback: only context for the app, downscale first
+                img = self._limit_side(face_img, self.frame_max_side)
+                quality = self.frame_quality
+
+            face_bytes, face_q = self._encode_within(img, quality, self.min_quality, remaining)
+            files['face_image'] = (f'face{ext}', face_bytes, mime)
+            kind = 'face' if face_detected else 'frame'
+            log += f" | {kind}={len(face_bytes) / 1024:.1f}KB q{face_q} {img.shape[1]}x{img.shape[0]}"
+
+        total = sum(len(entry[1]) for entry in files.values())
+        self.events += 1
+        self.bytes_sent += total
+
+        over = " (over budget)" if total > self.byte_budget else ""
+        self.logger.info(f"📦 Payload {self.format}: {log} | total={total / 1024:.1f}KB{over}")
+        return files
+
+    def summary(self):
+        """Average bytes per event as a log string"""
+        average = self.bytes_sent / self.events if self.events else 0
+        return f"Payload: events={self.events} avg={average / 1024:.1f}KB total={self.bytes_sent / 1024:.0f}KB"
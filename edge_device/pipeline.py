@@ -0,0 +1,270 @@
+"""
+Pipelined Capture / Inference / Network Stages
+===============================================
+
+In the sequential loop the camera is only read after detection, the server
+round trip and the gate action have finished, so the V4L2 buffer fills with
+stale frames. Here each stage runs on its own thread:
+
+1. Grabber   - reads the camera continuously, keeps only the newest frame
+2. Inference - detects plates on the newest frame and selects candidates
+3. Network   - face capture, server call, gate action
+
+Stages are connected by bounded queues and every plate candidate carries its
+capture timestamp so end-to-end (capture -> gate) latency can be measured.
+When a video file ends, the inference stage flushes the tracks whose
+best-frame window is still open and `finished` is set once the network stage
+has dispatched them, so the last vehicle of a recording is not lost.
+"""
+
+import logging
+import queue
+import threading
+import time
+
+from metrics import LatencyTracker
+
+
+# Order used when logging per-stage latency
+STAGE_ORDER = ['frame_age', 'inference', 'queue_wait', 'network', 'end_to_end']
+
+
+class LatestFrameGrabber(threading.Thread):
+    """Reads frames as fast as the camera delivers them, single-slot buffer"""
+
+    def __init__(self, cap, name='frame-grabber'):
+        super().__init__(name=name, daemon=True)
+        self.cap = cap
+        self.logger = logging.getLogger(__name__)
+        self._cond = threading.Condition()
+        self._frame = None
+        self._seq = 0
+        self._captured_at = 0.0
+        self._stop_event = threading.Event()
+        self.frames_captured = 0
+        # Set when a video file ended (not on stop())
+        self.finished = False
+
+    def run(self):
+        while not self._stop_event.is_set():
+            ret, frame = self.cap.read()
+            if not ret:
+                if getattr(self.cap, 'finished', False):
+                    # Video file ended
+                    with self._cond:
+                        self.finished = True
+                        self._cond.notify_all()
+                    break
+                if self.cap.isOpened():
+                    # Otherwise the source is reconnecting and logs that itself
+                    self.logger.warning("Failed to read frame")
+                time.sleep(0.05)
+                continue
+
+            with self._cond:
+                # Overwrite the slot - older unprocessed frames are simply dropped
+                self._frame = frame
+                self._seq += 1
+                self._captured_at = time.time()
+                self.frames_captured += 1
+                self._cond.notify_all()
+
+    def latest(self):
+        """Return (seq, captured_at, frame) of the newest frame without waiting"""
+        with self._cond:
+            return self._seq, self._captured_at, self._frame
+
+    def wait_for_frame(self, after_seq, timeout=1.0):
+        """Block until a frame newer than after_seq is available (None on timeout or end of video)"""
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._seq > after_seq or self._stop_event.is_set() or self.finished,
+                timeout=timeout
+            )
+            if self._seq <= after_seq:
+                return None
+            return self._seq, self._captured_at, self._frame
+
+    def stop(self):
+        self._stop_event.set()
+        with self._cond:
+            self._cond.notify_all()
+
+
+class DetectionPipeline:
+    """Runs PlateDetector as grabber -> inference -> network threads (one lane)"""
+
+    def __init__(self, detector, cap, save_dir=None, lane=None):
+        self.detector = detector
+        self.save_dir = save_dir
+        self.lane = lane or detector.lane
+        self.logger = logging.getLogger(__name__)
+
+        pipeline_config = detector.config.get('pipeline', {})
+        queue_size = pipeline_config.get('queue_size', 2)
+        self.stats_interval = pipeline_config.get('stats_interval', 30)
+
+        self.grabber = LatestFrameGrabber(cap, name=f'grabber-{self.lane.name}')
+        self.candidate_queue = queue.Queue(maxsize=queue_size)
+        # Results for the preview overlay; only the most recent ones matter
+        self.result_queue = queue.Queue(maxsize=queue_size * 4)
+        self.latency = LatencyTracker(histogram=detector.pipeline_histogram)
+
+        self._stop_event = threading.Event()
+        # Inference stage done with a finished video / every candidate dispatched
+        self._inference_done = threading.Event()
+        self.finished = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._inference_loop, name=f'inference-{self.lane.name}', daemon=True),
+            threading.Thread(target=self._network_loop, name=f'network-{self.lane.name}', daemon=True)
+        ]
+        self.frames_processed = 0
+
+    def start(self):
+        # Registered for the metrics exporter (queue depths)
+        self.detector.pipelines.append(self)
+        self.grabber.start()
+        for thread in self._threads:
+            thread.start()
+        self.logger.info(f"[{self.lane.name}] Pipeline started (grabber, inference, network threads)")
+
+    def stop(self):
+        self._stop_event.set()
+        self.grabber.stop()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        self.grabber.join(timeout=2.0)
+        if self in self.detector.pipelines:
+            self.detector.pipelines.remove(self)
+        self.logger.info(f"[{self.lane.name}] Pipeline stopped. {self.latency.format_summary(STAGE_ORDER)}")
+
+    def latest_frame(self):
+        """Newest camera frame for the preview window"""
+        return self.grabber.latest()[2]
+
+    def drain_results(self):
+        """Return results finished since the last call (non-blocking)"""
+        results = []
+        while True:
+            try:
+                results.append(self.result_queue.get_nowait())
+            except queue.Empty:
+                return results
+
+    def _inference_loop(self):
+        last_seq = 0
+        last_stats = time.time()
+
+        while not self._stop_event.is_set():
+            item = self.grabber.wait_for_frame(last_seq)
+            if item is None:
+                if self.grabber.finished:
+                    # Video ended: the last vehicle's window may still be open
+                    candidates = self.detector.collect_candidates(self.lane, time.time(), flush=True)
+                    self._enqueue(candidates, 0.0)
+                    self._inference_done.set()
+                    return
+                continue
+            seq, captured_at, frame = item
+            # Frames overwritten in the grabber slot before we got to them
+            counters = self.detector.counters
+            counters.inc('frames_captured', seq - last_seq, lane=self.lane.name)
+            if seq - last_seq > 1:
+                counters.inc('frames_dropped', seq - last_seq - 1, lane=self.lane.name)
+            last_seq = seq
+
+            if self.stats_interval and time.time() - last_stats >= self.stats_interval:
+                last_stats = time.time()
+                self._log_stats()
+
+            # Skip frames while the lane is empty (motion gate)
+            if not self.detector.should_run_detection(frame, lane=self.lane):
+                continue
+
+            infer_start = time.time()
+            self.latency.record('frame_age', infer_start - captured_at)
+
+            try:
+                detections = self.detector.detect(frame, lane=self.lane)
+                candidates = self.detector.select_plates(frame, detections, self.save_dir, captured_at,
+                                                         lane=self.lane)
+            except Exception as e:
+                self.logger.error(f"Inference stage error: {e}")
+                continue
+
+            detect_time = time.time() - infer_start
+            self.latency.record('inference', detect_time)
+            self.frames_processed += 1
+            self._enqueue(candidates, detect_time)
+
+    def _enqueue(self, candidates, detect_time):
+        for candidate in candidates:
+            candidate['detect_time'] = detect_time
+            candidate['queued_at'] = time.time()
+            # Bounded queue: back-pressure the inference stage while the
+            # network stage is busy. The grabber keeps only the newest
+            # frame, so waiting here never makes the next frame stale.
+            while not self._stop_event.is_set():
+                try:
+                    self.candidate_queue.put((candidate['frame'], candidate), timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+
+    def _log_stats(self):
+        self.logger.info(
+            f"📊 [{self.lane.name}] Pipeline: captured={self.grabber.frames_captured} "
+            f"processed={self.frames_processed} | {self.latency.format_summary(STAGE_ORDER)}"
+        )
+        if self.lane.motion_gate.enabled:
+            self.logger.info(f"📊 [{self.lane.name}] {self.lane.motion_gate.summary()}")
+        if self.lane is not self.detector.lanes[0]:
+            # Shared components are logged once, by the first lane
+            return
+        if self.detector.batch_scheduler is not None:
+            self.logger.info(f"📊 {self.detector.batch_scheduler.summary()}")
+        if self.detector.uploader.latency.summary():
+            self.logger.info(f"📊 {self.detector.uploader.summary()}")
+        if self.detector.face_capture.latency.summary():
+            self.logger.info(f"📊 {self.detector.face_capture.summary()}")
+        if self.detector.payload_encoder.events:
+            self.logger.info(f"📊 {self.detector.payload_encoder.summary()}")
+        if self.detector.image_writer.written or self.detector.image_writer.dropped:
+            self.logger.info(f"📊 {self.detector.image_writer.summary()}")
+
+    def _network_loop(self):
+        while not self._stop_event.is_set():
+            # Checked before get(): the flushed candidates are queued before this is set
+            inference_done = self._inference_done.is_set()
+            try:
+                frame, candidate = self.candidate_queue.get(timeout=0.5)
+            except queue.Empty:
+                if inference_done:
+                    self.finished.set()
+                    return
+                continue
+
+            net_start = time.time()
+            self.latency.record('queue_wait', net_start - candidate['queued_at'])
+
+            try:
+                result = self.detector.dispatch_plate(frame, candidate, self.save_dir)
+            except Exception as e:
+                self.logger.error(f"Network stage error: {e}")
+                continue
+
+            self.latency.record('network', time.time() - net_start)
+            if result is None:
+                continue
+
+            self.latency.record('end_to_end', result['gate_at'] - candidate['captured_at'])
+
+            try:
+                self.result_queue.put_nowait(result)
+            except queue.Full:
+                # Preview overlay is best effort - drop the oldest result
+                try:
+                    self.result_queue.get_nowait()
+                except queue.Empty:
+                    pass
+                self.result_queue.put_nowait(result)
@@ -17,9 +17,29 @@ import requests
 import time
 import yaml
 import argparse
+import copy
+import hashlib
+import json
 from pathlib import Path
 from datetime import datetime
 import logging
+import threading
+
+from batch_inference import BatchInferenceScheduler, batch_capacity
+from best_frame import BestFrameSelector
+from face_capture import FaceCapture
+from frame_source import FrameSource
+from image_writer import ImageWriter
+from metrics import STAGE_BUCKETS, Counters, LatencyHistogram, LatencyTracker
+from metrics_exporter import MetricsExporter
+from motion_gate import MotionGate
+from offline_queue import OfflineQueue
+from payload_encoder import PayloadEncoder
+from pipeline import DetectionPipeline
+from preprocess import LetterboxPreprocessor, parse_input_size
+from tracker import PlateTracker
+from uploader import Uploader
+from yolo_decode import decode_detections, merge_detections
 
 try:
     import onnxruntime as ort
@@ -28,17 +48,39 @@ except ImportError:
     ort = None
 
 
+class GateState:
+    """States of the gate barrier state machine"""
+    CLOSED = 'CLOSED'
+    OPENING = 'OPENING'
+    OPEN = 'OPEN'
+    CLOSING = 'CLOSING'
+
+
 class GateController:
-    """Controls the parking gate barrier"""
+    """
+    Controls the parking gate barrier.
+    
+    Timer-driven state machine: CLOSED -> OPENING -> OPEN -> CLOSING -> CLOSED.
+    Transitions run on timer threads, so execute_gate_action returns immediately
+    and the detection loop keeps running while the gate is open. A repeat OPEN
+    while the gate is opening/open extends the close deadline instead.
+    """
     
     def __init__(self, config):
         self.config = config
         self.logger = logging.getLogger(__name__)
         self.gate_type = config.get('gate', {}).get('type', 'MASUK')
         self.open_duration = config.get('gate', {}).get('open_duration', 5)
+        self.travel_time = config.get('gate', {}).get('travel_time', 1.0)
         self.gpio_enabled = config.get('gpio', {}).get('enabled', False)
         self.relay_pin = config.get('gpio', {}).get('relay_pin', 17)
         
+        # State machine
+        self.state = GateState.CLOSED
+        self.close_at = 0.0
+        self._timer = None
+        self._lock = threading.RLock()
+        
         if self.gpio_enabled:
             try:
                 import RPi.GPIO as GPIO
@@ -80,17 +122,66 @@ class GateController:
         if self.gpio_enabled:
             self.GPIO.output(self.relay_pin, self.GPIO.LOW)
     
+    def _set_state(self, state):
+        self.logger.debug(f"Gate state: {self.state} -> {state}")
+        self.state = state
+    
+    def _schedule(self, delay, callback):
+        """Schedule the next state transition (replaces any pending one)"""
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(max(0.0, delay), callback)
+        self._timer.daemon = True
+        self._timer.start()
+    
+    def request_open(self):
+        """Open the gate, or extend the open period if it is already open"""
+        with self._lock:
+            now = time.time()
+            
+            if self.state in (GateState.CLOSED, GateState.CLOSING):
+                # (Re)open - a closing barrier reverses for the next vehicle
+                self.close_at = now + self.travel_time + self.open_duration
+                self._set_state(GateState.OPENING)
+                self.open_gate()
+                self._schedule(self.travel_time, self._on_opened)
+            else:
+                # Already opening/open: push the close deadline back
+                self.close_at = max(self.close_at, now + self.open_duration)
+                self.logger.info(f"Gate already {self.state}, close extended by {self.open_duration}s")
+    
+    def _on_opened(self):
+        with self._lock:
+            if self.state != GateState.OPENING:
+                return
+            self._set_state(GateState.OPEN)
+            self.logger.info(f"Gate open, closing in {self.close_at - time.time():.1f}s")
+            self._schedule(self.close_at - time.time(), self._on_close_due)
+    
+    def _on_close_due(self):
+        with self._lock:
+            if self.state != GateState.OPEN:
+                return
+            remaining = self.close_at - time.time()
+            if remaining > 0.01:
+                # Deadline was extended while waiting
+                self._schedule(remaining, self._on_close_due)
+                return
+            self._set_state(GateState.CLOSING)
+            self.close_gate()
+            self._schedule(self.travel_time, self._on_closed)
+    
+    def _on_closed(self):
+        with self._lock:
+            if self.state != GateState.CLOSING:
+                return
+            self._set_state(GateState.CLOSED)
+    
     def execute_gate_action(self, action, message=""):
-        """Execute gate action based on server response"""
+        """Execute gate action based on server response (non-blocking)"""
         if action == "OPEN":
             print(f"\n✅ {message}")
-            self.open_gate()
-            
-            # Wait for vehicle to pass
-            self.logger.info(f"Waiting {self.open_duration}s for vehicle to pass...")
-            time.sleep(self.open_duration)
-            
-            self.close_gate()
+            self.request_open()
             return True
         
         elif action == "DENY":
@@ -103,15 +194,54 @@ class GateController:
             return False
     
     def cleanup(self):
-        """Cleanup GPIO on exit"""
+        """Close the gate and cleanup GPIO on exit"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self.state != GateState.CLOSED:
+                self.close_gate()
+                self._set_state(GateState.CLOSED)
+        
         if self.gpio_enabled:
             try:
-                self.GPIO.cleanup()
+                # Only this lane's pin: other lanes may still be driving theirs
+                self.GPIO.cleanup(self.relay_pin)
                 self.logger.info("GPIO cleanup completed")
             except Exception as e:
                 self.logger.error(f"GPIO cleanup error: {e}")
 
 
+def merge_config(base, overrides):
+    """Deep-merge overrides into a copy of base (per-camera config sections)"""
+    merged = copy.deepcopy(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_config(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+class Lane:
+    """
+    One camera and the gate it controls.
+    
+    Holds everything that is per lane - its config (gate type, parkiran_id,
+    camera source, relay pin), GateController, plate tracker and motion gate.
+    The detection model, uploader and queues are shared by all lanes.
+    """
+    
+    def __init__(self, name, config):
+        self.name = name
+        self.config = config
+        self.gate_controller = GateController(config)
+        self.motion_gate = MotionGate(config)
+        self.tracker = PlateTracker(config)
+        # Plate search regions [x1, y1, x2, y2] as frame fractions (empty = whole frame)
+        self.rois = config['camera'].get('detection_rois') or []
+
+
 class PlateDetector:
     def __init__(self, config_path='config.yaml'):
         """Initialize plate detector with configuration"""
@@ -126,19 +256,49 @@ class PlateDetector:
         )
         self.logger = logging.getLogger(__name__)
         
-        # Initialize gate controller
-        self.gate_controller = GateController(self.config)
+        # One lane per camera (gate controller, tracker, motion gate each)
+        self.lanes = self.create_lanes()
+        self.lane = self.lanes[0]
+        # Primary lane shortcuts (single-camera setups)
+        self.gate_controller = self.lane.gate_controller
+        self.tracker = self.lane.tracker
+        self.motion_gate = self.lane.motion_gate
         
         # Load model
         model_path = self.config['model']['path']
-        self.img_size = self.config['model']['img_size']
+        # Square (640) or rectangular [height, width] model input
+        self.input_size = parse_input_size(self.config['model']['img_size'])
         self.conf_threshold = self.config['model']['confidence_threshold']
+        self.iou_threshold = self.config['model'].get('iou_threshold', 0.45)
+        self.output_layout = self.config['model'].get('output_layout', 'auto')
+        
+        # Coarse/fine cascade: whole frame at img_size finds candidates, then
+        # native-resolution crops around them are detected again
+        cascade_config = self.config.get('cascade', {})
+        self.cascade_enabled = cascade_config.get('enabled', False)
+        self.coarse_threshold = cascade_config.get('coarse_confidence', 0.25)
+        self.cascade_max_regions = cascade_config.get('max_regions', 3)
+        self.cascade_context = cascade_config.get('context', 4.0)
+        self.cascade_min_region = cascade_config.get('min_region', 160)
+        # Decode down to the coarse threshold, final results use conf_threshold
+        self.decode_threshold = (
+            min(self.conf_threshold, self.coarse_threshold) if self.cascade_enabled else self.conf_threshold
+        )
+        
+        # Per-stage timings (preprocess/inference/postprocess/encode/face) and
+        # operational counters, exported by metrics_exporter.py
+        self.stage_histogram = LatencyHistogram(STAGE_BUCKETS)
+        self.stage_latency = LatencyTracker(histogram=self.stage_histogram)
+        self.pipeline_histogram = LatencyHistogram(STAGE_BUCKETS)
+        self.counters = Counters()
+        self.pipelines = []
         
         self.logger.info(f"Loading detection model from {model_path}")
         
         if model_path.endswith('.onnx') and ort is not None:
-            self.session = ort.InferenceSession(model_path)
+            self.session = self.create_onnx_session(model_path)
             self.input_name = self.session.get_inputs()[0].name
+            self.input_size = self.check_input_size(self.input_size)
             self.use_onnx = True
             self.logger.info("Using ONNX Runtime")
         else:
@@ -147,145 +307,225 @@ class PlateDetector:
             self.use_onnx = False
             self.logger.info("Using OpenCV DNN")
         
+        # Preallocated letterbox canvas + input tensor, reused for every frame
+        self.preprocessor = LetterboxPreprocessor(self.input_size)
+        self.logger.info(f"Model input: {self.input_size[1]}x{self.input_size[0]} (WxH)")
+        
         # Server configuration
         self.server_url = self.config['server']['url']
         self.server_timeout = self.config['server']['timeout']
         
         self.logger.info(f"Using Server URL: {self.server_url}")
         
+        # Pooled keep-alive uploader (connection opened before the first plate)
+        self.uploader = Uploader(self.config)
+        self.uploader.prewarm()
+        
+        # Plate/face encoding within a per-event byte budget
+        self.payload_encoder = PayloadEncoder(self.config)
+        
+        # Store-and-forward queue for events the server did not receive
+        self.offline_queue = OfflineQueue(self.config, self.replay_event)
+        self.offline_queue.start()
+        
+        # All image saving happens on a background writer (no SD-card I/O in the loop)
+        self.image_writer = ImageWriter(self.config)
+        self.image_writer.start()
+        self.save_debug_images = self.config.get('debug', {}).get('save_images', False)
+        
         # Camera configuration
-        self.camera_index = self.config['camera']['index']
         self.camera_width = self.config['camera']['width']
         self.camera_height = self.config['camera']['height']
         
+        # Inference is shared by all lanes; preprocess buffers are not thread-safe
+        self._infer_lock = threading.Lock()
+        
         self.logger.info("PlateDetector initialized successfully")
 
-        # Face detection configuration (lightweight Haar Cascade)
-        face_config = self.config.get('face_detection', {})
-        self.face_detection_enabled = face_config.get('enabled', True)
-        self.face_min_size = face_config.get('min_face_size', 80)
-        self.face_scale_factor = face_config.get('scale_factor', 1.1)
-        self.face_min_neighbors = face_config.get('min_neighbors', 5)
-        
-        if self.face_detection_enabled:
-            # Load Haar Cascade (built-in OpenCV, very lightweight)
-            cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-            self.face_cascade = cv2.CascadeClassifier(cascade_path)
-            self.logger.info("Face detection enabled (Haar Cascade)")
-        else:
-            self.face_cascade = None
-            self.logger.info("Face detection disabled")
+        # Face capture on a downscaled driver ROI (Haar Cascade or YuNet)
+        self.face_capture = FaceCapture(self.config, histogram=self.stage_histogram)
 
-        # Deduplication state
-        self.last_detection = {
-            'bbox': None,
-            'time': 0,
-            'plate_text': None
-        }
+        # Warm-up inferences before the camera opens (first real frame is fast)
+        self.batch_scheduler = None
+        self.warmup(self.config['model'].get('warmup_runs', 2))
+        
+        # Multi-camera: one session.run for the newest frame of every lane
+        self.batch_scheduler = self.create_batch_scheduler()
+        
+        # Best-frame selection: upload only the sharpest crop per vehicle
+        self.best_frame = BestFrameSelector(self.config)
+        
+        # Optional Prometheus /metrics endpoint + periodic JSON metrics log
+        self.metrics_exporter = None
+        if self.config.get('metrics', {}).get('enabled', False):
+            self.metrics_exporter = MetricsExporter(self, self.config)
+            self.metrics_exporter.start()
     
-    def calculate_iou(self, boxA, boxB):
-        """Calculate Intersection over Union (IoU) of two bounding boxes"""
-        # Determine the (x, y)-coordinates of the intersection rectangle
-        xA = max(boxA[0], boxB[0])
-        yA = max(boxA[1], boxB[1])
-        xB = min(boxA[2], boxB[2])
-        yB = min(boxA[3], boxB[3])
-
-        # Compute the area of intersection rectangle
-        interArea = max(0, xB - xA + 1) * max(0, yB - yA + 1)
-
-        # Compute the area of both the prediction and ground-truth rectangles
-        boxAArea = (boxA[2] - boxA[0] + 1) * (boxA[3] - boxA[1] + 1)
-        boxBArea = (boxB[2] - boxB[0] + 1) * (boxB[3] - boxB[1] + 1)
-
-        # Compute the intersection over union by taking the intersection
-        # area and dividing it by the sum of prediction + ground-truth
-        # areas - the interesection area
-        iou = interArea / float(boxAArea + boxBArea - interArea)
-
-        return iou
+    def create_lanes(self):
+        """
+        Lanes from the 'cameras' list, each entry overriding the global
+        camera/gate/gpio/... sections. Without 'cameras', a single lane uses
+        the global config as is.
+        """
+        cameras = self.config.get('cameras') or []
+        if not cameras:
+            name = self.config.get('gate', {}).get('type', 'MASUK').lower()
+            return [Lane(name, self.config)]
+        
+        lanes = []
+        for i, camera in enumerate(cameras):
+            overrides = {key: value for key, value in camera.items() if key != 'name'}
+            lane_config = merge_config(self.config, overrides)
+            name = camera.get('name') or f"{lane_config['gate'].get('type', 'MASUK').lower()}-{i}"
+            lanes.append(Lane(name, lane_config))
+            self.logger.info(
+                f"Lane '{name}': {lane_config['gate'].get('type')} parkiran {lane_config['gate'].get('parkiran_id')}, "
+                f"source {lane_config['camera'].get('source', lane_config['camera'].get('index'))}"
+            )
+        return lanes
     
-    def detect_and_crop_face(self, frame):
+    def create_batch_scheduler(self):
+        """Cross-lane batching, only with several lanes and a batch-capable ONNX model"""
+        if len(self.lanes) < 2 or not self.use_onnx:
+            return None
+        if not self.config.get('batching', {}).get('enabled', True):
+            return None
+        if batch_capacity(self.session) == 1:
+            self.logger.warning("Model has a fixed batch size of 1, lanes run inference separately "
+                                "(export with dynamic=True to enable batching)")
+            return None
+        
+        scheduler = BatchInferenceScheduler(self, len(self.lanes), self.config)
+        if self.config['model'].get('warmup_runs', 2) > 0:
+            scheduler.warmup()
+        scheduler.start()
+        return scheduler
+    
+    def create_onnx_session(self, model_path):
         """
-        Detect face using Haar Cascade (lightweight, built-in OpenCV).
+        Create ONNX Runtime session with configured threading/optimization.
         
-        Returns: (face_image, face_detected)
-        - face_image: Cropped face if detected, else RAW full frame (no resize)
-        - face_detected: True if face was detected, False = full frame fallback
+        The optimized graph is saved to optimized_model_path on first boot;
+        later boots load it directly and skip graph optimization. A sidecar
+        .json records the source model's size and SHA-256 (plus ORT version
+        and optimization level); the cache is rebuilt when they do not match,
+        so a replaced model is picked up even if its mtime was preserved.
         """
-        if not self.face_detection_enabled or self.face_cascade is None:
-            # Face detection disabled, return full frame
-            return frame, False
+        ort_config = self.config['model'].get('onnxruntime', {})
         
-        try:
-            # Convert to grayscale for face detection
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            
-            # Detect faces using Haar Cascade
-            faces = self.face_cascade.detectMultiScale(
-                gray,
-                scaleFactor=self.face_scale_factor,
-                minNeighbors=self.face_min_neighbors,
-                minSize=(self.face_min_size, self.face_min_size)
-            )
-            
-            if len(faces) > 0:
-                # Take largest face (most likely the driver/rider)
-                x, y, w, h = max(faces, key=lambda f: f[2] * f[3])
-                
-                # Add padding for better face capture (20%)
-                pad = int(w * 0.2)
-                x1 = max(0, x - pad)
-                y1 = max(0, y - pad)
-                x2 = min(frame.shape[1], x + w + pad)
-                y2 = min(frame.shape[0], y + h + pad)
-                
-                face_img = frame[y1:y2, x1:x2]
-                self.logger.info(f"👤 Face detected: {w}x{h} at ({x}, {y})")
-                return face_img, True
-            else:
-                # No face detected (helmet, etc.) - return RAW full frame
-                self.logger.info("👤 No face detected (helmet?), using full frame")
-                return frame, False
-                
-        except Exception as e:
-            self.logger.error(f"Face detection error: {e}")
-            return frame, False
-    
-    def letterbox(self, img, new_shape=(640, 640)):
-        """Resize and pad image while maintaining aspect ratio"""
-        shape = img.shape[:2]  # current shape [height, width]
+        levels = {
+            'disable': ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+            'basic': ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+            'extended': ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+            'all': ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        }
+        modes = {
+            'sequential': ort.ExecutionMode.ORT_SEQUENTIAL,
+            'parallel': ort.ExecutionMode.ORT_PARALLEL
+        }
         
-        # Scale ratio
-        r = min(new_shape[0] / shape[0], new_shape[1] / shape[1])
+        options = ort.SessionOptions()
+        # Leave a core for the capture thread on the Pi's 4 cores
+        options.intra_op_num_threads = ort_config.get('intra_op_num_threads', 3)
+        options.inter_op_num_threads = ort_config.get('inter_op_num_threads', 1)
+        options.execution_mode = modes[ort_config.get('execution_mode', 'sequential')]
+        options.graph_optimization_level = levels[ort_config.get('graph_optimization_level', 'all')]
+        
+        optimized_path = ort_config.get('optimized_model_path')
+        cache_info = None
+        if optimized_path:
+            optimized = Path(optimized_path)
+            cache_info_path = optimized.with_suffix('.json')
+            cache_info = {
+                **self._model_fingerprint(model_path),
+                'onnxruntime': ort.__version__,
+                'optimization_level': ort_config.get('graph_optimization_level', 'all')
+            }
+            if optimized.exists() and self._read_cache_info(cache_info_path) == cache_info:
+                # Cached optimized graph of this exact model: no need to optimize again
+                options.graph_optimization_level = levels['disable']
+                model_path = str(optimized)
+                cache_info = None
+                self.logger.info(f"Loading cached optimized model {optimized}")
+            else:
+                options.optimized_model_filepath = str(optimized)
+                self.logger.info(f"Optimized model will be saved to {optimized}")
         
-        # Compute padding
-        new_unpad = int(round(shape[1] * r)), int(round(shape[0] * r))
-        dw, dh = new_shape[1] - new_unpad[0], new_shape[0] - new_unpad[1]
-        dw /= 2
-        dh /= 2
+        self.logger.info(
+            f"ONNX Runtime threads: intra={options.intra_op_num_threads}, "
+            f"inter={options.inter_op_num_threads}"
+        )
         
-        if shape[::-1] != new_unpad:
-            img = cv2.resize(img, new_unpad, interpolation=cv2.INTER_LINEAR)
+        session = ort.InferenceSession(model_path, sess_options=options, providers=['CPUExecutionProvider'])
+        if cache_info is not None:
+            # Written only after ORT saved the optimized graph
+            cache_info_path.write_text(json.dumps(cache_info, indent=2) + '\n')
+        return session
+    
+    @staticmethod
+    def _model_fingerprint(model_path):
+        """Size + SHA-256 of a model file (identifies it regardless of mtime)"""
+        digest = hashlib.sha256()
+        with open(model_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return {'source_size': Path(model_path).stat().st_size, 'source_sha256': digest.hexdigest()}
+    
+    @staticmethod
+    def _read_cache_info(path):
+        try:
+            return json.loads(Path(path).read_text())
+        except (OSError, ValueError):
+            return None
+    
+    def check_input_size(self, input_size):
+        """
+        Configured (height, width) vs. the ONNX input shape. Static exports
+        only accept the size they were exported with, so that one wins.
+        """
+        shape = self.session.get_inputs()[0].shape
+        model_h, model_w = shape[2], shape[3]
+        if isinstance(model_h, int) and isinstance(model_w, int) and (model_h, model_w) != tuple(input_size):
+            self.logger.warning(
+                f"img_size {list(input_size)} does not match the model input {model_h}x{model_w}, "
+                f"using the model size (re-export with imgsz=[h, w] for a rectangular input)"
+            )
+            return model_h, model_w
+        return tuple(input_size)
+    
+    def warmup(self, runs=2):
+        """Run dummy inferences at camera resolution (allocations, lazy init)"""
+        if runs <= 0:
+            return
         
-        top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
-        left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
-        img = cv2.copyMakeBorder(img, top, bottom, left, right, 
-                                cv2.BORDER_CONSTANT, value=(114, 114, 114))
+        start = time.time()
+        dummy = np.full((self.camera_height, self.camera_width, 3), 114, dtype=np.uint8)
+        for _ in range(runs):
+            self.detect(dummy)
+        # Warm-up runs are not representative, start stage timings fresh
+        self.stage_latency.reset()
+        self.stage_histogram.reset()
+        self.logger.info(f"Model warm-up: {runs} runs in {(time.time() - start) * 1000:.0f}ms")
+    
+    def detect_and_crop_face(self, frame):
+        """
+        Detect the driver's face (see face_capture.py).
         
-        return img, r, (dw, dh)
+        Returns: (face_image, face_detected)
+        - face_image: Cropped face if detected, else RAW full frame (no resize)
+        - face_detected: True if face was detected, False = full frame fallback
+        """
+        return self.face_capture.capture(frame)
     
     def preprocess(self, img):
-        """Preprocess image for inference"""
-        # Letterbox resize
-        img_resized, ratio, (dw, dh) = self.letterbox(img, (self.img_size, self.img_size))
-        
-        # Normalize and transpose
-        img_input = img_resized.transpose(2, 0, 1)  # HWC to CHW
-        img_input = np.expand_dims(img_input, 0)  # Add batch dimension
-        img_input = img_input.astype(np.float32) / 255.0
+        """
+        Preprocess image for inference.
         
-        return img_input, ratio, (dw, dh)
+        Letterboxes and normalizes into a preallocated NCHW float32 tensor that
+        is reused across frames (see preprocess.py) - consume the returned
+        tensor before preprocessing the next frame.
+        """
+        return self.preprocessor.process(img)
     
     def postprocess(self, outputs, img_shape, ratio, pad):
         """Postprocess model outputs to get bounding boxes"""
@@ -293,41 +533,121 @@ class PlateDetector:
             # ONNX output format
             outputs = outputs[0]
         
-        # YOLOv5/v8 output format: [batch, num_detections, 85]
-        # where 85 = x, y, w, h, conf, class_probs...
+        # Vectorized decode (auto-detects YOLOv5 [N, 5+nc] vs YOLOv8 [4+nc, N]),
+        # letterbox un-padding and NMS so overlapping boxes yield one plate
+        return decode_detections(
+            outputs,
+            self.decode_threshold,
+            ratio,
+            pad,
+            img_shape=img_shape,
+            iou_threshold=self.iou_threshold,
+            layout=self.output_layout
+        )
+    
+    def detection_rois(self, shape, lane=None):
+        """Lane's detection ROIs in pixels [(x1, y1, x2, y2)], empty = whole frame"""
+        lane = lane or self.lane
+        h, w = shape[:2]
+        rois = []
+        for x1, y1, x2, y2 in lane.rois:
+            box = (int(x1 * w), int(y1 * h), int(x2 * w), int(y2 * h))
+            if box[2] > box[0] and box[3] > box[1]:
+                rois.append(box)
+        return rois
+    
+    def detect(self, img, lane=None):
+        """
+        Detect license plates in image (thread-safe, lanes share the model).
+        
+        With detection ROIs configured only those regions are letterboxed and
+        run through the model; boxes are returned in full-frame coordinates.
+        With several lanes, frames are batched across lanes (see
+        batch_inference.py) and this call waits for the batch.
+        """
+        detections = self._detect_rois(img, lane)
+        if self.cascade_enabled:
+            return self._refine(img, detections, lane)
+        return detections
+    
+    def _detect_rois(self, img, lane=None):
+        rois = self.detection_rois(img.shape, lane)
+        if not rois:
+            return self._detect_region(img, lane)
         
-        # For simplicity, using direct output parsing
-        # Adjust based on actual model output
         detections = []
+        for x1, y1, x2, y2 in rois:
+            for detection in self._detect_region(img[y1:y2, x1:x2], lane):
+                bx1, by1, bx2, by2 = detection['bbox']
+                detection['bbox'] = [bx1 + x1, by1 + y1, bx2 + x1, by2 + y1]
+                detections.append(detection)
+        
+        # Overlapping ROIs can see the same plate twice
+        if len(rois) > 1:
+            detections = merge_detections(detections, self.iou_threshold)
+        return detections
+    
+    def cascade_region(self, bbox, shape):
+        """
+        Native-resolution region around a coarse box for the fine pass.
         
-        if len(outputs.shape) == 3:
-            outputs = outputs[0]  # Remove batch dimension
+        The region is context x the plate width (at least min_region pixels),
+        has the model input's aspect ratio and is shifted inside the frame.
+        Letterboxing then upscales it, so a distant plate covers many more
+        model input pixels than in the whole-frame pass.
+        """
+        h, w = shape[:2]
+        input_h, input_w = self.input_size
+        x1, y1, x2, y2 = bbox
         
-        # Parse detections
-        for detection in outputs:
-            if len(detection) >= 5:
-                conf = detection[4]
-                if conf > self.conf_threshold:
-                    x_center, y_center, width, height = detection[:4]
-                    
-                    # Convert from normalized to pixel coordinates
-                    # Account for letterbox padding
-                    x1 = (x_center - width / 2 - pad[0]) / ratio
-                    y1 = (y_center - height / 2 - pad[1]) / ratio
-                    x2 = (x_center + width / 2 - pad[0]) / ratio
-                    y2 = (y_center + height / 2 - pad[1]) / ratio
-                    
-                    detections.append({
-                        'bbox': [int(x1), int(y1), int(x2), int(y2)],
-                        'confidence': float(conf)
-                    })
+        region_w = max(self.cascade_min_region, (x2 - x1) * self.cascade_context)
+        region_h = region_w * input_h / input_w
+        region_w, region_h = min(w, int(region_w)), min(h, int(region_h))
         
-        return detections
+        cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+        rx1 = int(min(max(0, cx - region_w / 2), w - region_w))
+        ry1 = int(min(max(0, cy - region_h / 2), h - region_h))
+        return rx1, ry1, rx1 + region_w, ry1 + region_h
+    
+    def _refine(self, img, coarse, lane=None):
+        """
+        Fine pass of the cascade: re-detect the strongest coarse candidates on
+        native crops. Refined boxes replace their coarse box (a candidate the
+        fine pass does not confirm is dropped), so crop_plate cuts the plate
+        from precise native-pixel coordinates. Results are merged with NMS.
+        """
+        candidates = sorted(
+            (d for d in coarse if d['confidence'] >= self.coarse_threshold),
+            key=lambda d: d['confidence'], reverse=True
+        )
+        refine, keep = candidates[:self.cascade_max_regions], candidates[self.cascade_max_regions:]
+        
+        start = time.perf_counter()
+        detections = [d for d in keep if d['confidence'] >= self.conf_threshold]
+        for candidate in refine:
+            x1, y1, x2, y2 = self.cascade_region(candidate['bbox'], img.shape)
+            for detection in self._detect_region(img[y1:y2, x1:x2], lane):
+                if detection['confidence'] < self.conf_threshold:
+                    continue
+                bx1, by1, bx2, by2 = detection['bbox']
+                detection['bbox'] = [bx1 + x1, by1 + y1, bx2 + x1, by2 + y1]
+                detections.append(detection)
+        if refine:
+            self.stage_latency.record('cascade', time.perf_counter() - start)
+        
+        return merge_detections(detections, self.iou_threshold)
+    
+    def _detect_region(self, img, lane=None):
+        if self.batch_scheduler is not None and lane is not None:
+            return self.batch_scheduler.detect(img, lane.name)
+        with self._infer_lock:
+            return self._detect(img)
     
-    def detect(self, img):
-        """Detect license plates in image"""
+    def _detect(self, img):
         # Preprocess
+        t0 = time.perf_counter()
         img_input, ratio, pad = self.preprocess(img)
+        t1 = time.perf_counter()
         
         # Inference
         if self.use_onnx:
@@ -335,10 +655,14 @@ class PlateDetector:
         else:
             self.net.setInput(img_input)
             outputs = self.net.forward()
+        t2 = time.perf_counter()
         
         # Postprocess
         detections = self.postprocess(outputs, img.shape, ratio, pad)
         
+        self.stage_latency.record('preprocess', t1 - t0)
+        self.stage_latency.record('inference', t2 - t1)
+        self.stage_latency.record('postprocess', time.perf_counter() - t2)
         return detections
     
     def is_valid_plate_detection(self, bbox):
@@ -423,173 +747,400 @@ class PlateDetector:
         
         return result
     
-    def send_to_server(self, plate_img, face_img=None, face_detected=False):
-        """Send plate image and face image to server for OCR recognition and get gate command"""
+    def send_to_server(self, plate_img, face_img=None, face_detected=False, lane=None, idempotency_key=None,
+                       event_at=None):
+        """
+        Send plate image and face image to server for OCR recognition and get gate command.
+        
+        The result has retry=True when the server made no decision about the
+        vehicle (unreadable plate, server or network error).
+        """
         try:
-            # Encode plate image as JPEG with high quality
-            encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), 95]
-            _, plate_encoded = cv2.imencode('.jpg', plate_img, encode_param)
-            
             # Get gate config
-            gate_type = self.config.get('gate', {}).get('type', 'MASUK')
-            parkiran_id = self.config.get('gate', {}).get('parkiran_id', 1)
+            lane = lane or self.lane
+            gate_type = lane.config.get('gate', {}).get('type', 'MASUK')
+            parkiran_id = lane.config.get('gate', {}).get('parkiran_id', 1)
             
-            # Prepare files - always include plate image
-            files = {'image': ('plate.jpg', plate_encoded.tobytes(), 'image/jpeg')}
+            # Plate crop (full resolution) + face/full frame within the byte budget
+            encode_start = time.perf_counter()
+            files = self.payload_encoder.encode(plate_img, face_img, face_detected)
+            self.stage_latency.record('encode', time.perf_counter() - encode_start)
             
-            # Add face image if available
-            if face_img is not None:
-                # Use lower quality for full frame (larger images)
-                face_quality = 85 if face_detected else 70
-                face_encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), face_quality]
-                _, face_encoded = cv2.imencode('.jpg', face_img, face_encode_param)
-                files['face_image'] = ('face.jpg', face_encoded.tobytes(), 'image/jpeg')
-            
-            # Data payload
+            # Data payload (idempotency key is kept for offline replays too)
             data = {
                 'parkiran_id': parkiran_id,
                 'gate_type': gate_type,
-                'face_detected': str(face_detected).lower()  # 'true' or 'false'
+                'face_detected': str(face_detected).lower(),  # 'true' or 'false'
+                'idempotency_key': idempotency_key or self.uploader.new_idempotency_key(),
+                # Capture time: offline replays are recorded at this time, not the replay time
+                'event_at': str(event_at or time.time())
             }
             
-            response = requests.post(
-                f"{self.server_url}/api/parking/process",
-                files=files,
-                data=data,
-                timeout=self.server_timeout
-            )
-            
-            result = response.json()
+            try:
+                response = self.uploader.post('/api/parking/process', files=files, data=data)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                # No response received - keep the event for replay instead of losing it
+                self.counters.inc('server_calls', outcome='network_error')
+                self.logger.error(f"Error sending to server: {e}")
+                queued = self.offline_queue.enqueue(files, data)
+                return {'gate_action': 'DENY', 'error': str(e), 'queued': queued, 'retry': True}
+
+            if response.status_code >= 500:
+                # Server-side failure (model not ready, backend unreachable) - replay later
+                self.counters.inc('server_calls', outcome='server_error')
+                self.logger.error(f"Server error {response.status_code}: {response.text[:200]}")
+                queued = self.offline_queue.enqueue(files, data)
+                return {'gate_action': 'DENY', 'error': f"HTTP {response.status_code}", 'queued': queued, 'retry': True}
+
+            try:
+                result = response.json()
+            except ValueError:
+                # The server got the event but the reply is unusable (proxy error
+                # page, truncated body): no replay, a live retry reuses the key
+                self.counters.inc('server_calls', outcome='bad_response')
+                self.logger.error(f"Invalid server response (HTTP {response.status_code}): {response.text[:200]}")
+                return {'gate_action': 'DENY', 'error': f"Invalid response (HTTP {response.status_code})", 'retry': True}
             
             # Log result
             if result.get('success'):
+                self.counters.inc('server_calls', outcome='ok')
                 self.logger.info(f"✅ Server: {result.get('message')}")
             else:
+                self.counters.inc('server_calls', outcome='rejected')
                 self.logger.warning(f"❌ Server: {result.get('message', result.get('error'))}")
+                # No plate text = OCR could not read this crop, a later one may be readable
+                result['retry'] = not result.get('plate_text')
             
             return result
-                
+        
         except Exception as e:
+            self.counters.inc('server_calls', outcome='error')
             self.logger.error(f"Error sending to server: {e}")
             return {'gate_action': 'DENY', 'error': str(e)}
     
-    def process_frame(self, frame, save_dir=None):
-        """Process a single frame and control gate"""
-        start_time = time.time()
+    def replay_event(self, files, data):
+        """Re-send a queued event (offline queue drainer). Returns True when delivered"""
+        response = self.uploader.post('/api/parking/process', files=files, data=data,
+                                      deadline=time.time() + self.uploader.read_timeout, retry=False)
+        # 4xx (e.g. unreadable plate) is final; only server-side errors are retried
+        return response.status_code < 500
+    
+    def should_run_detection(self, frame, frame_count=None, lane=None):
+        """
+        Decide whether the full detector runs on this frame.
         
-        # Detect plates
-        detections = self.detect(frame)
+        With the motion gate enabled, detection runs only during motion bursts;
+        otherwise every Nth frame (frame_count=None means always).
+        """
+        lane = lane or self.lane
+        if lane.motion_gate.enabled:
+            return lane.motion_gate.should_process(frame)
         
-        detect_time = time.time() - start_time
+        if frame_count is None:
+            return True
+        return frame_count % lane.config['camera']['process_every_n_frames'] == 0
+    
+    def select_plates(self, frame, detections, save_dir=None, timestamp=None, flush=False, lane=None):
+        """
+        Validate, track and crop detections, keeping the best crop per track.
         
-        results = []
+        Each track accumulates crops for best_frame.window seconds; only the
+        highest quality crop (sharpness, size, confidence) is uploaded.
         
-        for idx, detection in enumerate(detections):
-            bbox = detection['bbox']
-            conf = detection['confidence']
-            
-            # Validate detection
-            if not self.is_valid_plate_detection(bbox):
+        Returns: list of plate candidates ({'bbox', 'confidence', 'plate_img',
+        'track_id', 'frame'}) that should be sent to the server - at most one
+        per track. flush=True uploads pending crops without waiting for the
+        window (single image mode).
+        """
+        lane = lane or self.lane
+        tracker = lane.tracker
+        current_time = timestamp if timestamp is not None else time.time()
+        
+        # Validate detections
+        valid = []
+        for detection in detections:
+            if not self.is_valid_plate_detection(detection['bbox']):
                 self.logger.debug("Skipping invalid plate detection")
                 continue
+            valid.append(detection)
+        
+        self.counters.inc('frames_processed', lane=lane.name)
+        self.counters.inc('detections', len(valid), lane=lane.name)
+        
+        for track, detection in tracker.update(valid, current_time):
+            # Server is called once per track (again only after a failed attempt)
+            if track.dispatched:
+                self.logger.debug(f"Skipping track #{track.track_id} (already sent)")
+                continue
+            if current_time < track.retry_at:
+                continue
+            
+            bbox = detection['bbox']
             
             # Crop plate
             plate_img = self.crop_plate(frame, bbox)
             
-            # Preprocess for OCR
-            plate_img_preprocessed = self.preprocess_plate_for_ocr(plate_img)
-            
-            # Save debug images if enabled
-            if save_dir and self.config.get('debug', {}).get('save_images', False):
-                debug_dir = Path(save_dir) / 'debug'
-                debug_dir.mkdir(parents=True, exist_ok=True)
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
-                cv2.imwrite(str(debug_dir / f"{timestamp}_original.jpg"), plate_img)
-                cv2.imwrite(str(debug_dir / f"{timestamp}_preprocessed.jpg"), plate_img_preprocessed)
-            
-            # Send to server for OCR and validation
-            current_time = time.time()
+            quality = self.best_frame.evaluate(plate_img, bbox, detection['confidence'])
+            if not quality['acceptable']:
+                self.logger.debug(
+                    f"Track #{track.track_id}: rejected crop "
+                    f"(sharpness: {quality['sharpness']:.0f}, width: {quality['width']})"
+                )
+                continue
             
-            # Check for duplicates using IoU
-            if self.last_detection['bbox'] is not None:
-                iou = self.calculate_iou(bbox, self.last_detection['bbox'])
-                time_diff = current_time - self.last_detection['time']
-                
-                # If overlap is high and time is short, skip (Duplicate)
-                # IoU > 0.5 and Time < 5 seconds
-                if iou > 0.5 and time_diff < 5.0:
-                    self.logger.info(f"Skipping duplicate detection (IoU: {iou:.2f}, Time: {time_diff:.1f}s)")
-                    # Draw visual indicator for duplicate
-                    if save_dir and self.config.get('debug', {}).get('save_images', False):
-                         # Optional: Save/Log duplicate event
-                         pass
-                    continue
-
-            # Send original color image to server (better for display)
-            # OCR will handle it (YOLO is robust enough)
+            # Save debug images if enabled. OCR preprocessing is only used
+            # here, so it runs lazily on the writer thread
+            if save_dir and self.save_debug_images:
+                ts = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+                self.image_writer.save(save_dir, f"debug/{ts}_original.jpg", plate_img)
+                self.image_writer.save(save_dir, f"debug/{ts}_preprocessed.jpg", plate_img,
+                                       transform=self.preprocess_plate_for_ocr)
             
-            # Detect and crop face (or get full frame if not detected)
-            face_img, face_detected = self.detect_and_crop_face(frame)
+            track.offer({
+                'bbox': bbox,
+                'confidence': detection['confidence'],
+                'plate_img': plate_img,
+                'track_id': track.track_id,
+                'lane': lane,
+                'frame': frame,
+                'captured_at': current_time,
+                'quality': quality
+            }, current_time)
             
-            server_start = time.time()
-            server_result = self.send_to_server(plate_img, face_img, face_detected)
-            server_latency = (time.time() - server_start) * 1000
+            # Excellent crop: no need to wait for the rest of the window
+            if quality['excellent']:
+                track.ready = True
+        
+        return self.collect_candidates(lane, current_time, flush)
+    
+    def collect_candidates(self, lane, current_time, flush=False):
+        """
+        Best crop of every track whose window has closed (or that expired
+        before its window closed); flush=True takes every pending crop.
+        """
+        tracker = lane.tracker
+        candidates = []
+        for track in list(tracker.tracks.values()) + tracker.expired:
+            if track.dispatched or track.best is None:
+                continue
+            if not tracker.is_confirmed(track):
+                continue
+            window_closed = current_time - track.window_start >= self.best_frame.window
+            if flush or track.ready or window_closed or track in tracker.expired:
+                candidate = track.best
+                track.dispatched = True
+                track.best = None
+                self.logger.debug(
+                    f"Track #{track.track_id}: best crop "
+                    f"(score: {candidate['quality']['score']:.2f}, "
+                    f"sharpness: {candidate['quality']['sharpness']:.0f})"
+                )
+                candidates.append(candidate)
+        
+        return candidates
+    
+    def dispatch_plate(self, frame, candidate, save_dir=None):
+        """
+        Capture face, send plate to server and execute the gate action.
+        
+        Returns: result dict, or None if the server gave no response
+        """
+        bbox = candidate['bbox']
+        conf = candidate['confidence']
+        plate_img = candidate['plate_img']
+        # Best crop may come from an earlier frame than the current one
+        frame = candidate.get('frame', frame)
+        
+        # Send original color image to server (better for display)
+        # OCR will handle it (YOLO is robust enough)
+        
+        # Detect and crop face (or get full frame if not detected), at most
+        # once per vehicle: the result is cached on the event and its track
+        lane = candidate.get('lane') or self.lane
+        track = lane.tracker.tracks.get(candidate.get('track_id'))
+        face = candidate.get('face') or (track.face if track is not None else None)
+        if face is None:
+            face = self.detect_and_crop_face(frame)
+            candidate['face'] = face
+            if track is not None:
+                track.face = face
+        face_img, face_detected = face
+        
+        # Retries of the same vehicle reuse the key, so the backend records it once
+        idempotency_key = None
+        if track is not None:
+            track.idempotency_key = track.idempotency_key or self.uploader.new_idempotency_key()
+            idempotency_key = track.idempotency_key
+        
+        server_start = time.time()
+        server_result = self.send_to_server(plate_img, face_img, face_detected, lane, idempotency_key,
+                                            candidate.get('captured_at'))
+        server_latency = (time.time() - server_start) * 1000
 
-            # Update last detection if successful
-            if server_result and server_result.get('gate_action') != 'DENY':
-                 self.last_detection = {
-                     'bbox': bbox,
-                     'time': current_time,
-                     'plate_text': server_result.get('plate_text', '')
-                 }
+        if not server_result:
+            return None
+        
+        plate_text = server_result.get('plate_text', '')
+        ocr_confidence = server_result.get('ocr_confidence', server_result.get('confidence', 0.0))
+        gate_action = server_result.get('gate_action', 'DENY')
+        message = server_result.get('message', '')
+        detect_time = candidate.get('detect_time', 0.0)
+        
+        # Remember the plate on its track (shown in logs when the track expires)
+        if track is not None:
+            track.plate_text = plate_text
+            if server_result.get('retry'):
+                # Not a decision about this vehicle: it is still at the gate, send it again
+                lane.tracker.release(track, candidate.get('captured_at', time.time()))
+                self.logger.info(f"Track #{track.track_id}: no decision ({server_result.get('error')}), "
+                                 f"retrying in {lane.tracker.retry_after:.0f}s")
+        
+        self.logger.info(
+            f"Detected plate: {plate_text} "
+            f"(lane: {lane.name}, track: #{candidate.get('track_id')}, det_conf: {conf:.2f}, ocr_conf: {ocr_confidence:.2f})"
+        )
+        
+        gate_at = time.time()
+        if 'captured_at' in candidate:
+            total_ms = (gate_at - candidate['captured_at']) * 1000
+        else:
+            total_ms = detect_time * 1000 + server_latency
+        print(f"⏱️ Latency: Det={detect_time*1000:.1f}ms | OCR+Server={server_latency:.1f}ms | Total={total_ms:.1f}ms")
+        
+        # Execute gate action
+        lane.gate_controller.execute_gate_action(gate_action, message)
+        self.counters.inc('gate_actions', lane=lane.name, action=gate_action)
+        
+        # Save if requested
+        if save_dir:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            filename = f"{timestamp}_{plate_text.replace(' ', '_')}.jpg"
+            self.image_writer.save(save_dir, filename, plate_img)
+        
+        return {
+            'bbox': bbox,
+            'plate_text': plate_text,
+            'detection_confidence': conf,
+            'ocr_confidence': ocr_confidence,
+            'gate_action': gate_action,
+            'detection_time': detect_time,
+            'gate_at': gate_at
+        }
+    
+    def flush_plates(self, save_dir=None, lane=None):
+        """Dispatch crops still waiting for their best-frame window (end of a video/replay)"""
+        lane = lane or self.lane
+        results = []
+        for candidate in self.collect_candidates(lane, time.time(), flush=True):
+            result = self.dispatch_plate(candidate['frame'], candidate, save_dir)
+            if result:
+                results.append(result)
+        return results
+    
+    def process_frame(self, frame, save_dir=None, flush=False, lane=None):
+        """Process a single frame and control the gate of its lane"""
+        start_time = time.time()
+        
+        # Detect plates
+        detections = self.detect(frame, lane)
+        
+        detect_time = time.time() - start_time
+        
+        results = []
+        
+        for candidate in self.select_plates(frame, detections, save_dir, start_time, flush, lane):
+            candidate['detect_time'] = detect_time
             
-            if server_result:
-                plate_text = server_result.get('plate_text', '')
-                ocr_confidence = server_result.get('ocr_confidence', server_result.get('confidence', 0.0))
-                gate_action = server_result.get('gate_action', 'DENY')
-                message = server_result.get('message', '')
-                
-                self.logger.info(
-                    f"Detected plate: {plate_text} "
-                    f"(det_conf: {conf:.2f}, ocr_conf: {ocr_confidence:.2f})"
-                )
-                print(f"⏱️ Latency: Det={detect_time*1000:.1f}ms | OCR+Server={server_latency:.1f}ms | Total={(time.time()-start_time)*1000:.1f}ms")
-                
-                # Execute gate action
-                self.gate_controller.execute_gate_action(gate_action, message)
-                
-                # Save if requested
-                if save_dir:
-                    save_path = Path(save_dir)
-                    save_path.mkdir(parents=True, exist_ok=True)
-                    
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                    filename = f"{timestamp}_{plate_text.replace(' ', '_')}.jpg"
-                    cv2.imwrite(str(save_path / filename), plate_img)
-                
-                results.append({
-                    'bbox': bbox,
-                    'plate_text': plate_text,
-                    'detection_confidence': conf,
-                    'ocr_confidence': ocr_confidence,
-                    'gate_action': gate_action,
-                    'detection_time': detect_time
-                })
+            result = self.dispatch_plate(frame, candidate, save_dir)
+            if result:
+                results.append(result)
         
         return results
 
     
-    def run_camera(self, save_dir='detections'):
+    def cleanup(self):
+        """Stop background workers and release the gate"""
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.stop()
+        if self.batch_scheduler is not None:
+            self.batch_scheduler.stop()
+        self.offline_queue.stop()
+        self.image_writer.stop()
+        self.uploader.close()
+        for lane in self.lanes:
+            lane.gate_controller.cleanup()
+    
+    def handle_key(self, key):
+        """Handle interactive keyboard controls. Returns False when the user quits"""
+        if key == ord('q'):
+            print("\n👋 Quitting...")
+            return False
+        elif key == ord('m') or key == ord('M'):
+            self.lane.config['gate']['type'] = 'MASUK'
+            self.lane.gate_controller.gate_type = 'MASUK'
+            print(f"\n🔄 Mode changed to: MASUK (Entry)")
+            self.logger.info("Switched to MASUK mode")
+        elif key == ord('k') or key == ord('K'):
+            self.lane.config['gate']['type'] = 'KELUAR'
+            self.lane.gate_controller.gate_type = 'KELUAR'
+            print(f"\n🔄 Mode changed to: KELUAR (Exit)")
+            self.logger.info("Switched to KELUAR mode")
+        return True
+    
+    def draw_results(self, frame, results):
+        """Draw detection results on frame"""
+        for result in results:
+            bbox = result['bbox']
+            text = result['plate_text']
+            
+            cv2.rectangle(frame, (bbox[0], bbox[1]), (bbox[2], bbox[3]), 
+                        (0, 255, 0), 2)
+            cv2.putText(frame, text, (bbox[0], bbox[1]-10),
+                      cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 0), 2)
+    
+    def show_preview(self, frame, lane=None):
+        """Display frame (optional, disable on headless Raspberry Pi)"""
+        lane = lane or self.lane
+        if not lane.config['camera'].get('show_preview', False):
+            return
+        
+        # Add mode indicator to frame
+        current_gate_type = lane.gate_controller.gate_type
+        mode_color = (0, 255, 0) if current_gate_type == 'MASUK' else (0, 165, 255)
+        cv2.putText(frame, f"Mode: {current_gate_type} | Gate: {lane.gate_controller.state}", (10, 30),
+                  cv2.FONT_HERSHEY_SIMPLEX, 1, mode_color, 2)
+        
+        if len(self.lanes) > 1:
+            # Lanes have fixed gate types in multi-camera mode
+            cv2.putText(frame, "[Q] Quit", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+            cv2.imshow(f'License Plate Detection - {lane.name}', frame)
+            return
+        
+        cv2.putText(frame, "[M] MASUK  [K] KELUAR  [Q] Quit", (10, 60),
+                  cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        
+        cv2.imshow('License Plate Detection', frame)
+    
+    def run_camera(self, save_dir='detections', pipelined=None):
         """Run continuous detection from camera with interactive mode switching"""
         self.logger.info("Starting camera capture...")
         
-        cap = cv2.VideoCapture(self.camera_index)
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.camera_width)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.camera_height)
+        if len(self.lanes) > 1:
+            # Several cameras always use the threaded pipeline (one per lane)
+            self._run_multi_camera(save_dir)
+            return
+        
+        if pipelined is None:
+            pipelined = self.config.get('pipeline', {}).get('enabled', False)
+        
+        cap = FrameSource.from_config(self.lane.config['camera'], name=self.lane.name)
         
         if not cap.isOpened():
-            self.logger.error("Failed to open camera")
-            return
+            if cap.kind == 'file':
+                self.logger.error(f"Failed to open video file {cap.source}")
+                return
+            # USB/RTSP camera not up yet: FrameSource keeps reconnecting with backoff
+            self.logger.error(f"Failed to open camera {cap.source}, will keep retrying")
         
         # Interactive mode - can be changed with keyboard
         current_gate_type = self.config.get('gate', {}).get('type', 'MASUK')
@@ -605,65 +1156,144 @@ class PlateDetector:
         print(f"Current mode: {current_gate_type}")
         print("="*60 + "\n")
         
-        self.logger.info("Camera opened successfully. Press 'q' to quit.")
+        self.logger.info("Camera capture running. Press 'q' to quit.")
+        
+        try:
+            if pipelined:
+                self._run_pipelined(cap, save_dir)
+            else:
+                self._run_sequential(cap, save_dir)
         
+        finally:
+            cap.release()
+            cv2.destroyAllWindows()
+            self.logger.info("Camera capture stopped")
+    
+    def _run_sequential(self, cap, save_dir):
+        """Read, detect and act on frames one after another in this thread"""
         frame_count = 0
         
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                if cap.finished:
+                    break
+                if cap.isOpened():
+                    self.logger.warning("Failed to read frame")
+                # Keep [Q] working while the camera reconnects
+                if not self.handle_key(cv2.waitKey(1) & 0xFF):
+                    break
+                continue
+            
+            frame_count += 1
+            self.counters.inc('frames_captured', lane=self.lane.name)
+            
+            # Check for keyboard input (always check, not just when show_preview)
+            key = cv2.waitKey(1) & 0xFF
+            if not self.handle_key(key):
+                break
+            
+            # Process every N frames (or only on lane motion) to reduce load
+            if self.should_run_detection(frame, frame_count):
+                results = self.process_frame(frame, save_dir)
+                self.draw_results(frame, results)
+            
+            self.show_preview(frame)
+        
+        if cap.finished:
+            # Video ended: the last vehicle's window may still be open
+            self.flush_plates(save_dir)
+    
+    def _run_pipelined(self, cap, save_dir):
+        """Capture, inference and network stages on separate threads"""
+        pipeline = DetectionPipeline(self, cap, save_dir)
+        pipeline.start()
+        self.logger.info("Running in pipelined mode")
+        
+        recent_results = []
+        
         try:
             while True:
-                ret, frame = cap.read()
-                if not ret:
-                    self.logger.warning("Failed to read frame")
-                    continue
+                # Keyboard and preview stay on the main thread (OpenCV GUI requirement)
+                key = cv2.waitKey(1) & 0xFF
+                # A video source ends once its last vehicle has been dispatched
+                if not self.handle_key(key) or pipeline.finished.is_set():
+                    break
                 
-                frame_count += 1
+                finished = pipeline.drain_results()
+                if finished:
+                    recent_results = finished
                 
-                # Check for keyboard input (always check, not just when show_preview)
-                key = cv2.waitKey(1) & 0xFF
+                frame = pipeline.latest_frame()
+                if frame is None or not self.config['camera'].get('show_preview', False):
+                    time.sleep(0.01)
+                    continue
                 
+                frame = frame.copy()
+                self.draw_results(frame, recent_results)
+                self.show_preview(frame)
+        
+        finally:
+            pipeline.stop()
+    
+    def _run_multi_camera(self, save_dir):
+        """One pipeline per lane; all lanes share the detection model"""
+        sources = []
+        pipelines = []
+        
+        for lane in self.lanes:
+            source = FrameSource.from_config(lane.config['camera'], name=lane.name)
+            if not source.isOpened():
+                self.logger.error(f"[{lane.name}] Failed to open camera {source.source}, will keep retrying")
+            sources.append(source)
+            
+            lane_dir = str(Path(save_dir) / lane.name) if save_dir else None
+            pipeline = DetectionPipeline(self, source, lane_dir, lane=lane)
+            pipeline.start()
+            pipelines.append(pipeline)
+        
+        self.logger.info(f"Running {len(self.lanes)} cameras: {', '.join(lane.name for lane in self.lanes)}")
+        print("\n" + "="*60)
+        print("🚗 LICENSE PLATE DETECTION - MULTI-CAMERA")
+        print("="*60)
+        for lane in self.lanes:
+            print(f"  {lane.name}: {lane.gate_controller.gate_type} "
+                  f"(parkiran {lane.config['gate'].get('parkiran_id')})")
+        print("  [Q] - Quit")
+        print("="*60 + "\n")
+        
+        recent_results = {lane.name: [] for lane in self.lanes}
+        
+        try:
+            while not all(pipeline.finished.is_set() for pipeline in pipelines):
+                key = cv2.waitKey(1) & 0xFF
                 if key == ord('q'):
                     print("\n👋 Quitting...")
                     break
-                elif key == ord('m') or key == ord('M'):
-                    current_gate_type = 'MASUK'
-                    self.config['gate']['type'] = 'MASUK'
-                    self.gate_controller.gate_type = 'MASUK'
-                    print(f"\n🔄 Mode changed to: MASUK (Entry)")
-                    self.logger.info("Switched to MASUK mode")
-                elif key == ord('k') or key == ord('K'):
-                    current_gate_type = 'KELUAR'
-                    self.config['gate']['type'] = 'KELUAR'
-                    self.gate_controller.gate_type = 'KELUAR'
-                    print(f"\n🔄 Mode changed to: KELUAR (Exit)")
-                    self.logger.info("Switched to KELUAR mode")
                 
-                # Process every N frames to reduce load
-                if frame_count % self.config['camera']['process_every_n_frames'] == 0:
-                    results = self.process_frame(frame, save_dir)
+                shown = False
+                for lane, pipeline in zip(self.lanes, pipelines):
+                    finished = pipeline.drain_results()
+                    if finished:
+                        recent_results[lane.name] = finished
                     
-                    # Draw results on frame
-                    for result in results:
-                        bbox = result['bbox']
-                        text = result['plate_text']
-                        
-                        cv2.rectangle(frame, (bbox[0], bbox[1]), (bbox[2], bbox[3]), 
-                                    (0, 255, 0), 2)
-                        cv2.putText(frame, text, (bbox[0], bbox[1]-10),
-                                  cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 0), 2)
-                
-                # Display frame (optional, disable on headless Raspberry Pi)
-                if self.config['camera'].get('show_preview', False):
-                    # Add mode indicator to frame
-                    mode_color = (0, 255, 0) if current_gate_type == 'MASUK' else (0, 165, 255)
-                    cv2.putText(frame, f"Mode: {current_gate_type}", (10, 30),
-                              cv2.FONT_HERSHEY_SIMPLEX, 1, mode_color, 2)
-                    cv2.putText(frame, "[M] MASUK  [K] KELUAR  [Q] Quit", (10, 60),
-                              cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+                    frame = pipeline.latest_frame()
+                    if frame is None or not lane.config['camera'].get('show_preview', False):
+                        continue
                     
-                    cv2.imshow('License Plate Detection', frame)
+                    frame = frame.copy()
+                    self.draw_results(frame, recent_results[lane.name])
+                    self.show_preview(frame, lane)
+                    shown = True
+                
+                if not shown:
+                    time.sleep(0.05)
         
         finally:
-            cap.release()
+            for pipeline in pipelines:
+                pipeline.stop()
+            for source in sources:
+                source.release()
             cv2.destroyAllWindows()
             self.logger.info("Camera capture stopped")
 
@@ -676,11 +1306,17 @@ def main():
     parser.add_argument('--test-image', type=str, help='Test on single image instead of camera')
     parser.add_argument('--save-dir', type=str, default='detections',
                        help='Directory to save detected plates')
+    parser.add_argument('--pipelined', action='store_true',
+                       help='Run capture, inference and network on separate threads')
+    parser.add_argument('--source', type=str,
+                       help='Override camera source: USB index, RTSP URL or video file (single camera)')
     
     args = parser.parse_args()
     
     # Initialize detector
     detector = PlateDetector(args.config)
+    if args.source:
+        detector.lane.config['camera']['source'] = args.source
     
     try:
         if args.test_image:
@@ -691,7 +1327,7 @@ def main():
                 return
             
             print("Processing test image...")
-            results = detector.process_frame(img, args.save_dir)
+            results = detector.process_frame(img, args.save_dir, flush=True)
             
             print(f"\nDetected {len(results)} plate(s):")
             for i, result in enumerate(results):
@@ -712,14 +1348,14 @@ def main():
             cv2.destroyAllWindows()
         else:
             # Live camera mode
-            detector.run_camera(args.save_dir)
+            detector.run_camera(args.save_dir, pipelined=args.pipelined or None)
     
     except KeyboardInterrupt:
         print("\n\nInterrupted by user")
     
     finally:
-        # Cleanup GPIO
-        detector.gate_controller.cleanup()
+        # Cleanup GPIO and background workers
+        detector.cleanup()
         print("Cleanup completed. Goodbye!")
 
 
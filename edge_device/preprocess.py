@@ -0,0 +1,99 @@
+"""
+Zero-Allocation Letterbox Preprocessing
+========================================
+
+The old preprocess allocated a resized image, a bordered copy, a transposed
+view, an expand_dims copy and a float32 copy per frame. On a 1 GB Pi 2 that
+churns the allocator. LetterboxPreprocessor keeps one letterbox canvas and
+one NCHW float32 input tensor and reuses them for every frame:
+
+1. resize straight into the canvas ROI (border pixels are written once)
+2. split the canvas into preallocated channel planes (HWC -> CHW)
+3. one fused uint8 -> float32 + /255 write per plane into the input tensor
+
+The input does not have to be square: a wide, short input (e.g. 256x480 for
+a plate band) letterboxes with less padding and fewer pixels per frame.
+"""
+
+import cv2
+import numpy as np
+
+
+def parse_input_size(img_size):
+    """
+    Model input size from config (or --img-size): an int (square), [size]
+    or [height, width].
+
+    Returns: (height, width)
+    """
+    if isinstance(img_size, (list, tuple)):
+        if len(img_size) == 1:
+            return int(img_size[0]), int(img_size[0])
+        h, w = img_size
+        return int(h), int(w)
+    return int(img_size), int(img_size)
+
+
+class LetterboxPreprocessor:
+    """Letterbox + normalize into preallocated buffers (not thread-safe)"""
+
+    PAD_VALUE = 114
+
+    def __init__(self, input_size, tensor=None):
+        """
+        Args:
+            input_size: (height, width) of the model input
+            tensor: optional (1, 3, h, w) float32 view to write into, e.g. one
+                slot of a batch tensor (default: own buffer)
+        """
+        self.input_h, self.input_w = input_size
+        self.canvas = np.full((self.input_h, self.input_w, 3), self.PAD_VALUE, dtype=np.uint8)
+        if tensor is None:
+            tensor = np.empty((1, 3, self.input_h, self.input_w), dtype=np.float32)
+        self.tensor = tensor
+        self.planes = [np.empty((self.input_h, self.input_w), dtype=np.uint8) for _ in range(3)]
+        self._geometry = None
+        self._source_shape = None
+
+    def _compute_geometry(self, shape):
+        """Scale ratio, resized size and padding offsets for a source shape"""
+        h, w = shape[:2]
+        r = min(self.input_h / h, self.input_w / w)
+        new_w, new_h = int(round(w * r)), int(round(h * r))
+        dw = (self.input_w - new_w) / 2
+        dh = (self.input_h - new_h) / 2
+        left, top = int(round(dw - 0.1)), int(round(dh - 0.1))
+        return r, new_w, new_h, left, top
+
+    def process(self, img):
+        """
+        Letterbox and normalize img into the shared input tensor.
+
+        Returns: (input_tensor, ratio, (pad_x, pad_y)) - the tensor is reused by
+        the next call, so consume it before preprocessing another frame.
+        """
+        if img.shape[:2] != self._source_shape:
+            # Geometry changed (first frame / new camera resolution): redo border
+            self._source_shape = img.shape[:2]
+            self._geometry = self._compute_geometry(img.shape)
+            self.canvas.fill(self.PAD_VALUE)
+
+        r, new_w, new_h, left, top = self._geometry
+        roi = self.canvas[top:top + new_h, left:left + new_w]
+
+        if (new_w, new_h) == (img.shape[1], img.shape[0]):
+            roi[...] = img
+        else:
+            resized = cv2.resize(img, (new_w, new_h), dst=roi, interpolation=cv2.INTER_LINEAR)
+            if resized is not roi:
+                # Older OpenCV builds may not write into a strided ROI
+                roi[...] = resized
+
+        # HWC -> CHW into contiguous planes, then fused convert + normalize
+        # (contiguous reads are much faster than strided per-channel views)
+        planes = cv2.split(self.canvas, self.planes)
+        scale = np.float32(1.0 / 255.0)
+        for c in range(3):
+            np.multiply(planes[c], scale, out=self.tensor[0, c], casting='unsafe')
+
+        return self.tensor, r, (float(left), float(top))
@@ -0,0 +1,130 @@
+"""
+INT8 Static Quantization for the Detection Model
+=================================================
+
+Produces a statically quantized INT8 ONNX model from the FP32 detection
+model, calibrated on a folder of our own gate images. Calibration inputs go
+through the same LetterboxPreprocessor the edge device uses at runtime, so
+activation ranges match what the model sees in production.
+
+Run on the training machine (needs `onnx` + `onnxruntime`):
+    python3 quantize_model.py --model models/license_plate_detection.onnx \\
+        --calib-dir calib_images/ --output models/license_plate_detection.int8.onnx
+
+Calibrate at the size the model runs at: --img-size 256 480 for a model with
+model.img_size: [256, 480].
+
+Then point model.path in config.yaml to the INT8 model and compare accuracy
+and latency with ../compare_models.py.
+"""
+
+import argparse
+import os
+import tempfile
+from pathlib import Path
+
+import cv2
+
+from preprocess import LetterboxPreprocessor, parse_input_size
+
+try:
+    from onnxruntime.quantization import (
+        CalibrationDataReader, CalibrationMethod, QuantFormat, QuantType, quantize_static
+    )
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+except ImportError:
+    print("❌ onnxruntime.quantization not available. Install: pip install onnxruntime onnx")
+    raise
+
+
+class GateImageCalibrationReader(CalibrationDataReader):
+    """Feeds letterboxed gate images to the calibrator, one per call"""
+
+    def __init__(self, image_dir, input_name, input_size, max_images=200):
+        self.input_name = input_name
+        self.preprocessor = LetterboxPreprocessor(input_size)
+        self.paths = sorted(p for p in Path(image_dir).iterdir()
+                            if p.suffix.lower() in ('.jpg', '.jpeg', '.png'))[:max_images]
+        self._iter = iter(self.paths)
+        print(f"📸 Calibrating on {len(self.paths)} images from {image_dir}")
+
+    def get_next(self):
+        for path in self._iter:
+            img = cv2.imread(str(path))
+            if img is None:
+                continue
+            tensor, _, _ = self.preprocessor.process(img)
+            # Copy: the preprocessor reuses its tensor for the next image
+            return {self.input_name: tensor.copy()}
+        return None
+
+    def rewind(self):
+        self._iter = iter(self.paths)
+
+
+def get_input_name(model_path):
+    import onnxruntime as ort
+    session = ort.InferenceSession(model_path, providers=['CPUExecutionProvider'])
+    return session.get_inputs()[0].name
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Quantize detection model to INT8 (static)')
+    parser.add_argument('--model', type=str, default='models/license_plate_detection.onnx',
+                        help='FP32 ONNX model')
+    parser.add_argument('--calib-dir', type=str, required=True, help='Folder of gate images for calibration')
+    parser.add_argument('--output', type=str, default='models/license_plate_detection.int8.onnx',
+                        help='Output INT8 model path')
+    parser.add_argument('--img-size', type=int, nargs='+', default=[640],
+                        help='Model input size: 640, or HEIGHT WIDTH as in model.img_size (e.g. 256 480)')
+    parser.add_argument('--max-images', type=int, default=200, help='Max calibration images')
+    parser.add_argument('--format', choices=['qdq', 'qoperator'], default='qdq',
+                        help='QDQ (default) or QOperator quantized graph')
+    parser.add_argument('--method', choices=['minmax', 'entropy', 'percentile'], default='minmax',
+                        help='Calibration method')
+    parser.add_argument('--per-channel', action='store_true', help='Per-channel weight quantization')
+    parser.add_argument('--exclude-nodes', type=str, nargs='*', default=[],
+                        help='Node names to keep in FP32 (e.g. the final detection head)')
+
+    args = parser.parse_args()
+    if len(args.img_size) > 2:
+        parser.error('--img-size takes SIZE or HEIGHT WIDTH')
+    input_size = parse_input_size(args.img_size)
+
+    methods = {
+        'minmax': CalibrationMethod.MinMax,
+        'entropy': CalibrationMethod.Entropy,
+        'percentile': CalibrationMethod.Percentile
+    }
+
+    # Shape inference + graph cleanup improves quantization coverage
+    with tempfile.TemporaryDirectory() as tmp:
+        prepared = os.path.join(tmp, 'prepared.onnx')
+        print("🔧 Pre-processing model (shape inference)...")
+        quant_pre_process(args.model, prepared, skip_symbolic_shape=True)
+
+        reader = GateImageCalibrationReader(args.calib_dir, get_input_name(prepared),
+                                            input_size, args.max_images)
+
+        print("⚙️  Quantizing (this may take a few minutes)...")
+        quantize_static(
+            prepared,
+            args.output,
+            reader,
+            quant_format=QuantFormat.QDQ if args.format == 'qdq' else QuantFormat.QOperator,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=args.per_channel,
+            calibrate_method=methods[args.method],
+            nodes_to_exclude=args.exclude_nodes
+        )
+
+    fp32_size = Path(args.model).stat().st_size / 1024 / 1024
+    int8_size = Path(args.output).stat().st_size / 1024 / 1024
+    print(f"\n✅ INT8 model saved to: {args.output}")
+    print(f"Model size: {fp32_size:.1f} MB (FP32) -> {int8_size:.1f} MB (INT8)")
+    print("Next: set model.path in config.yaml and compare with ../compare_models.py")
+
+
+if __name__ == '__main__':
+    main()
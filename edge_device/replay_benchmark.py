@@ -0,0 +1,252 @@
+"""
+Edge Replay Benchmark
+======================
+
+Measures PlateDetector throughput without standing at a real gate: frames
+from a video file or a folder of images go through process_frame with
+
+- a stub RPi.GPIO module (the real GPIO code path runs, no hardware needed)
+- a local stub /api/parking/process server with configurable latency
+
+and a JSON report is written with per-stage latency percentiles
+(preprocess, inference, postprocess, face, encode, network), FPS, CPU and
+RSS, so regressions can be tracked across commits:
+
+    python3 replay_benchmark.py --source recordings/gate.mp4 --output report.json
+    python3 replay_benchmark.py --source frames/ --server-latency 300 --server-jitter 100
+"""
+
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import cv2
+import yaml
+
+from metrics import LatencyTracker, process_rss_bytes
+
+
+STAGES = ['preprocess', 'inference', 'postprocess', 'face', 'encode', 'network']
+
+
+class StubGPIO(types.ModuleType):
+    """Minimal RPi.GPIO replacement that records pin writes"""
+
+    BCM = 'BCM'
+    OUT = 'OUT'
+    HIGH = 1
+    LOW = 0
+
+    def __init__(self):
+        super().__init__('RPi.GPIO')
+        self.writes = 0
+
+    def setmode(self, mode):
+        pass
+
+    def setup(self, pin, mode):
+        pass
+
+    def output(self, pin, value):
+        self.writes += 1
+
+    def cleanup(self, pin=None):
+        pass
+
+
+def install_stub_gpio():
+    gpio = StubGPIO()
+    rpi = types.ModuleType('RPi')
+    rpi.GPIO = gpio
+    sys.modules['RPi'] = rpi
+    sys.modules['RPi.GPIO'] = gpio
+    return gpio
+
+
+def make_stub_handler(latency_ms, jitter_ms, plate_text):
+    class StubServerHandler(BaseHTTPRequestHandler):
+        """Answers /health and /api/parking/process like the plate service"""
+
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self._send_json({'status': 'healthy'})
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            delay = max(0.0, random.gauss(latency_ms, jitter_ms)) / 1000 if jitter_ms else latency_ms / 1000
+            time.sleep(delay)
+            self._send_json({
+                'success': True,
+                'plate_text': plate_text,
+                'ocr_confidence': 0.9,
+                'gate_action': 'OPEN',
+                'message': 'Stub server'
+            })
+
+    return StubServerHandler
+
+
+def start_stub_server(latency_ms, jitter_ms, plate_text='D 1234 ABC'):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_stub_handler(latency_ms, jitter_ms, plate_text))
+    threading.Thread(target=server.serve_forever, name='stub-server', daemon=True).start()
+    return server
+
+
+def iter_frames(source, max_frames):
+    """Frames from a video file or a folder of images"""
+    path = Path(source)
+    count = 0
+    if path.is_dir():
+        for image_path in sorted(p for p in path.iterdir()
+                                 if p.suffix.lower() in ('.jpg', '.jpeg', '.png')):
+            if max_frames and count >= max_frames:
+                return
+            frame = cv2.imread(str(image_path))
+            if frame is not None:
+                count += 1
+                yield frame
+        return
+
+    cap = cv2.VideoCapture(str(path))
+    try:
+        while not max_frames or count < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                return
+            count += 1
+            yield frame
+    finally:
+        cap.release()
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=Path(__file__).parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def prepare_config(config_path, server_url, workdir):
+    """Copy of the edge config pointed at the stub server, no preview, temp storage"""
+    with open(config_path) as f:
+        config = yaml.safe_load(f)
+
+    config['server']['url'] = server_url
+    config['camera']['show_preview'] = False
+    config.setdefault('gpio', {})['enabled'] = True
+    config.setdefault('offline_queue', {})['path'] = str(Path(workdir) / 'offline_queue.db')
+    config.setdefault('debug', {})['save_images'] = False
+
+    path = Path(workdir) / 'config.yaml'
+    with open(path, 'w') as f:
+        yaml.safe_dump(config, f)
+    return str(path)
+
+
+def run_replay(args):
+    from plate_detector import PlateDetector
+
+    gpio = install_stub_gpio()
+    server = start_stub_server(args.server_latency, args.server_jitter)
+    server_url = f"http://127.0.0.1:{server.server_port}"
+
+    with tempfile.TemporaryDirectory() as workdir:
+        detector = PlateDetector(prepare_config(args.config, server_url, workdir))
+        # Keep every sample for the report, not just the logging window
+        detector.stage_latency = LatencyTracker(window=1000000, histogram=detector.stage_histogram)
+        detector.face_capture.latency = LatencyTracker(window=1000000, histogram=detector.stage_histogram)
+        detector.uploader.latency = LatencyTracker(window=1000000)
+
+        frames = 0
+        events = 0
+        usage_start = resource.getrusage(resource.RUSAGE_SELF)
+        start = time.time()
+
+        try:
+            for frame_count, frame in enumerate(iter_frames(args.source, args.max_frames)):
+                frames += 1
+                if args.respect_gating and not detector.should_run_detection(frame, frame_count):
+                    continue
+                events += len(detector.process_frame(frame))
+
+            # Send crops still waiting for their best-frame window
+            events += len(detector.flush_plates())
+        finally:
+            wall = time.time() - start
+            usage_end = resource.getrusage(resource.RUSAGE_SELF)
+            detector.cleanup()
+            server.shutdown()
+
+    cpu = (usage_end.ru_utime - usage_start.ru_utime) + (usage_end.ru_stime - usage_start.ru_stime)
+    stages = detector.stage_latency.summary()
+    stages.update(detector.face_capture.latency.summary())
+    if 'upload' in detector.uploader.latency.summary():
+        stages['network'] = detector.uploader.latency.summary()['upload']
+
+    return {
+        'commit': git_commit(),
+        'source': str(args.source),
+        'model': detector.config['model']['path'],
+        'server_latency_ms': args.server_latency,
+        'server_jitter_ms': args.server_jitter,
+        'frames': frames,
+        'events': events,
+        'wall_s': round(wall, 3),
+        'fps': round(frames / wall, 2) if wall > 0 else 0.0,
+        'cpu_s': round(cpu, 3),
+        'cpu_percent': round(cpu / wall * 100, 1) if wall > 0 else 0.0,
+        'rss_mb': round(process_rss_bytes() / 1024 / 1024, 1),
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'gpio_writes': gpio.writes,
+        'stages': {
+            stage: {key: round(value, 3) for key, value in stages[stage].items()}
+            for stage in STAGES if stage in stages
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay frames through PlateDetector and report latency')
+    parser.add_argument('--source', type=str, required=True, help='Video file or folder of frames')
+    parser.add_argument('--config', type=str, default='config.yaml', help='Edge config to benchmark')
+    parser.add_argument('--server-latency', type=float, default=150.0, help='Stub server latency (ms)')
+    parser.add_argument('--server-jitter', type=float, default=0.0, help='Stub server latency stddev (ms)')
+    parser.add_argument('--max-frames', type=int, default=0, help='Stop after N frames (0 = all)')
+    parser.add_argument('--respect-gating', action='store_true',
+                        help='Apply motion gate / process_every_n_frames like the live loop')
+    parser.add_argument('--output', type=str, help='Write the JSON report to this file')
+
+    args = parser.parse_args()
+
+    report = run_replay(args)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+import logging
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+import yaml
+
+# The edge modules live next to tests/, not in an installed package
+EDGE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(EDGE_DIR))
+
+from best_frame import BestFrameSelector  # noqa: E402
+from metrics import Counters, LatencyTracker  # noqa: E402
+from offline_queue import OfflineQueue  # noqa: E402
+from payload_encoder import PayloadEncoder  # noqa: E402
+from plate_detector import Lane, PlateDetector  # noqa: E402
+from uploader import Uploader  # noqa: E402
+
+
+class FakeResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self._body = body
+        self.text = body if isinstance(body, str) else str(body)
+
+    def json(self):
+        if isinstance(self._body, Exception):
+            raise self._body
+        return self._body
+
+
+class FakeUploader:
+    """Uploader stand-in: replies (or raises) from a script, records every post"""
+
+    new_idempotency_key = staticmethod(Uploader.new_idempotency_key)
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.posts = []
+        self.read_timeout = 1.0
+
+    def post(self, path, files=None, data=None, deadline=None, retry=True):
+        self.posts.append(dict(data))
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return FakeResponse(*reply)
+
+
+@pytest.fixture
+def config():
+    with open(EDGE_DIR / 'config.yaml') as f:
+        config = yaml.safe_load(f)
+    config['offline_queue'] = {'enabled': False}
+    return config
+
+
+@pytest.fixture
+def make_detector(config):
+    """PlateDetector without a model: tracking, best-frame and server path only"""
+    def make(replies=()):
+        detector = PlateDetector.__new__(PlateDetector)
+        detector.config = config
+        detector.logger = logging.getLogger('plate_detector')
+        detector.lanes = [Lane('masuk', config)]
+        detector.lane = detector.lanes[0]
+        detector.counters = Counters()
+        detector.stage_latency = LatencyTracker()
+        detector.best_frame = BestFrameSelector(config)
+        detector.payload_encoder = PayloadEncoder(config)
+        detector.offline_queue = OfflineQueue(config, None)
+        detector.uploader = FakeUploader(replies)
+        detector.save_debug_images = False
+        detector.detect_and_crop_face = lambda frame: (None, False)
+        return detector
+    return make
+
+
+@pytest.fixture
+def plate_frame():
+    """Frame with one sharp plate-shaped region, and its detection"""
+    frame = np.full((480, 640, 3), 90, dtype=np.uint8)
+    cv2.rectangle(frame, (200, 300), (440, 355), (235, 235, 235), -1)
+    cv2.putText(frame, 'B 1234 CD', (212, 342), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (10, 10, 10), 3)
+    return frame, {'bbox': [200, 300, 440, 355], 'confidence': 0.9}
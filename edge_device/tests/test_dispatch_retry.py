@@ -0,0 +1,45 @@
+"""A DENY without a server decision is retried on the same track"""
+
+import requests
+
+UNREADABLE = (400, {'gate_action': 'DENY', 'error': 'Tidak dapat membaca plat nomor'})
+REJECTED = (403, {'success': False, 'gate_action': 'DENY', 'plate_text': 'B1234CD',
+                  'message': 'Kendaraan tidak terdaftar'})
+OPENED = (200, {'success': True, 'gate_action': 'OPEN', 'plate_text': 'B1234CD', 'message': 'Silakan masuk'})
+
+
+def drive(detector, plate_frame, start, end, step=0.2):
+    """Re-detect the plate every `step` seconds, dispatching every candidate"""
+    frame, detection = plate_frame
+    results = []
+    t = start
+    while t < end:
+        for candidate in detector.select_plates(frame, [dict(detection)], timestamp=t):
+            results.append((t, candidate['track_id'], detector.dispatch_plate(frame, candidate)))
+        t = round(t + step, 3)
+    return results
+
+
+def test_deny_then_redetection_is_sent_again(make_detector, plate_frame):
+    for first in (UNREADABLE, (503, 'Service Unavailable'), requests.exceptions.ConnectionError('down')):
+        detector = make_detector([first, OPENED])
+        retry_after = detector.lane.tracker.retry_after
+
+        results = drive(detector, plate_frame, 0.0, 1.0 + retry_after + 1.0)
+
+        assert [r['gate_action'] for _, _, r in results] == ['DENY', 'OPEN']
+        (t1, track1, _), (t2, track2, _) = results
+        assert track1 == track2  # Car never left: same live track
+        assert t2 - t1 >= retry_after
+        # Both attempts carry the same key, so a queued copy is recorded once
+        keys = {post['idempotency_key'] for post in detector.uploader.posts}
+        assert len(keys) == 1
+
+
+def test_server_rejection_is_final(make_detector, plate_frame):
+    detector = make_detector([REJECTED])
+
+    results = drive(detector, plate_frame, 0.0, 6.0)
+
+    assert [r['gate_action'] for _, _, r in results] == ['DENY']
+    assert len(detector.uploader.posts) == 1
@@ -0,0 +1,61 @@
+"""The last vehicle of a video is dispatched even if its window is still open"""
+
+from pipeline import DetectionPipeline
+
+OPENED = (200, {'success': True, 'gate_action': 'OPEN', 'plate_text': 'B1234CD', 'message': 'Silakan masuk'})
+
+
+class FakeVideo:
+    """Video file source that ends after the given frames"""
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self.finished = False
+
+    def isOpened(self):
+        return not self.finished
+
+    def read(self):
+        if not self.frames:
+            self.finished = True
+            return False, None
+        return True, self.frames.pop(0)
+
+
+def make_short_clip_detector(make_detector):
+    """No crop is excellent, so every track waits for its whole best-frame window"""
+    detector = make_detector([OPENED])
+    detector.best_frame.good_sharpness = float('inf')
+    return detector
+
+
+def test_flush_plates_sends_open_window(make_detector, plate_frame):
+    detector = make_short_clip_detector(make_detector)
+    frame, detection = plate_frame
+    # Short clip: the best-frame window never closes
+    for i in range(5):
+        assert detector.select_plates(frame, [dict(detection)], timestamp=i * 0.05) == []
+
+    results = detector.flush_plates()
+
+    assert [r['gate_action'] for r in results] == ['OPEN']
+    assert detector.flush_plates() == []  # Dispatched once
+
+
+def test_pipeline_dispatches_last_vehicle_at_end_of_video(make_detector, plate_frame):
+    detector = make_short_clip_detector(make_detector)
+    frame, detection = plate_frame
+    detector.pipelines = []
+    detector.pipeline_histogram = None
+    detector.should_run_detection = lambda frame, lane=None: True
+    detector.detect = lambda frame, lane=None: [dict(detection)]
+
+    pipeline = DetectionPipeline(detector, FakeVideo([frame.copy() for _ in range(5)]))
+    pipeline.start()
+    try:
+        assert pipeline.finished.wait(timeout=10.0)
+    finally:
+        pipeline.stop()
+
+    assert len(detector.uploader.posts) == 1
+    assert [r['gate_action'] for r in pipeline.drain_results()] == ['OPEN']
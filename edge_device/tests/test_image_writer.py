@@ -0,0 +1,32 @@
+"""Detections directory retention only touches the writer's own images"""
+
+import os
+import time
+
+import numpy as np
+
+from image_writer import ImageWriter
+
+
+def test_retention_prunes_own_images_only(tmp_path):
+    writer = ImageWriter({'image_writer': {'max_age': 3600, 'retention_interval': 0}})
+    writer.start()
+    writer.save(tmp_path, '20261018_080000_B_1234_CD.jpg', np.zeros((32, 100, 3), dtype=np.uint8))
+    writer.stop()
+
+    old = time.time() - 7200
+    names = [
+        '20261018_070000_.jpg',           # Empty plate text (DENY / server error)
+        '20261018_070001_D_77_XY.jpg',
+        'notes.txt',
+        'gate.jpg',
+    ]
+    for name in names:
+        path = tmp_path / name
+        path.write_bytes(b'x')
+        os.utime(path, (old, old))
+
+    writer.enforce_retention(tmp_path)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['20261018_080000_B_1234_CD.jpg', 'gate.jpg', 'notes.txt']
+    assert writer.pruned == 2
@@ -0,0 +1,82 @@
+"""Offline queue replay order, attempt limit and event time"""
+
+import time
+
+import pytest
+import requests
+
+from offline_queue import OfflineQueue
+
+
+def make_queue(tmp_path, send_fn, **overrides):
+    config = {'offline_queue': {'path': str(tmp_path / 'queue.db'), 'base_backoff': 0.01,
+                                'max_backoff': 0.01, 'log_interval': 0, **overrides}}
+    return OfflineQueue(config, send_fn)
+
+
+def event(plate, event_at):
+    files = {'image': ('plate.jpg', plate.encode(), 'image/jpeg')}
+    return files, {'gate_type': 'MASUK', 'idempotency_key': plate, 'event_at': str(event_at)}
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+def test_failing_event_does_not_block_newer_ones(tmp_path):
+    sent = []
+
+    def send(files, data):
+        sent.append(data)
+        return data['idempotency_key'] != 'poison'  # Always a 5xx for this one
+
+    queue = make_queue(tmp_path, send, max_attempts=3)
+    for plate, at in (('poison', 100.0), ('B1234CD', 200.0), ('D77XY', 300.0)):
+        queue.enqueue(*event(plate, at))
+    queue.start()
+    try:
+        wait_until(lambda: queue.stats()[0] == 0)
+    finally:
+        queue.stop()
+
+    keys = [data['idempotency_key'] for data in sent]
+    assert keys.count('poison') == 3
+    # Newer events went out right after the first failure, not after the last
+    assert keys.index('B1234CD') == 1 and keys.index('D77XY') == 2
+    assert (queue.delivered, queue.dropped) == (2, 1)
+
+
+def test_replay_carries_capture_time(tmp_path):
+    sent = []
+    queue = make_queue(tmp_path, lambda files, data: sent.append(data) or True)
+    queue.enqueue(*event('B1234CD', 1767225600.5))
+    queue.start()
+    try:
+        wait_until(lambda: sent)
+    finally:
+        queue.stop()
+
+    assert sent[0]['event_at'] == '1767225600.5'
+    assert sent[0]['replayed'] == 'true'
+
+
+@pytest.mark.parametrize('max_attempts', [1, 3])
+def test_unreachable_server_does_not_use_up_attempts(tmp_path, max_attempts):
+    calls = []
+
+    def send(files, data):
+        calls.append(data)
+        raise requests.exceptions.ConnectionError('refused')
+
+    queue = make_queue(tmp_path, send, max_attempts=max_attempts)
+    queue.enqueue(*event('B1234CD', 100.0))
+    queue.start()
+    try:
+        wait_until(lambda: len(calls) > max_attempts + 2)
+    finally:
+        queue.stop()
+
+    assert queue.dropped == 0
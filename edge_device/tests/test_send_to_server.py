@@ -0,0 +1,48 @@
+"""Which server replies are queued offline for replay"""
+
+import numpy as np
+import pytest
+import requests
+
+from offline_queue import OfflineQueue
+
+
+PLATE = np.full((48, 200, 3), 200, dtype=np.uint8)
+
+
+@pytest.fixture
+def detector(make_detector, config, tmp_path):
+    def make(reply):
+        detector = make_detector([reply])
+        config['offline_queue'] = {'enabled': True, 'path': str(tmp_path / 'queue.db')}
+        detector.offline_queue = OfflineQueue(config, None)
+        return detector
+    return make
+
+
+@pytest.mark.parametrize('reply', [
+    requests.exceptions.ConnectionError('refused'),
+    requests.exceptions.ReadTimeout('timed out'),
+    (503, 'Service Unavailable'),
+])
+def test_undelivered_events_are_queued(detector, reply):
+    detector = detector(reply)
+
+    result = detector.send_to_server(PLATE)
+
+    assert result['gate_action'] == 'DENY' and result['retry'] and result['queued']
+    assert detector.offline_queue.stats()[0] == 1
+
+
+@pytest.mark.parametrize('reply', [
+    (200, requests.JSONDecodeError('Expecting value', '<html>', 0)),
+    (403, requests.JSONDecodeError('Expecting value', '<html>Forbidden</html>', 0)),
+])
+def test_non_json_reply_is_not_replayed(detector, reply):
+    detector = detector(reply)
+
+    result = detector.send_to_server(PLATE)
+
+    assert result['gate_action'] == 'DENY'
+    assert not result.get('queued')
+    assert detector.offline_queue.stats()[0] == 0
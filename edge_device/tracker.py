@@ -0,0 +1,160 @@
+"""
+Multi-Object Plate Tracker
+===========================
+
+Lightweight SORT-style tracker: every plate gets a track ID, tracks are
+associated frame to frame by IoU against a constant-velocity prediction, and
+expire on their own when not seen for a while. PlateDetector uses the track
+ID to call the server once per vehicle - again only when the server gave no
+decision (unreadable plate, server or network error), after retry_after.
+"""
+
+import itertools
+import logging
+
+import numpy as np
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """Pairwise IoU between two sets of xyxy boxes -> [len(a), len(b)]"""
+    a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return inter / np.maximum(union, 1e-6)
+
+
+class Track:
+    """One tracked plate (center/size state with constant-velocity motion)"""
+
+    def __init__(self, track_id, bbox, confidence, timestamp):
+        self.track_id = track_id
+        self.bbox = np.asarray(bbox, dtype=np.float32)
+        self.velocity = np.zeros(4, dtype=np.float32)  # d(bbox)/dt in px/s
+        self.confidence = confidence
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        self.hits = 1
+
+        # Server interaction state
+        self.dispatched = False
+        self.retry_at = 0.0  # No upload before this time (after a failed attempt)
+        self.idempotency_key = None  # Same key for every attempt of this vehicle
+        self.plate_text = None
+        self.face = None  # (face_img, face_detected), searched once per vehicle
+
+        # Best-frame accumulation window
+        self.best = None
+        self.window_start = None
+        self.ready = False  # Upload without waiting for the window to close
+
+    def offer(self, candidate, timestamp):
+        """Keep candidate if it beats the best crop seen so far for this track"""
+        if self.window_start is None:
+            self.window_start = timestamp
+        if self.best is None or candidate['quality']['score'] > self.best['quality']['score']:
+            self.best = candidate
+
+    def predict(self, timestamp):
+        """Predicted bbox at timestamp assuming constant velocity"""
+        return self.bbox + self.velocity * (timestamp - self.last_seen)
+
+    def update(self, bbox, confidence, timestamp, smoothing=0.5):
+        bbox = np.asarray(bbox, dtype=np.float32)
+        dt = timestamp - self.last_seen
+        if dt > 0:
+            measured = (bbox - self.bbox) / dt
+            self.velocity = smoothing * measured + (1 - smoothing) * self.velocity
+        self.bbox = bbox
+        self.confidence = confidence
+        self.last_seen = timestamp
+        self.hits += 1
+
+
+class PlateTracker:
+    """IoU association + constant-velocity prediction, tracks expire after max_age"""
+
+    def __init__(self, config):
+        tracker_config = config.get('tracker', {})
+        self.logger = logging.getLogger(__name__)
+
+        self.iou_threshold = tracker_config.get('iou_threshold', 0.3)
+        self.max_age = tracker_config.get('max_age', 3.0)
+        self.min_hits = tracker_config.get('min_hits', 1)
+        self.retry_after = tracker_config.get('retry_after', 2.0)
+
+        self.tracks = {}
+        self.expired = []  # Tracks dropped by the last update()
+        self._ids = itertools.count(1)
+
+    def update(self, detections, timestamp):
+        """
+        Associate detections with tracks.
+
+        Args:
+            detections: list of {'bbox', 'confidence'}
+            timestamp: frame time (seconds)
+
+        Returns: list of (track, detection) for every detection
+        """
+        self._expire(timestamp)
+
+        track_list = list(self.tracks.values())
+        matches = {}
+
+        if track_list and detections:
+            predicted = [track.predict(timestamp) for track in track_list]
+            ious = iou_matrix(predicted, [d['bbox'] for d in detections])
+
+            # Greedy assignment by descending IoU (few objects, no Hungarian needed)
+            for flat in np.argsort(-ious, axis=None):
+                t_idx, d_idx = np.unravel_index(flat, ious.shape)
+                if ious[t_idx, d_idx] < self.iou_threshold:
+                    break
+                if d_idx in matches or t_idx in matches.values():
+                    continue
+                matches[d_idx] = t_idx
+
+        associated = []
+        for d_idx, detection in enumerate(detections):
+            if d_idx in matches:
+                track = track_list[matches[d_idx]]
+                track.update(detection['bbox'], detection['confidence'], timestamp)
+            else:
+                track = Track(next(self._ids), detection['bbox'], detection['confidence'], timestamp)
+                self.tracks[track.track_id] = track
+                self.logger.debug(f"New plate track #{track.track_id}")
+            associated.append((track, detection))
+
+        return associated
+
+    def is_confirmed(self, track):
+        """Track has been seen often enough to act on"""
+        return track.hits >= self.min_hits
+
+    def release(self, track, timestamp):
+        """Let a dispatched track be sent again after retry_after (no server decision)"""
+        track.dispatched = False
+        track.ready = False
+        track.best = None
+        track.window_start = None
+        track.retry_at = timestamp + self.retry_after
+
+    def _expire(self, timestamp):
+        expired = [tid for tid, track in self.tracks.items()
+                   if timestamp - track.last_seen > self.max_age]
+        self.expired = []
+        for tid in expired:
+            track = self.tracks.pop(tid)
+            self.expired.append(track)
+            self.logger.debug(
+                f"Track #{tid} expired (plate: {track.plate_text}, hits: {track.hits})"
+            )
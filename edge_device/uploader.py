@@ -0,0 +1,159 @@
+"""
+Pooled HTTP Uploader
+=====================
+
+send_to_server used a bare requests.post per plate event, paying TCP (and
+TLS) setup every time, with one fixed timeout and no retry. Uploader keeps
+one pooled keep-alive requests.Session for the process:
+
+- the connection is pre-warmed at startup (GET /health in the background)
+- separate connect and read timeouts
+- every event carries an Idempotency-Key; the backend stores it with the
+  parking log and answers a retry (or offline replay) of an event it already
+  recorded with the stored decision, so retrying after a read timeout or a
+  5xx cannot turn an accepted entry into a duplicate DENY
+- bounded retries with jittered backoff, but only while there is still time
+  left before the gate decision deadline
+- per-request latency percentiles + histograms (metrics.py)
+"""
+
+import logging
+import random
+import threading
+import time
+import uuid
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import LatencyHistogram, LatencyTracker
+
+
+# Responses worth retrying (server restarting / overloaded / proxy errors)
+RETRY_STATUS = {502, 503, 504}
+
+
+class Uploader:
+    """Keep-alive, retrying HTTP client for the recognition server"""
+
+    def __init__(self, config):
+        """
+        Args:
+            config: full edge config (uses the 'server' section)
+        """
+        server_config = config['server']
+        self.logger = logging.getLogger(__name__)
+
+        self.base_url = server_config['url'].rstrip('/')
+        timeout = server_config.get('timeout', 10)
+        self.connect_timeout = server_config.get('connect_timeout', 3.0)
+        self.read_timeout = server_config.get('read_timeout', timeout)
+        self.deadline = server_config.get('deadline', timeout)
+        self.max_retries = server_config.get('max_retries', 2)
+        self.retry_backoff = server_config.get('retry_backoff', 0.2)
+        self.min_attempt_time = server_config.get('min_attempt_time', 0.5)
+        self.prewarm_path = server_config.get('prewarm_path', '/health')
+
+        self.session = requests.Session()
+        # Retries are handled here (deadline aware), not by urllib3
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=server_config.get('pool_size', 2),
+                              max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.latency = LatencyTracker()
+        self.histogram = LatencyHistogram()
+        self.retries = 0
+
+    @staticmethod
+    def new_idempotency_key():
+        return uuid.uuid4().hex
+
+    def prewarm(self, background=True):
+        """Open the pooled connection before the first plate arrives"""
+        if background:
+            threading.Thread(target=self.prewarm, args=(False,), name='uploader-prewarm',
+                             daemon=True).start()
+            return
+
+        start = time.time()
+        try:
+            self.session.get(f"{self.base_url}{self.prewarm_path}",
+                             timeout=(self.connect_timeout, self.read_timeout))
+            self.logger.info(f"Server connection pre-warmed ({(time.time() - start) * 1000:.0f}ms)")
+        except requests.exceptions.RequestException as e:
+            self.logger.warning(f"Server pre-warm failed: {e}")
+
+    def post(self, path, files=None, data=None, deadline=None, retry=True):
+        """
+        POST with keep-alive, idempotency key and deadline-bounded retries.
+
+        Args:
+            path: server path, e.g. '/api/parking/process'
+            deadline: absolute time.time() by which a response is needed
+                (default: now + server.deadline)
+            retry: False for a single attempt (offline queue replays have
+                their own backoff)
+
+        Returns: requests.Response (possibly a retryable 5xx if attempts ran out)
+        Raises: requests.exceptions.RequestException when no response was received
+        """
+        start = time.time()
+        if deadline is None:
+            deadline = start + self.deadline
+
+        key = (data or {}).get('idempotency_key') or self.new_idempotency_key()
+        headers = {'Idempotency-Key': key}
+        max_attempts = 1 + (self.max_retries if retry else 0)
+
+        attempt = 0
+        while True:
+            attempt += 1
+            remaining = deadline - time.time()
+            read_timeout = max(0.1, min(self.read_timeout, remaining))
+
+            attempt_start = time.time()
+            error, response = None, None
+            try:
+                response = self.session.post(
+                    f"{self.base_url}{path}",
+                    files=files,
+                    data=data,
+                    headers=headers,
+                    timeout=(min(self.connect_timeout, read_timeout), read_timeout)
+                )
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = e
+            self.histogram.observe('upload_attempt', time.time() - attempt_start)
+
+            retryable = error is not None or response.status_code in RETRY_STATUS
+            if not retryable or attempt >= max_attempts:
+                break
+
+            # Full jitter backoff, only if a useful attempt still fits before the deadline
+            backoff = random.uniform(0, self.retry_backoff * (2 ** (attempt - 1)))
+            if time.time() + backoff + self.min_attempt_time > deadline:
+                break
+
+            self.retries += 1
+            reason = error or f"HTTP {response.status_code}"
+            self.logger.warning(f"Upload attempt {attempt} failed ({reason}), retrying in {backoff * 1000:.0f}ms")
+            time.sleep(backoff)
+
+        elapsed = time.time() - start
+        self.latency.record('upload', elapsed)
+        self.histogram.observe('upload', elapsed)
+
+        if error is not None:
+            raise error
+        return response
+
+    def summary(self):
+        """Upload latency percentiles + histogram as a log string"""
+        return (
+            f"Uploads: retries={self.retries} | {self.latency.format_summary(['upload'])} | "
+            f"{self.histogram.format_summary('upload')}"
+        )
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,156 @@
+"""
+Vectorized YOLO Output Decoding
+================================
+
+NumPy decoder for YOLO detection heads, replacing the per-row Python loop.
+Supports both output layouts produced by our exports:
+
+- YOLOv5 style:  [1, N, 5 + nc]  (x, y, w, h, objectness, class scores...)
+- YOLOv8 style:  [1, 4 + nc, N]  (transposed, no objectness, N = 8400 @ 640)
+
+Boxes are mapped back through the letterbox (padding + scale) and filtered
+with non-max suppression so overlapping boxes only produce one detection.
+"""
+
+import cv2
+import numpy as np
+
+
+def detect_layout(output):
+    """
+    Detect output layout from a 2D (batch removed) model output.
+
+    Returns: 'v8' for channel-first [4+nc, N], 'v5' for row-major [N, 5+nc]
+    """
+    # Channel count (6..85) is always far smaller than the number of anchors
+    return 'v8' if output.shape[0] < output.shape[1] else 'v5'
+
+
+def nms(boxes, scores, iou_threshold):
+    """
+    Non-max suppression on xyxy boxes.
+
+    Returns: indices of kept boxes, highest score first
+    """
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    # cv2.dnn.NMSBoxes expects [x, y, w, h]
+    xywh = np.empty_like(boxes)
+    xywh[:, :2] = boxes[:, :2]
+    xywh[:, 2:] = boxes[:, 2:] - boxes[:, :2]
+    keep = cv2.dnn.NMSBoxes(xywh.tolist(), scores.tolist(), 0.0, float(iou_threshold))
+    return np.asarray(keep, dtype=np.int64).reshape(-1)
+
+
+def merge_detections(detections, iou_threshold):
+    """
+    NMS across detection lists from separate runs (e.g. overlapping ROIs).
+
+    Returns: detections that survive NMS, highest confidence first
+    """
+    if len(detections) < 2:
+        return list(detections)
+    boxes = np.array([d['bbox'] for d in detections], dtype=np.float32)
+    scores = np.array([d['confidence'] for d in detections], dtype=np.float32)
+    return [detections[i] for i in nms(boxes, scores, iou_threshold)]
+
+
+def decode_boxes(output, conf_threshold, layout='auto', max_candidates=300):
+    """
+    Decode raw model output into letterboxed-space boxes.
+
+    Args:
+        output: model output, [1, ...] or 2D
+        conf_threshold: minimum score
+        layout: 'auto', 'v5' or 'v8'
+        max_candidates: keep only the top-k scores before NMS
+
+    Returns: (boxes_xyxy float32 [K, 4], scores [K], class_ids [K])
+    """
+    output = np.asarray(output)
+    if output.ndim == 3:
+        output = output[0]  # Remove batch dimension
+
+    if layout == 'auto':
+        layout = detect_layout(output)
+
+    if layout == 'v8':
+        # [4 + nc, N] -> score per anchor is the best class score
+        class_scores = output[4:]
+        if class_scores.shape[0] == 1:
+            scores = class_scores[0]
+            class_ids = np.zeros(scores.shape[0], dtype=np.int64)
+        else:
+            class_ids = class_scores.argmax(axis=0)
+            scores = class_scores[class_ids, np.arange(class_scores.shape[1])]
+        mask = scores > conf_threshold
+        xywh = output[:4, mask].T
+        scores = scores[mask]
+        class_ids = class_ids[mask]
+    else:
+        # [N, 5 + nc] -> objectness, times best class score when multi-class
+        rows = output[output[:, 4] > conf_threshold]
+        if rows.shape[1] > 6:
+            class_ids = rows[:, 5:].argmax(axis=1)
+            scores = rows[:, 4] * rows[np.arange(rows.shape[0]), 5 + class_ids]
+            keep = scores > conf_threshold
+            rows, scores, class_ids = rows[keep], scores[keep], class_ids[keep]
+        else:
+            scores = rows[:, 4]
+            class_ids = np.zeros(rows.shape[0], dtype=np.int64)
+        xywh = rows[:, :4]
+
+    if len(scores) > max_candidates:
+        top = np.argpartition(-scores, max_candidates)[:max_candidates]
+        xywh, scores, class_ids = xywh[top], scores[top], class_ids[top]
+
+    boxes = np.empty((len(scores), 4), dtype=np.float32)
+    half_w = xywh[:, 2] / 2
+    half_h = xywh[:, 3] / 2
+    boxes[:, 0] = xywh[:, 0] - half_w
+    boxes[:, 1] = xywh[:, 1] - half_h
+    boxes[:, 2] = xywh[:, 0] + half_w
+    boxes[:, 3] = xywh[:, 1] + half_h
+
+    return boxes, scores.astype(np.float32), class_ids
+
+
+def decode_detections(output, conf_threshold, ratio, pad, img_shape=None,
+                      iou_threshold=0.45, layout='auto', max_candidates=300):
+    """
+    Decode model output into detections in original image coordinates.
+
+    Args:
+        output: model output (letterboxed input space)
+        conf_threshold: minimum score
+        ratio: letterbox scale ratio
+        pad: letterbox padding (dw, dh)
+        img_shape: original image shape, used to clip boxes
+        iou_threshold: NMS IoU threshold
+
+    Returns: list of {'bbox': [x1, y1, x2, y2], 'confidence': float}
+    """
+    boxes, scores, _ = decode_boxes(output, conf_threshold, layout, max_candidates)
+    if len(scores) == 0:
+        return []
+
+    # Undo letterbox: remove padding, then scale back
+    boxes[:, [0, 2]] -= pad[0]
+    boxes[:, [1, 3]] -= pad[1]
+    boxes /= ratio
+
+    if img_shape is not None:
+        h, w = img_shape[:2]
+        boxes[:, [0, 2]] = np.clip(boxes[:, [0, 2]], 0, w)
+        boxes[:, [1, 3]] = np.clip(boxes[:, [1, 3]], 0, h)
+
+    keep = nms(boxes, scores, iou_threshold)
+
+    return [
+        {
+            'bbox': [int(v) for v in boxes[i]],
+            'confidence': float(scores[i])
+        }
+        for i in keep
+    ]